@@ -0,0 +1,4 @@
+# Módulos compartilhados por graph/ e metrics/ (importados com a raiz do repositório no
+# sys.path, como o pacote metrics nos notebooks):
+#   common.profiling  modo --profile dos pontos de entrada
+#   common.semesters  calendário de semestres
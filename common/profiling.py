@@ -0,0 +1,189 @@
+"""
+Profiling mode shared by the pipeline entry points (graph/pipeline, graph/scripts and
+metrics/scripts). Running any of them with --profile writes to <root>/<name>_<timestamp>/:
+
+    summary.json          wall time, CPU time and tracemalloc peak per stage
+    NN_<stage>.prof       cProfile stats (pstats / snakeviz)
+    NN_<stage>.txt        top functions by cumulative time
+    NN_<stage>_memory.txt largest allocations still alive at the end of the stage (only
+                          with --profile-memory: the tracemalloc snapshot is slow)
+    stacks.collapsed      sampled stacks in collapsed format (flamegraph.pl, speedscope),
+                          with the stage as the root frame; time spent writing these
+                          files is sampled under <profiler>
+
+Entry points wrap their main call in session() and mark stages with stage(name): each
+call closes the previous stage. Without --profile (or --profile-memory), stage() does nothing.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+FLAG = "--profile"
+MEMORY_FLAG = "--profile-memory"  # --profile + snapshot do tracemalloc por etapa
+# Raiz das amostras tiradas enquanto o próprio profiler grava os resultados
+PROFILER_STAGE = "<profiler>"
+SAMPLE_INTERVAL = 0.005  # segundos entre amostras de pilha
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+_current: Optional["Profiler"] = None
+
+
+class _StackSampler(threading.Thread):
+    """Samples the main thread's stack every SAMPLE_INTERVAL seconds"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.target = threading.main_thread().ident
+        self.stacks: Counter = Counter()
+        self.stage = "startup"
+        self.running = True
+
+    def run(self):
+        while self.running:
+            frame = sys._current_frames().get(self.target)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                frames.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join([self.stage] + frames[::-1])] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+
+class Profiler:
+    def __init__(self, name: str, root: str, memory_snapshots: bool = False):
+        self.directory = os.path.join(root, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+        self.memory_snapshots = memory_snapshots
+        self.stages: List[Dict] = []
+        self._open: Optional[Dict] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler = _StackSampler()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tracemalloc.start()
+        self._sampler.start()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def stage(self, name: str):
+        self._close_stage()
+        tracemalloc.reset_peak()
+        self._sampler.stage = name
+        self._open = {
+            "name": name,
+            "wall": time.perf_counter(),
+            "cpu": time.process_time(),
+            "memory": tracemalloc.get_traced_memory()[0],
+        }
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def _close_stage(self):
+        if self._open is None:
+            return
+        self._profile.disable()
+        wall = time.perf_counter() - self._open["wall"]
+        cpu = time.process_time() - self._open["cpu"]
+        current, peak = tracemalloc.get_traced_memory()
+        # Daqui em diante o trabalho é do profiler, não da etapa
+        self._sampler.stage = PROFILER_STAGE
+
+        index = len(self.stages) + 1
+        prefix = os.path.join(self.directory, f"{index:02d}_{_slug(self._open['name'])}")
+        self._profile.dump_stats(prefix + ".prof")
+        text = io.StringIO()
+        pstats.Stats(self._profile, stream=text).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        with open(prefix + ".txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        if self.memory_snapshots:
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            )
+            with open(prefix + "_memory.txt", "w", encoding="utf-8") as f:
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+
+        self.stages.append({
+            "stage": self._open["name"],
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            # CPU bem abaixo do wall: tempo esperando rede/disco/sleep
+            "cpu_ratio": round(cpu / wall, 3) if wall else None,
+            "peak_memory_mb": round(peak / 2**20, 2),
+            "memory_delta_mb": round((current - self._open["memory"]) / 2**20, 2),
+        })
+        self._open = None
+        self._profile = None
+
+    def finish(self):
+        self._close_stage()
+        self._sampler.running = False
+        self._sampler.join()
+        tracemalloc.stop()
+
+        with open(os.path.join(self.directory, "stacks.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in sorted(self._sampler.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        wall = time.perf_counter() - self._started[0]
+        cpu = time.process_time() - self._started[1]
+        summary = {
+            "command": " ".join(sys.argv),
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            # cProfile + gravação dos resultados (e snapshots, com --profile-memory) de cada etapa
+            "profiling_overhead_seconds": round(wall - sum(s["wall_seconds"] for s in self.stages), 3),
+            "stages": self.stages,
+        }
+        with open(os.path.join(self.directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print(f"\nProfile saved in {self.directory}")
+        for s in self.stages:
+            print(
+                f"   {s['stage']:<28} wall {s['wall_seconds']:>9.3f}s  cpu {s['cpu_seconds']:>9.3f}s"
+                f"  peak {s['peak_memory_mb']:>9.2f} MB"
+            )
+
+
+def _slug(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)[:60]
+
+
+@contextmanager
+def session(name: str, root: str):
+    """
+    Profiles the block when --profile or --profile-memory is in sys.argv (the flags are
+    removed, so the entry point parses the remaining arguments as before).
+    """
+    global _current
+    if FLAG not in sys.argv and MEMORY_FLAG not in sys.argv:
+        yield None
+        return
+    memory_snapshots = MEMORY_FLAG in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg not in (FLAG, MEMORY_FLAG)]
+    _current = Profiler(name, root, memory_snapshots)
+    _current.start()
+    _current.stage("main")
+    try:
+        yield _current
+    finally:
+        profiler, _current = _current, None
+        profiler.finish()
+
+
+def stage(name: str):
+    """Starts a new stage (closing the previous one); no-op outside a profiling session"""
+    if _current is not None:
+        _current.stage(name)
@@ -0,0 +1,9 @@
+# Calendário de semestres compartilhado por metrics/scripts (filter.py, extract.py) e
+# graph/scripts/etl_graph_processor.py (janelas dos snapshots temporais).
+# Em ordem cronológica e sem sobreposição; datas locais "YYYY-MM-DD HH:MM:SS".
+SEMESTERS = [
+    {"name": "2024.1", "start": "2024-03-18 00:00:00", "end": "2024-09-21 23:59:59"},
+    {"name": "2024.2", "start": "2024-10-14 00:00:00", "end": "2025-02-22 23:59:59"},
+    {"name": "2025.1", "start": "2025-03-24 00:00:00", "end": "2025-07-26 23:59:59"},
+    {"name": "2025.2", "start": "2025-08-01 00:00:00", "end": "2025-12-22 23:59:59"},
+]
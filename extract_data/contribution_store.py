@@ -0,0 +1,241 @@
+import ast
+import csv
+import os
+import sys
+from typing import Dict, Any, List, Union
+
+import numpy as np
+
+
+class ContributionMatrix:
+    TYPE_NAMES = ["commits", "pull_requests", "issues", "reviews"]
+
+    def __init__(self, users: np.ndarray, months: np.ndarray, monthly: np.ndarray,
+                 contributions: np.ndarray, repositories: np.ndarray,
+                 primary_language: np.ndarray, types: np.ndarray):
+        """
+        Columnar contribution data for a cohort: one row per user, one column per month.
+
+        Args:
+            users (np.ndarray): Usernames (str), the row index.
+            months (np.ndarray): Dense datetime64[M] months, the column index of `monthly`.
+            monthly (np.ndarray): int64 matrix (users x months) of contribution counts.
+            contributions (np.ndarray): Total contributions per user.
+            repositories (np.ndarray): Repository count per user.
+            primary_language (np.ndarray): Primary language per user (str).
+            types (np.ndarray): int64 matrix (users x TYPE_NAMES) of contribution types.
+        """
+        self.users = users
+        self.months = months
+        self.monthly = monthly
+        self.contributions = contributions
+        self.repositories = repositories
+        self.primary_language = primary_language
+        self.types = types
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "ContributionMatrix":
+        """
+        Builds the matrix from summary rows, as produced by GitHubContributorSummary.
+        The monthly_contributions and contribution_types fields may be dicts or their
+        str(dict) form from the legacy CSV files.
+
+        Args:
+            rows (List[Dict[str, Any]]): Summary rows.
+
+        Returns:
+            ContributionMatrix: The cohort matrix.
+        """
+        monthly_dicts = [_as_dict(row.get("monthly_contributions")) for row in rows]
+        type_dicts = [_as_dict(row.get("contribution_types")) for row in rows]
+
+        all_months = sorted({month for d in monthly_dicts for month in d})
+        if all_months:
+            first = np.datetime64(all_months[0], "M")
+            last = np.datetime64(all_months[-1], "M")
+            months = np.arange(first, last + 1)
+        else:
+            first = None
+            months = np.array([], dtype="datetime64[M]")
+
+        # (row, column) coordinates of every cell at once, then a single scatter
+        row_idx = np.fromiter(
+            (i for i, d in enumerate(monthly_dicts) for _ in d), dtype=np.int64
+        )
+        month_keys = np.array([m for d in monthly_dicts for m in d], dtype="datetime64[M]")
+        values = np.fromiter((v for d in monthly_dicts for v in d.values()), dtype=np.int64, count=len(month_keys))
+        monthly = np.zeros((len(rows), len(months)), dtype=np.int64)
+        if len(month_keys):
+            col_idx = (month_keys - first).astype(np.int64)
+            np.add.at(monthly, (row_idx, col_idx), values)
+
+        types = np.array(
+            [[int(d.get(name, 0)) for name in cls.TYPE_NAMES] for d in type_dicts], dtype=np.int64
+        ).reshape(len(rows), len(cls.TYPE_NAMES))
+
+        return cls(
+            users=np.array([str(row.get("user", row.get("User", ""))) for row in rows], dtype=str),
+            months=months,
+            monthly=monthly,
+            contributions=np.array([int(row.get("contributions") or 0) for row in rows], dtype=np.int64),
+            repositories=np.array([int(row.get("repositories") or 0) for row in rows], dtype=np.int64),
+            primary_language=np.array([str(row.get("primary_language") or "N/A") for row in rows], dtype=str),
+            types=types,
+        )
+
+    @classmethod
+    def concat(cls, matrices: List["ContributionMatrix"]) -> "ContributionMatrix":
+        """
+        Stacks the users of several matrices, aligning their month columns.
+
+        Args:
+            matrices (List[ContributionMatrix]): Matrices with disjoint users.
+
+        Returns:
+            ContributionMatrix: The combined matrix.
+        """
+        matrices = [matrix for matrix in matrices if len(matrix.users)]
+        if not matrices:
+            return cls.from_rows([])
+
+        spans = [matrix.months for matrix in matrices if len(matrix.months)]
+        if spans:
+            months = np.arange(min(span[0] for span in spans), max(span[-1] for span in spans) + 1)
+        else:
+            months = np.array([], dtype="datetime64[M]")
+
+        monthly = np.zeros((sum(len(matrix.users) for matrix in matrices), len(months)), dtype=np.int64)
+        row = 0
+        for matrix in matrices:
+            if len(matrix.months):
+                col = int((matrix.months[0] - months[0]).astype(np.int64))
+                monthly[row:row + len(matrix.users), col:col + len(matrix.months)] = matrix.monthly
+            row += len(matrix.users)
+
+        return cls(
+            users=np.concatenate([matrix.users for matrix in matrices]),
+            months=months,
+            monthly=monthly,
+            contributions=np.concatenate([matrix.contributions for matrix in matrices]),
+            repositories=np.concatenate([matrix.repositories for matrix in matrices]),
+            primary_language=np.concatenate([matrix.primary_language for matrix in matrices]),
+            types=np.vstack([matrix.types for matrix in matrices]),
+        )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ContributionMatrix":
+        """
+        Converts a legacy summary CSV (str(dict) cells) to the columnar form. Only meant as a
+        one-off migration of output files written before the NPZ existed; new runs build the
+        matrix from the fetched rows.
+
+        Args:
+            path (str): Summary CSV file.
+
+        Returns:
+            ContributionMatrix: The cohort matrix.
+        """
+        with open(path, mode='r', newline='') as file:
+            return cls.from_rows(list(csv.DictReader(file)))
+
+    def save(self, path: str):
+        """
+        Saves the matrix as a compressed NPZ file (no pickled objects).
+
+        Args:
+            path (str): Output .npz file.
+        """
+        np.savez_compressed(
+            path,
+            users=self.users,
+            months=self.months,
+            monthly=self.monthly,
+            contributions=self.contributions,
+            repositories=self.repositories,
+            primary_language=self.primary_language,
+            type_names=np.array(self.TYPE_NAMES),
+            types=self.types,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ContributionMatrix":
+        """
+        Loads a matrix saved with save().
+
+        Args:
+            path (str): .npz file.
+
+        Returns:
+            ContributionMatrix: The cohort matrix.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            names = data["type_names"].tolist()
+            order = [names.index(name) for name in cls.TYPE_NAMES]
+            return cls(
+                users=data["users"],
+                months=data["months"],
+                monthly=data["monthly"],
+                contributions=data["contributions"],
+                repositories=data["repositories"],
+                primary_language=data["primary_language"],
+                types=data["types"][:, order],
+            )
+
+    def monthly_frame(self):
+        """
+        Wide DataFrame: index = user, columns = monthly PeriodIndex.
+
+        Returns:
+            pd.DataFrame: Monthly contribution counts.
+        """
+        import pandas as pd  # Only needed for analysis, not for extraction
+
+        return pd.DataFrame(
+            self.monthly,
+            index=pd.Index(self.users, name="user"),
+            columns=pd.PeriodIndex(self.months.astype(str), freq="M", name="month"),
+        )
+
+    def summary_frame(self):
+        """
+        One row per user with totals and one column per contribution type, equivalent to the
+        notebooks' safe_loads + json_normalize preparation of the CSV files.
+
+        Returns:
+            pd.DataFrame: User summary.
+        """
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            "user": self.users,
+            "contributions": self.contributions,
+            "repositories": self.repositories,
+            "primary_language": self.primary_language,
+        })
+        for i, name in enumerate(self.TYPE_NAMES):
+            frame[name] = self.types[:, i]
+        return frame
+
+
+def _as_dict(value: Union[str, Dict[str, Any], None]) -> Dict[str, Any]:
+    """
+    Accepts a dict or the str(dict) representation written to the legacy CSV files.
+    """
+    if isinstance(value, dict):
+        return value
+    if not value:
+        return {}
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+if __name__ == '__main__':
+    # Converts existing summary CSVs: python contribution_store.py ../data/contributors_summary_ebl.csv
+    for csv_path in sys.argv[1:]:
+        npz_path = os.path.splitext(csv_path)[0] + ".npz"
+        matrix = ContributionMatrix.from_csv(csv_path)
+        matrix.save(npz_path)
+        print(f"{csv_path} -> {npz_path} ({len(matrix.users)} users, {len(matrix.months)} months)")
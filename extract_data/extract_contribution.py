@@ -1,76 +1,93 @@
 import requests
 import csv
 import datetime
-from collections import defaultdict
-from typing import Dict, Any, List
+import json
+import os
+import sys
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
-class GitHubUserData:
-    def __init__(self, token: str):
+import numpy as np
+
+from contribution_store import ContributionMatrix
+
+
+class ContributionCache:
+    def __init__(self, path: str):
         """
-        Initializes the class with the GitHub authentication token.
+        Initializes a persistent per-(user, year) store of parsed contribution data,
+        backed by a SQLite file. Only closed years are stored, since their
+        contribution calendars no longer change.
 
         Args:
-            token (str): The GitHub authentication token.
+            path (str): Path of the SQLite database file.
         """
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
-    def get_user_data(self, user: str) -> Dict[str, Any]:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS year_contributions (
+                    user TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (user, year)
+                )
+                """
+            )
+
+    def get_years(self, user: str) -> Dict[int, Dict[str, Any]]:
         """
-        Retrieves GitHub user data, including contributions, repositories, and primary language.
+        Returns every cached year of a user.
 
         Args:
-            user (str): The GitHub username.
+            user (str): GitHub username (case-insensitive).
 
         Returns:
-            Dict[str, Any]: A dictionary containing contribution data, repositories, primary language, 
-                            monthly contributions, and types of contributions.
+            Dict[int, Dict[str, Any]]: Parsed year data keyed by year.
         """
-        total_contributions = 0
-        monthly_contributions = defaultdict(int)
-        contribution_types = defaultdict(int)
-        start_year = 2017
-        current_year = datetime.datetime.now().year
-
-        for year in range(start_year, current_year + 1):
-            from_date = f"{year}-01-01T00:00:00Z"
-            to_date = f"{year}-12-31T23:59:59Z"
-            user_data_for_year = self._get_user_data_for_year(user, from_date, to_date)
-            
-            total_contributions += user_data_for_year["contributions"]
-            for month, count in user_data_for_year["monthly_contributions"].items():
-                monthly_contributions[month] += count
-            for key, count in user_data_for_year["contribution_types"].items():
-                contribution_types[key] += count
-
-        additional_user_data = self._get_additional_user_data(user)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT year, data FROM year_contributions WHERE user = ?", (user.lower(),)
+            ).fetchall()
+        return {year: json.loads(data) for year, data in rows}
 
-        return {
-            "contributions": total_contributions,
-            "repositories": additional_user_data["repositories"],
-            "primary_language": additional_user_data["primary_language"],
-            "monthly_contributions": dict(monthly_contributions),
-            "contribution_types": dict(contribution_types)
-        }
-    
-    def _get_user_data_for_year(self, user: str, from_date: str, to_date: str) -> Dict[str, Any]:
+    def put_years(self, user: str, years: Dict[int, Dict[str, Any]]):
         """
-        Fetches GitHub user data for a specific year.
+        Stores parsed year data for a user, replacing previous entries.
 
         Args:
-            user (str): GitHub username.
-            from_date (str): The start date (in ISO format) of the year to retrieve data from.
-            to_date (str): The end date (in ISO format) of the year to retrieve data from.
-
-        Returns:
-            Dict[str, Any]: Parsed user contribution data for the specified year.
+            user (str): GitHub username (case-insensitive).
+            years (Dict[int, Dict[str, Any]]): Parsed year data keyed by year.
+        """
+        if not years:
+            return
+        fetched_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO year_contributions (user, year, data, fetched_at) VALUES (?, ?, ?, ?)",
+                [(user.lower(), year, json.dumps(data), fetched_at) for year, data in years.items()]
+            )
+
+    def close(self):
         """
-        query = """
-        query($user: String!, $from: DateTime!, $to: DateTime!) {
-          user(login: $user) {
-            contributionsCollection(from: $from, to: $to) {
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+class GitHubUserData:
+    START_YEAR = 2017
+    USERS_PER_REQUEST = 5
+
+    CONTRIBUTION_FIELDS = """
               contributionCalendar {
                 totalContributions
                 weeks {
@@ -81,118 +98,248 @@ class GitHubUserData:
                 }
               }
               commitContributionsByRepository {
-                contributions(first: 100) {
+                contributions(first: 1) {
                   totalCount
                 }
               }
               pullRequestContributionsByRepository {
-                contributions(first: 100) {
+                contributions(first: 1) {
                   totalCount
                 }
               }
               issueContributionsByRepository {
-                contributions(first: 100) {
+                contributions(first: 1) {
                   totalCount
                 }
               }
               pullRequestReviewContributionsByRepository {
-                contributions(first: 100) {
+                contributions(first: 1) {
                   totalCount
                 }
               }
-            }
-          }
-        }
+    """
+
+    def __init__(self, token: str, cache: Optional[ContributionCache] = None,
+                 budget: Optional["RateLimitBudget"] = None):
         """
-        
-        variables = {
-            "user": user,
-            "from": from_date,
-            "to": to_date
+        Initializes the class with the GitHub authentication token.
+
+        Args:
+            token (str): The GitHub authentication token.
+            cache (Optional[ContributionCache]): Store for closed years. When given, only
+                                                 the current year and uncached years are fetched.
+            budget (Optional[RateLimitBudget]): Shared rate-limit budget for batched requests.
+        """
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
         }
-        
-        url = "https://api.github.com/graphql"
-        response = requests.post(url, json={'query': query, 'variables': variables}, headers=self.headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if "errors" in data:
-                print(f"Error fetching data for user {user}: {data['errors']}")
-                return self._empty_user_data()
-            
-            user_data = data.get("data", {}).get("user", {})
-            if not user_data:
-                print(f"User not found or no data available: {user}")
-                return self._empty_user_data()
-            
-            return self._parse_user_data(user_data)
-        else:
-            print(f"Error fetching data for user {user}: {response.status_code} {response.text}")
-            return self._empty_user_data()
-    
-    def _get_additional_user_data(self, user: str) -> Dict[str, Any]:
+        self.cache = cache
+        self.budget = budget
+
+    def get_user_data(self, user: str) -> Dict[str, Any]:
         """
-        Retrieves additional information about the user, such as the number of repositories
-        and the primary programming language.
+        Retrieves GitHub user data, including contributions, repositories, and primary language.
 
         Args:
-            user (str): GitHub username.
+            user (str): The GitHub username.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing contribution data, repositories, primary language, 
+                            monthly contributions, and types of contributions.
+        """
+        return self.get_users_data([user])[user]
+
+    def get_users_data(self, users: List[str], users_per_request: int = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves the data of several users, fetching every year window and the additional
+        repository data of up to `users_per_request` users in a single aliased GraphQL request.
+
+        Args:
+            users (List[str]): GitHub usernames.
+            users_per_request (int): Users per request (defaults to USERS_PER_REQUEST).
 
         Returns:
-            Dict[str, Any]: Additional user information, such as repositories and primary language.
+            Dict[str, Dict[str, Any]]: The same structure returned by get_user_data, keyed by username.
+
+        Raises:
+            RuntimeError: If a batch request fails, so callers can retry it later.
+        """
+        users_per_request = users_per_request or self.USERS_PER_REQUEST
+        current_year = datetime.datetime.now().year
+        years = list(range(self.START_YEAR, current_year + 1))
+        results = {}
+
+        for start in range(0, len(users), users_per_request):
+            batch = users[start:start + users_per_request]
+
+            # Closed years come from the cache; the current year is always refreshed
+            cached_by_user = []
+            for user in batch:
+                cached = self.cache.get_years(user) if self.cache else {}
+                cached_by_user.append({y: d for y, d in cached.items() if y < current_year})
+            missing_by_user = [[y for y in years if y not in cached] for cached in cached_by_user]
+
+            response_data, errors = self._run_batch_query(batch, missing_by_user)
+            # Aliases hit by an error, from its path: ("u<i>", "y<year>"), ("u<i>",) for the
+            # whole user, or () for errors without a path, which could affect any alias
+            failed = {tuple(error.get("path") or ())[:2] for error in errors}
+
+            for i, user in enumerate(batch):
+                raw_user = response_data.get(f"u{i}")
+                if not raw_user:
+                    print(f"User not found or no data available: {user}")
+                    results[user] = self._empty_user_data()
+                    continue
+
+                fetched = {
+                    year: self._parse_user_data({"contributionsCollection": raw_user.get(f"y{year}") or {}})
+                    for year in missing_by_user[i]
+                }
+                # A null alias means the year failed (timeout, partial error), not that it was
+                # empty; only complete closed years without errors of their own are cached
+                if self.cache and () not in failed and (f"u{i}",) not in failed:
+                    self.cache.put_years(user, {
+                        y: d for y, d in fetched.items()
+                        if y < current_year and raw_user.get(f"y{y}") is not None
+                        and (f"u{i}", f"y{y}") not in failed
+                    })
+
+                by_year = {**cached_by_user[i], **fetched}
+                year_results = [by_year[year] for year in years]
+                additional_user_data = self._parse_additional_user_data(raw_user)
+                results[user] = self._merge_years(year_results, additional_user_data)
+
+        return results
+
+    def build_batch_query(self, users: List[str], years: List[List[int]]) -> str:
         """
-        query = """
-        query($user: String!) {
-          user(login: $user) {
-            repositories(first: 100) {
+        Builds a GraphQL document with one `u<i>` alias per user and, inside it, one
+        `y<year>` contributionsCollection alias per year plus the repositories field.
+
+        Args:
+            users (List[str]): GitHub usernames (passed as the $u<i> variables).
+            years (List[List[int]]): Calendar years to fetch for each user.
+
+        Returns:
+            str: The GraphQL query document.
+        """
+        variables = ", ".join(f"$u{i}: String!" for i in range(len(users)))
+        user_blocks = []
+        for i in range(len(users)):
+            year_blocks = "".join(
+                f"""
+            y{year}: contributionsCollection(from: "{year}-01-01T00:00:00Z", to: "{year}-12-31T23:59:59Z") {{
+              {self.CONTRIBUTION_FIELDS}
+            }}"""
+                for year in years[i]
+            )
+            user_blocks.append(f"""
+          u{i}: user(login: $u{i}) {{{year_blocks}
+            repositories(first: 100) {{
               totalCount
-              nodes {
-                primaryLanguage {
+              nodes {{
+                primaryLanguage {{
                   name
-                }
-              }
-            }
-          }
-        }
+                }}
+              }}
+            }}
+          }}""")
+        return f"query({variables}) {{{''.join(user_blocks)}\n}}"
+
+    def _run_batch_query(self, users: List[str], years: List[List[int]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
+        Sends the aliased query for a batch of users.
 
-        variables = {
-            "user": user
-        }
+        Args:
+            users (List[str]): GitHub usernames.
+            years (List[List[int]]): Calendar years to fetch for each user.
+
+        Returns:
+            Tuple[Dict[str, Any], List[Dict[str, Any]]]: The `data` object of the response, keyed
+            by `u<i>` aliases, and the partial GraphQL errors it carried (empty if none).
+
+        Raises:
+            RuntimeError: If the request did not return HTTP 200.
+        """
+        query = self.build_batch_query(users, years)
+        variables = {f"u{i}": user for i, user in enumerate(users)}
 
         url = "https://api.github.com/graphql"
+        if self.budget:
+            self.budget.acquire()
         response = requests.post(url, json={'query': query, 'variables': variables}, headers=self.headers)
+        if self.budget:
+            self.budget.update(response.headers)
 
-        if response.status_code == 200:
-            data = response.json()
-            if "errors" in data:
-                print(f"Error fetching additional data for user {user}: {data['errors']}")
-                return {"repositories": 0, "primary_language": "N/A"}
-            
-            user_data = data.get("data", {}).get("user", {})
-            if not user_data:
-                print(f"User not found or no data available: {user}")
-                return {"repositories": 0, "primary_language": "N/A"}
-
-            repositories = user_data.get("repositories", {}).get("totalCount", 0)
-
-            languages = {}
-            for repo in user_data.get("repositories", {}).get("nodes", []):
-                primary_language = repo.get("primaryLanguage")
-                if primary_language is not None:
-                    language = primary_language.get("name")
-                    if language:
-                        languages[language] = languages.get(language, 0) + 1
-
-            primary_language = max(languages, key=languages.get) if languages else "N/A"
-
-            return {
-                "repositories": repositories,
-                "primary_language": primary_language
-            }
-        else:
-            print(f"Error fetching additional data for user {user}: {response.status_code} {response.text}")
-            return {"repositories": 0, "primary_language": "N/A"}
+        if response.status_code != 200:
+            raise RuntimeError(f"Error fetching data for users {', '.join(users)}: {response.status_code} {response.text}")
+
+        data = response.json()
+        errors = data.get("errors") or []
+        if errors:
+            # Unknown logins come back as errors for their alias; the other users still have data
+            print(f"Errors fetching data for users {', '.join(users)}: {errors}")
+        return data.get("data") or {}, errors
+
+    @staticmethod
+    def _merge_years(year_results: List[Dict[str, Any]], additional_user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Aggregates per-year parsed data into the totals returned by get_user_data.
+
+        Args:
+            year_results (List[Dict[str, Any]]): Parsed data for each year.
+            additional_user_data (Dict[str, Any]): Repositories and primary language.
+
+        Returns:
+            Dict[str, Any]: Aggregated user data.
+        """
+        total_contributions = 0
+        monthly_contributions = defaultdict(int)
+        contribution_types = defaultdict(int)
+
+        for user_data_for_year in year_results:
+            total_contributions += user_data_for_year["contributions"]
+            for month, count in user_data_for_year["monthly_contributions"].items():
+                monthly_contributions[month] += count
+            for key, count in user_data_for_year["contribution_types"].items():
+                contribution_types[key] += count
+
+        return {
+            "contributions": total_contributions,
+            "repositories": additional_user_data["repositories"],
+            "primary_language": additional_user_data["primary_language"],
+            "monthly_contributions": dict(monthly_contributions),
+            "contribution_types": dict(contribution_types)
+        }
+    
+    @staticmethod
+    def _parse_additional_user_data(user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extracts the repository count and the most frequent primary language.
+
+        Args:
+            user_data (Dict[str, Any]): Raw GitHub user data containing the repositories field.
+
+        Returns:
+            Dict[str, Any]: Repositories and primary language.
+        """
+        repositories = (user_data.get("repositories") or {}).get("totalCount", 0)
+
+        languages = {}
+        for repo in (user_data.get("repositories") or {}).get("nodes", []):
+            primary_language = repo.get("primaryLanguage")
+            if primary_language is not None:
+                language = primary_language.get("name")
+                if language:
+                    languages[language] = languages.get(language, 0) + 1
+
+        primary_language = max(languages, key=languages.get) if languages else "N/A"
+
+        return {
+            "repositories": repositories,
+            "primary_language": primary_language
+        }
 
 
     def _parse_user_data(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -220,12 +367,8 @@ class GitHubUserData:
         
         weekly_contributions = user_data.get("contributionsCollection", {}).get("contributionCalendar", {}).get("weeks", [])
         
-        monthly_contributions = defaultdict(int)
-        for week in weekly_contributions:
-            for day in week.get("contributionDays", []):
-                date = datetime.datetime.strptime(day["date"], "%Y-%m-%d")
-                month = date.strftime("%Y-%m")
-                monthly_contributions[month] += day["contributionCount"]
+        months, counts = self.monthly_contribution_series(weekly_contributions)
+        monthly_contributions = dict(zip(months.astype(str).tolist(), counts.tolist()))
         
         contribution_types = {
             "commits": sum(repo["contributions"]["totalCount"] for repo in user_data.get("contributionsCollection", {}).get("commitContributionsByRepository", [])),
@@ -242,6 +385,33 @@ class GitHubUserData:
             "contribution_types": contribution_types
         }
 
+    @staticmethod
+    def monthly_contribution_series(weeks: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Buckets a contribution calendar by month without per-day date parsing in Python:
+        the dates are parsed once as datetime64[D], truncated to datetime64[M] and summed
+        with bincount.
+
+        Args:
+            weeks (List[Dict[str, Any]]): The contributionCalendar weeks.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Dense datetime64[M] months (first to last month of the
+                                           calendar) and the contribution count of each month.
+        """
+        days = [day for week in weeks for day in week.get("contributionDays", [])]
+        if not days:
+            return np.array([], dtype="datetime64[M]"), np.array([], dtype=np.int64)
+
+        dates = np.array([day["date"] for day in days], dtype="datetime64[D]")
+        day_counts = np.fromiter((day["contributionCount"] for day in days), dtype=np.int64, count=len(days))
+
+        months = dates.astype("datetime64[M]")
+        first = months.min()
+        offsets = (months - first).astype(np.int64)
+        counts = np.bincount(offsets, weights=day_counts).astype(np.int64)
+        return np.arange(first, first + len(counts)), counts
+
     @staticmethod
     def _empty_user_data() -> Dict[str, Any]:
         """
@@ -258,18 +428,74 @@ class GitHubUserData:
             "contribution_types": {}
         }
 
+class RateLimitBudget:
+    def __init__(self, min_interval: float = 0.0, reserve: int = 50):
+        """
+        Initializes a rate-limit budget shared by every worker thread.
+
+        Args:
+            min_interval (float): Minimum number of seconds between two requests.
+            reserve (int): Remaining-quota threshold under which requests wait for the reset.
+        """
+        self.min_interval = min_interval
+        self.reserve = reserve
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request can be sent without exhausting the budget.
+        """
+        with self._lock:
+            now = time.time()
+            if self.remaining is not None and self.remaining <= self.reserve and self.reset_at:
+                wait = self.reset_at - now + 1
+                if wait > 0:
+                    print(f"Rate limit budget exhausted ({self.remaining} left). Waiting {wait:.0f}s...")
+                    time.sleep(wait)
+                    now = time.time()
+                self.remaining = None
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def update(self, headers: Dict[str, str]):
+        """
+        Updates the budget from GitHub's X-RateLimit-* response headers.
+
+        Args:
+            headers (Dict[str, str]): Response headers.
+        """
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+
+
 class CSVProcessor:
-    def __init__(self, input_csv: str, output_csv: str):
+    FIELDNAMES = ["user", "contributions", "repositories", "primary_language", "monthly_contributions", "contribution_types"]
+
+    def __init__(self, input_csv: str, output_csv: str, resume: bool = False):
         """
         Initializes the class with the input and output CSV filenames.
 
         Args:
             input_csv (str): Name of the input CSV file.
             output_csv (str): Name of the output CSV file.
+            resume (bool): Keeps an existing output file so a partial run can be continued.
         """
         self.input_csv = input_csv
         self.output_csv = output_csv
-        self._initialize_csv()
+        self._file = None
+        self._writer = None
+        if not (resume and os.path.exists(self.output_csv)):
+            self._initialize_csv()
 
     def _initialize_csv(self):
         """
@@ -277,8 +503,7 @@ class CSVProcessor:
         This method is called at the beginning to ensure the file exists and has a header.
         """
         with open(self.output_csv, mode='w', newline='') as file:
-            fieldnames = ["user", "contributions", "repositories", "primary_language", "monthly_contributions", "contribution_types"]
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer = csv.DictWriter(file, fieldnames=self.FIELDNAMES)
             writer.writeheader()
 
     def read_users(self) -> List[str]:
@@ -292,6 +517,43 @@ class CSVProcessor:
             reader = csv.reader(file)
             return [row[0] for row in reader]
 
+    def read_written_rows(self) -> List[Dict[str, str]]:
+        """
+        Reads the rows already flushed to the output CSV, one per user (the last one wins).
+
+        Returns:
+            List[Dict[str, str]]: Rows with str(dict) cells, as written by write_user_data.
+        """
+        if not os.path.exists(self.output_csv):
+            return []
+        with open(self.output_csv, mode='r', newline='') as file:
+            rows = {row["user"]: row for row in csv.DictReader(file) if row.get("user")}
+        return list(rows.values())
+
+    def open(self):
+        """
+        Opens a single buffered handle used by every following write_user_data call.
+        """
+        if self._file is None:
+            self._file = open(self.output_csv, mode='a', newline='', buffering=1 << 16)
+            self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDNAMES)
+
+    def flush(self):
+        """
+        Flushes buffered rows to disk (called after each batch, so the output stays resumable).
+        """
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """
+        Flushes and closes the buffered handle.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
     def write_user_data(self, result: Dict[str, Any]):
         """
         Writes a single user's data to the output CSV file.
@@ -299,18 +561,22 @@ class CSVProcessor:
         Args:
             result (Dict[str, Any]): Dictionary containing the user's data.
         """
-        with open(self.output_csv, mode='a', newline='') as file:  # Use 'a' to append data
-            fieldnames = ["user", "contributions", "repositories", "primary_language", "monthly_contributions", "contribution_types"]
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            result["monthly_contributions"] = str(result["monthly_contributions"])
-            result["contribution_types"] = str(result["contribution_types"])
-            writer.writerow(result)
+        result["monthly_contributions"] = str(result["monthly_contributions"])
+        result["contribution_types"] = str(result["contribution_types"])
+
+        if self._writer is not None:
+            self._writer.writerow(result)
+        else:
+            with open(self.output_csv, mode='a', newline='') as file:  # Use 'a' to append data
+                writer = csv.DictWriter(file, fieldnames=self.FIELDNAMES)
+                writer.writerow(result)
 
         print(f"User data for {result['user']} saved to {self.output_csv}.")
 
 
 class GitHubContributorSummary:
-    def __init__(self, token: str, input_csv: str, output_csv: str):
+    def __init__(self, token: str, input_csv: str, output_csv: str, cache_path: Optional[str] = None,
+                 resume: bool = False, budget: Optional[RateLimitBudget] = None):
         """
         Initializes the class with the GitHub authentication token, input, and output CSV filenames.
 
@@ -318,35 +584,175 @@ class GitHubContributorSummary:
             token (str): GitHub authentication token.
             input_csv (str): Name of the input CSV file.
             output_csv (str): Name of the output CSV file.
+            cache_path (Optional[str]): SQLite file used to cache closed contribution years.
+            resume (bool): Skips users already present in the output matrix (NPZ) file.
+            budget (Optional[RateLimitBudget]): Rate-limit budget shared by the workers.
         """
-        self.github_user_data = GitHubUserData(token)
-        self.csv_processor = CSVProcessor(input_csv, output_csv)
-
-    def generate_summary(self):
+        cache = ContributionCache(cache_path) if cache_path else None
+        self.github_user_data = GitHubUserData(token, cache, budget)
+        self.csv_processor = CSVProcessor(input_csv, output_csv, resume)
+        self.resume = resume
+        self.matrix_path = os.path.splitext(output_csv)[0] + ".npz"
+        self._rows = []
+
+    def generate_summary(self, workers: int = 1):
         """
-        Generates a summary of GitHub contributors' data and writes it to the output CSV file
-        immediately after processing each user's data.
+        Generates a summary of GitHub contributors' data and writes it to the output CSV file.
+        Users are fetched in batches of USERS_PER_REQUEST (one GraphQL request per batch).
+
+        With workers > 1, batches are fetched concurrently by a bounded thread pool and
+        written in input order through a single buffered writer, flushed after each batch.
+
+        Args:
+            workers (int): Number of concurrent requests.
         """
         users = self.csv_processor.read_users()
-        for user in users:
-            try:
-                user_data = self.github_user_data.get_user_data(user)
-                result = {
-                    "user": user,
-                    "contributions": user_data["contributions"],
-                    "repositories": user_data["repositories"],
-                    "primary_language": user_data["primary_language"],
-                    "monthly_contributions": user_data["monthly_contributions"],
-                    "contribution_types": user_data["contribution_types"]
-                }
-                self.csv_processor.write_user_data(result)
-            except Exception as e:
-                print(f"Error processing user {user}: {e}")
+        previous = self._previous_matrix() if self.resume else None
+        if previous is not None:
+            processed = set(previous.users.tolist())
+            users = [user for user in users if user not in processed]
+            print(f"Resuming: {len(processed)} users already processed, {len(users)} remaining.")
+
+        batch_size = self.github_user_data.USERS_PER_REQUEST
+        batches = [users[start:start + batch_size] for start in range(0, len(users), batch_size)]
+
+        self.csv_processor.open()
+        try:
+            if workers <= 1:
+                results = ((batch, self._fetch_batch(batch)) for batch in batches)
+                self._write_batches(results)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    self._write_batches(self._ordered_results(executor, batches, workers))
+        finally:
+            self.csv_processor.close()
+            # Also on interruption, so the users written so far are skipped by a resumed run
+            self.write_matrix(previous)
+
+    def _previous_matrix(self) -> Optional[ContributionMatrix]:
+        """
+        Returns the users written by earlier runs: the NPZ file plus the CSV rows of users
+        it lacks. The NPZ is only rewritten when a run ends, so after a hard kill (or for
+        output written before the NPZ existed) the rows flushed to the CSV are ahead of it;
+        recovering them here keeps those users from being fetched and written twice.
+
+        Returns:
+            Optional[ContributionMatrix]: The previous matrix, or None on a fresh start.
+        """
+        matrices = []
+        if os.path.exists(self.matrix_path):
+            matrices.append(ContributionMatrix.load(self.matrix_path))
+        known = set(matrices[0].users.tolist()) if matrices else set()
+        missing = [row for row in self.csv_processor.read_written_rows() if row["user"] not in known]
+        if missing:
+            print(f"Recovering {len(missing)} users from {self.csv_processor.output_csv} missing in {self.matrix_path}.")
+            matrices.append(ContributionMatrix.from_rows(missing))
+        return ContributionMatrix.concat(matrices) if matrices else None
+
+    def write_matrix(self, previous: Optional[ContributionMatrix] = None, path: Optional[str] = None):
+        """
+        Saves the rows fetched in this run, appended to those of earlier resumed runs, in
+        columnar form: a users x months matrix in an NPZ file, the artifact read by the analyses.
+
+        Args:
+            previous (Optional[ContributionMatrix]): Users written by earlier runs.
+            path (Optional[str]): Output .npz file. Defaults to the output CSV path with .npz.
+        """
+        path = path or self.matrix_path
+        matrix = ContributionMatrix.from_rows(self._rows)
+        if previous is not None:
+            matrix = ContributionMatrix.concat([previous, matrix])
+        matrix.save(path)
+        print(f"Monthly contributions matrix ({len(matrix.users)} users, {len(matrix.months)} months) saved to {path}.")
+
+    def _fetch_batch(self, batch: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Fetches one batch of users, returning None if the request failed.
+
+        Args:
+            batch (List[str]): GitHub usernames.
+
+        Returns:
+            Optional[Dict[str, Dict[str, Any]]]: User data keyed by username.
+        """
+        try:
+            return self.github_user_data.get_users_data(batch)
+        except Exception as e:
+            print(f"Error processing users {', '.join(batch)}: {e}")
+            return None
+
+    def _ordered_results(self, executor: ThreadPoolExecutor, batches: List[List[str]], workers: int):
+        """
+        Yields (batch, data) in input order while keeping at most 2 * workers batches in flight.
+
+        Args:
+            executor (ThreadPoolExecutor): Worker pool.
+            batches (List[List[str]]): Batches of usernames.
+            workers (int): Number of workers.
+        """
+        pending = deque()
+        batch_iter = iter(batches)
+        for batch in batch_iter:
+            pending.append((batch, executor.submit(self._fetch_batch, batch)))
+            if len(pending) >= 2 * workers:
+                break
+
+        while pending:
+            batch, future = pending.popleft()
+            yield batch, future.result()
+            next_batch = next(batch_iter, None)
+            if next_batch is not None:
+                pending.append((next_batch, executor.submit(self._fetch_batch, next_batch)))
+
+    def _write_batches(self, results):
+        """
+        Writes fetched batches and flushes after each one. Failed batches are skipped,
+        so a later run with resume=True fetches them again.
+
+        Args:
+            results: Iterable of (batch, data) pairs.
+        """
+        for batch, batch_data in results:
+            if batch_data is None:
+                continue
+            for user in batch:
+                self._write_user(user, batch_data[user])
+            self.csv_processor.flush()
+
+    def _write_user(self, user: str, user_data: Dict[str, Any]):
+        """
+        Writes one user's fetched data to the output CSV file.
+
+        Args:
+            user (str): GitHub username.
+            user_data (Dict[str, Any]): Data returned by GitHubUserData.
+        """
+        try:
+            result = {
+                "user": user,
+                "contributions": user_data["contributions"],
+                "repositories": user_data["repositories"],
+                "primary_language": user_data["primary_language"],
+                "monthly_contributions": user_data["monthly_contributions"],
+                "contribution_types": user_data["contribution_types"]
+            }
+            # write_user_data turns the dicts into strings, so the matrix keeps its own copy
+            self._rows.append(dict(result))
+            self.csv_processor.write_user_data(result)
+        except Exception as e:
+            print(f"Error processing user {user}: {e}")
 
 if __name__ == '__main__':
     token = 'token'
     input_csv = 'output_users.csv'
     output_csv = 'output_contribution.csv'
-
-    summary_generator = GitHubContributorSummary(token, input_csv, output_csv)
-    summary_generator.generate_summary()
+    cache_path = 'contributions_cache.sqlite'
+    workers = 4
+    # Without --resume the output CSV is recreated; with it, users already written are skipped
+    resume = '--resume' in sys.argv[1:]
+
+    summary_generator = GitHubContributorSummary(
+        token, input_csv, output_csv, cache_path,
+        resume=resume, budget=RateLimitBudget(min_interval=0.25)
+    )
+    summary_generator.generate_summary(workers=workers)
@@ -1,10 +1,89 @@
 import requests
 import csv
+import json
+import sqlite3
+import threading
 import time
-from typing import List, Set, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set, Dict, Any, Optional, Tuple
+
+class ETagCache:
+    def __init__(self, path: str):
+        """
+        Initializes a persistent store of REST responses keyed by request URL (including
+        query parameters), with the validators needed for conditional requests.
+
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    next_url TEXT,
+                    body TEXT NOT NULL
+                )
+                """
+            )
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored response for a URL.
+
+        Args:
+            url (str): Full request URL.
+
+        Returns:
+            Optional[Dict[str, Any]]: etag, last_modified, next_url and body, or None if not stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, next_url, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, next_url, body = row
+        return {'etag': etag, 'last_modified': last_modified, 'next_url': next_url, 'body': json.loads(body)}
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            next_url: Optional[str], body: Any):
+        """
+        Stores a response and its validators, replacing the previous entry.
+
+        Args:
+            url (str): Full request URL.
+            etag (Optional[str]): ETag response header.
+            last_modified (Optional[str]): Last-Modified response header.
+            next_url (Optional[str]): URL of the next page, if any.
+            body (Any): Decoded JSON body.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, next_url, body) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, next_url, json.dumps(body))
+            )
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
 
 class GitHubContributors:
-    def __init__(self, token: str, organization: str, start_date: str, end_date: str, output_csv: str):
+    GRAPHQL_URL = 'https://api.github.com/graphql'
+    REPOS_PER_REQUEST = 10
+    MAX_RETRIES = 4
+
+    def __init__(self, token: str, organization: str, start_date: str, end_date: str, output_csv: str,
+                 etag_cache: Optional[ETagCache] = None):
         """
         Initializes the class with GitHub authentication credentials and other parameters.
 
@@ -14,6 +93,7 @@ class GitHubContributors:
             start_date (str): Start date in ISO 8601 format.
             end_date (str): End date in ISO 8601 format.
             output_csv (str): The name of the output CSV file.
+            etag_cache (Optional[ETagCache]): Store used for conditional REST requests.
         """
         self.headers = {
             'Authorization': f'token {token}',
@@ -23,6 +103,46 @@ class GitHubContributors:
         self.start_date = start_date
         self.end_date = end_date
         self.output_csv = output_csv
+        self.etag_cache = etag_cache
+
+    def _get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[str]]:
+        """
+        Fetches one REST page. With an ETag cache, the stored validators are sent as
+        If-None-Match / If-Modified-Since; a 304 Not Modified answer (which does not count
+        against the rate limit) is served from the cache.
+
+        Args:
+            url (str): Page URL.
+            params (Optional[Dict[str, Any]]): Query parameters.
+
+        Returns:
+            Tuple[Any, Optional[str]]: Decoded JSON body and the URL of the next page.
+
+        Raises:
+            requests.exceptions.HTTPError: If the request fails.
+        """
+        if self.etag_cache is None:
+            response = requests.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            return response.json(), response.links.get('next', {}).get('url')
+
+        key = requests.Request('GET', url, params=params).prepare().url
+        cached = self.etag_cache.get(key)
+        headers = dict(self.headers)
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = requests.get(url, headers=headers, params=params)
+        if response.status_code == 304 and cached:
+            return cached['body'], cached['next_url']
+        response.raise_for_status()
+        body = response.json()
+        next_url = response.links.get('next', {}).get('url')
+        self.etag_cache.put(key, response.headers.get('ETag'), response.headers.get('Last-Modified'), next_url, body)
+        return body, next_url
 
     def get_repositories(self) -> List[str]:
         """
@@ -34,10 +154,8 @@ class GitHubContributors:
         repos = []
         url = f'https://api.github.com/orgs/{self.organization}/repos'
         while url:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            repos.extend(response.json())
-            url = response.links.get('next', {}).get('url')
+            page, url = self._get_page(url)
+            repos.extend(page)
         return [repo['name'] for repo in repos]
 
     def get_commits(self, repo: str) -> List[Dict[str, Any]]:
@@ -62,10 +180,8 @@ class GitHubContributors:
             success = False
             while attempts < 2 and not success:
                 try:
-                    response = requests.get(url, headers=self.headers, params=params)
-                    response.raise_for_status()
-                    commits.extend(response.json())
-                    url = response.links.get('next', {}).get('url')
+                    page, url = self._get_page(url, params)
+                    commits.extend(page)
                     success = True
                 except requests.exceptions.RequestException as e:
                     attempts += 1
@@ -94,6 +210,116 @@ class GitHubContributors:
                 contributors.add(commit['author']['login'])
         return contributors
 
+    def build_history_query(self, repos: List[str]) -> str:
+        """
+        Builds one GraphQL query reading the default-branch history of several repositories,
+        one alias (r0, r1, ...) per repository, requesting only the author login of each commit.
+
+        Args:
+            repos (List[str]): Repository names.
+
+        Returns:
+            str: The GraphQL query. Variables: owner, since, until, n<i> (name) and c<i> (cursor).
+        """
+        variables = ['$owner: String!', '$since: GitTimestamp!', '$until: GitTimestamp!']
+        fields = []
+        for i in range(len(repos)):
+            variables.append(f'$n{i}: String!')
+            variables.append(f'$c{i}: String')
+            fields.append(f"""
+            r{i}: repository(owner: $owner, name: $n{i}) {{
+                defaultBranchRef {{
+                    target {{
+                        ... on Commit {{
+                            history(first: 100, since: $since, until: $until, after: $c{i}) {{
+                                pageInfo {{ hasNextPage endCursor }}
+                                nodes {{ author {{ user {{ login }} }} }}
+                            }}
+                        }}
+                    }}
+                }}
+            }}""")
+        return f"query({', '.join(variables)}) {{{''.join(fields)}\n}}"
+
+    def _post_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Sends a GraphQL request, retrying with exponential backoff. Waits for the
+        rate-limit reset when the API reports the limit as exhausted.
+
+        Args:
+            query (str): The GraphQL query.
+            variables (Dict[str, Any]): Query variables.
+
+        Returns:
+            Dict[str, Any]: The `data` field of the response.
+
+        Raises:
+            RuntimeError: If the request still fails after MAX_RETRIES attempts.
+        """
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                response = requests.post(self.GRAPHQL_URL, json={'query': query, 'variables': variables},
+                                         headers=self.headers, timeout=60)
+                if response.status_code == 200:
+                    body = response.json()
+                    if body.get('data') is not None:
+                        # Missing repositories come back as partial errors with a null alias
+                        return body['data']
+                    error = body.get('errors')
+                else:
+                    error = f'{response.status_code} {response.text[:200]}'
+                    if response.headers.get('X-RateLimit-Remaining') == '0':
+                        reset = int(response.headers.get('X-RateLimit-Reset', time.time() + 60))
+                        time.sleep(max(reset - time.time(), 0) + 1)
+                        continue
+            except requests.exceptions.RequestException as e:
+                error = e
+            delay = 2 ** attempt
+            print(f"GraphQL request failed ({error}); retrying in {delay}s ({attempt + 1}/{self.MAX_RETRIES})...")
+            time.sleep(delay)
+        raise RuntimeError(f"GraphQL request failed after {self.MAX_RETRIES} attempts")
+
+    def get_contributors_graphql(self, repos: List[str]) -> Set[str]:
+        """
+        Retrieves the contributors of several repositories through GraphQL. Each request
+        reads one page of history for up to REPOS_PER_REQUEST repositories; repositories
+        with more pages are carried over to the next request with their cursor.
+
+        Args:
+            repos (List[str]): Repository names.
+
+        Returns:
+            Set[str]: A set of contributor usernames.
+        """
+        contributors = set()
+        pending: List[Tuple[str, Optional[str]]] = [(repo, None) for repo in repos]
+        while pending:
+            batch = pending[:self.REPOS_PER_REQUEST]
+            pending = pending[self.REPOS_PER_REQUEST:]
+            variables = {'owner': self.organization, 'since': self.start_date, 'until': self.end_date}
+            for i, (repo, cursor) in enumerate(batch):
+                variables[f'n{i}'] = repo
+                variables[f'c{i}'] = cursor
+            try:
+                data = self._post_graphql(self.build_history_query([repo for repo, _ in batch]), variables)
+            except RuntimeError as e:
+                print(f"Error fetching commits from repositories {', '.join(repo for repo, _ in batch)}: {e}")
+                continue
+
+            for i, (repo, _) in enumerate(batch):
+                branch = (data.get(f'r{i}') or {}).get('defaultBranchRef')
+                # Empty or inaccessible repository, or a default branch not pointing to a Commit
+                history = ((branch or {}).get('target') or {}).get('history')
+                if not history:
+                    continue
+                for node in history['nodes']:
+                    user = (node.get('author') or {}).get('user')
+                    if user:
+                        contributors.add(user['login'])
+                if history['pageInfo']['hasNextPage']:
+                    pending.append((repo, history['pageInfo']['endCursor']))
+        return contributors
+
     def save_to_csv(self, contributors: Set[str]):
         """
         Saves the list of contributors to a CSV file.
@@ -108,17 +334,31 @@ class GitHubContributors:
                 writer.writerow([contributor])
         print(f'Successfully written to {self.output_csv}')
 
-    def run(self):
+    def run(self, backend: str = 'graphql', workers: int = 4):
         """
         Runs the complete process of retrieving contributors and saving them to a CSV.
+
+        Args:
+            backend (str): 'graphql' reads only commit author logins, batched across repositories
+                and split among `workers` threads; 'rest' pages through full REST commit objects.
+            workers (int): Number of concurrent GraphQL workers.
         """
         all_contributors = set()
         repositories = self.get_repositories()
-        for repo in repositories:
-            print(f'Processing repository: {repo}')
-            commits = self.get_commits(repo)
-            contributors = self.get_contributors(commits)
-            all_contributors.update(contributors)
+        if backend == 'graphql':
+            print(f'Processing {len(repositories)} repositories with {workers} workers')
+            groups = [repositories[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for contributors in executor.map(self.get_contributors_graphql, groups):
+                    all_contributors.update(contributors)
+        elif backend == 'rest':
+            for repo in repositories:
+                print(f'Processing repository: {repo}')
+                commits = self.get_commits(repo)
+                contributors = self.get_contributors(commits)
+                all_contributors.update(contributors)
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
         self.save_to_csv(all_contributors)
 
 if __name__ == '__main__':
@@ -127,6 +367,8 @@ if __name__ == '__main__':
     start_date = '2017-01-01T00:00:00Z'
     end_date = '2024-07-01T23:59:59Z'
     output_csv = 'output_users.csv'
+    etag_cache = ETagCache('rest_cache.sqlite')
 
-    github_contributors = GitHubContributors(token, organization, start_date, end_date, output_csv)
+    github_contributors = GitHubContributors(token, organization, start_date, end_date, output_csv, etag_cache)
     github_contributors.run()
+    etag_cache.close()
@@ -1,15 +1,35 @@
+import { useEffect, useState } from 'react';
 import InteractionGraph from './components/InteractionGraph';
+import { GRAPH_API_URL, fetchNeighborhood } from './utils/graphApi';
 
-// Importa o JSON diretamente. 
-// O Vite cuida de transformar isso num objeto JS automaticamente.
-import graphData from './data/graph_interactions.json';
-
+// Com VITE_GRAPH_API e ?focus=<usuário> na URL, busca só a vizinhança no graph_server.py.
+// Caso contrário, importa o JSON completo (o Vite separa num chunk carregado sob demanda).
 function App() {
+  const [graphData, setGraphData] = useState<any>(null);
+
+  useEffect(() => {
+    const loadStaticGraph = () =>
+      import('./data/graph_interactions.json').then(module => setGraphData(module.default));
+    const focus = new URLSearchParams(window.location.search).get('focus');
+
+    if (GRAPH_API_URL && focus) {
+      fetchNeighborhood(focus, 2)
+        .then(setGraphData)
+        .catch(error => {
+          // Servidor fora do ar ou usuário inexistente: cai para o grafo estático
+          console.error(error);
+          loadStaticGraph();
+        });
+    } else {
+      loadStaticGraph();
+    }
+  }, []);
+
   return (
     <div className="App">
-       <InteractionGraph data={graphData as any} />
+       {graphData && <InteractionGraph data={graphData as any} />}
     </div>
   )
 }
 
-export default App
\ No newline at end of file
+export default App
@@ -54,8 +54,17 @@ export default function InteractionGraph({ data }: { data: GraphData }) {
   // Estado contador para forçar redesenho
   const [, setImagesLoaded] = useState(0);
 
+  // Layout pré-calculado pelo graph/scripts/layout_graph.py (x/y em todos os nós)
+  const hasLayout = useMemo(
+    () => data.nodes.length > 0 && data.nodes.every(n => typeof n.x === 'number' && typeof n.y === 'number'),
+    [data]
+  );
+
   // --- CONFIGURAÇÃO DE FÍSICA (ESPAÇAMENTO) ---
   useEffect(() => {
+    // Com layout pronto não há simulação para reaquecer
+    if (hasLayout) return;
+
     // Pequeno delay para garantir que o engine inicializou
     const timer = setTimeout(() => {
       if (fgRef.current) {
@@ -70,7 +79,7 @@ export default function InteractionGraph({ data }: { data: GraphData }) {
       }
     }, 100);
     return () => clearTimeout(timer);
-  }, []); // Roda apenas uma vez na montagem
+  }, [hasLayout]); // Roda apenas uma vez na montagem
 
   // --- PRÉ-CARREGAMENTO SIMPLIFICADO ---
   useEffect(() => {
@@ -201,7 +210,8 @@ export default function InteractionGraph({ data }: { data: GraphData }) {
         onLinkHover={(link: any) => setHoverLink(link)}
 
         // Aumentei o cooldownTicks para a animação ter tempo de estabilizar na posição nova
-        cooldownTicks={200}
+        // (sem simulação quando o layout já vem calculado)
+        cooldownTicks={hasLayout ? 0 : 200}
         onEngineStop={() => fgRef.current.zoomToFit(400)}
       />
 
@@ -0,0 +1,151 @@
+// Decodificador do formato binário colunar gerado por graph/scripts/export_binary.py.
+// Todas as seções são little-endian e alinhadas em 4 bytes, então as colunas
+// viram TypedArrays direto sobre o buffer, sem cópia.
+
+const MAGIC = 'EBLG';
+const VERSION = 1;
+const FLAG_LAYOUT = 1;
+const NO_STRING = 0xffffffff;
+
+class Reader {
+  private view: DataView;
+  private buffer: ArrayBuffer;
+  pos = 0;
+
+  constructor(buffer: ArrayBuffer) {
+    this.buffer = buffer;
+    this.view = new DataView(buffer);
+  }
+
+  u32(): number {
+    const value = this.view.getUint32(this.pos, true);
+    this.pos += 4;
+    return value;
+  }
+
+  u32Array(count: number): Uint32Array {
+    const arr = new Uint32Array(this.buffer, this.pos, count);
+    this.pos += 4 * count;
+    return arr;
+  }
+
+  f32Array(count: number): Float32Array {
+    const arr = new Float32Array(this.buffer, this.pos, count);
+    this.pos += 4 * count;
+    return arr;
+  }
+
+  bytes(size: number): Uint8Array {
+    const arr = new Uint8Array(this.buffer, this.pos, size);
+    this.pos += size + ((4 - (size % 4)) % 4);
+    return arr;
+  }
+}
+
+const isoFromEpoch = (seconds: number) =>
+  seconds ? new Date(seconds * 1000).toISOString().replace('.000Z', 'Z') : null;
+
+export function decodeGraph(buffer: ArrayBuffer) {
+  const r = new Reader(buffer);
+  const text = new TextDecoder();
+
+  if (text.decode(r.bytes(4)) !== MAGIC) throw new Error('Arquivo não está no formato EBLG');
+  const version = r.u32();
+  if (version !== VERSION) throw new Error(`Versão ${version} não suportada`);
+  const flags = r.u32();
+  const nStrings = r.u32();
+  const blobSize = r.u32();
+  const stringOffsets = r.u32Array(nStrings + 1);
+  const blob = r.bytes(blobSize);
+  const strings = new Array<string>(nStrings);
+  for (let i = 0; i < nStrings; i++) {
+    strings[i] = text.decode(blob.subarray(stringOffsets[i], stringOffsets[i + 1]));
+  }
+
+  // --- NÓS ---
+  const nNodes = r.u32();
+  const nExtra = r.u32();
+  const ids = r.u32Array(nNodes);
+  const groups = r.u32Array(nNodes);
+  const vals = r.f32Array(nNodes);
+  const imgs = r.u32Array(nNodes);
+  const sourceOffsets = r.u32Array(nNodes + 1);
+  const sourceValues = r.u32Array(sourceOffsets[nNodes]);
+  const xs = flags & FLAG_LAYOUT ? r.f32Array(nNodes) : null;
+  const ys = flags & FLAG_LAYOUT ? r.f32Array(nNodes) : null;
+  const extras: [string, Float32Array][] = [];
+  for (let e = 0; e < nExtra; e++) {
+    const name = text.decode(r.bytes(r.u32()));
+    extras.push([name, r.f32Array(nNodes)]);
+  }
+
+  const nodes = new Array(nNodes);
+  for (let i = 0; i < nNodes; i++) {
+    const id = strings[ids[i]];
+    const node: Record<string, any> = {
+      id,
+      group: strings[groups[i]],
+      val: vals[i],
+      img: imgs[i] === NO_STRING ? `https://github.com/${id}.png` : strings[imgs[i]],
+      sources: Array.from(sourceValues.subarray(sourceOffsets[i], sourceOffsets[i + 1]), s => strings[s]),
+    };
+    if (xs && ys) {
+      node.x = xs[i];
+      node.y = ys[i];
+    }
+    extras.forEach(([name, column]) => { node[name] = column[i]; });
+    nodes[i] = node;
+  }
+
+  // --- LINKS ---
+  const nLinks = r.u32();
+  const nInter = r.u32();
+  const sources = r.u32Array(nLinks);
+  const targets = r.u32Array(nLinks);
+  const values = r.f32Array(nLinks);
+  const repoOffsets = r.u32Array(nLinks + 1);
+  const repoValues = r.u32Array(repoOffsets[nLinks]);
+  const interOffsets = r.u32Array(nLinks + 1);
+  const actor = r.u32Array(nInter);
+  const target = r.u32Array(nInter);
+  const kind = r.u32Array(nInter);
+  const repo = r.u32Array(nInter);
+  const at = r.u32Array(nInter);
+
+  const links = new Array(nLinks);
+  for (let i = 0; i < nLinks; i++) {
+    const interactions = [];
+    for (let j = interOffsets[i]; j < interOffsets[i + 1]; j++) {
+      interactions.push({
+        actor: strings[actor[j]],
+        target: strings[target[j]],
+        type: strings[kind[j]],
+        repo: strings[repo[j]],
+        at: isoFromEpoch(at[j]),
+      });
+    }
+    links[i] = {
+      source: strings[ids[sources[i]]],
+      target: strings[ids[targets[i]]],
+      value: values[i],
+      shared_repos: Array.from(repoValues.subarray(repoOffsets[i], repoOffsets[i + 1]), s => strings[s]),
+      interactions,
+    };
+  }
+
+  return { nodes, links };
+}
+
+// Busca o .bin (ou .bin.gz sem Content-Encoding, descomprimido no navegador).
+// O .bin.br deve ser servido com Content-Encoding: br, que o navegador decodifica sozinho.
+export async function loadBinaryGraph(url: string) {
+  const response = await fetch(url);
+  if (!response.ok) throw new Error(`Falha ao baixar ${url}: ${response.status}`);
+
+  const gzipped = url.endsWith('.gz') && !response.headers.get('Content-Encoding');
+  const buffer = gzipped
+    ? await new Response(response.body!.pipeThrough(new DecompressionStream('gzip'))).arrayBuffer()
+    : await response.arrayBuffer();
+
+  return decodeGraph(buffer);
+}
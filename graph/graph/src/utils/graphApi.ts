@@ -0,0 +1,27 @@
+// Cliente do graph/scripts/graph_server.py: busca subgrafos sob demanda
+// em vez de carregar o graph_interactions.json inteiro.
+
+export const GRAPH_API_URL: string | undefined = import.meta.env.VITE_GRAPH_API;
+
+async function get<T>(path: string, params: Record<string, string | number | string[]>): Promise<T> {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    (Array.isArray(value) ? value : [value]).forEach(v => query.append(key, String(v)));
+  });
+  const response = await fetch(`${GRAPH_API_URL}${path}?${query}`);
+  if (!response.ok) {
+    throw new Error(`Graph API ${path}: ${response.status}`);
+  }
+  return response.json();
+}
+
+export const fetchEgo = <T>(id: string) => get<T>('/ego', { id });
+
+export const fetchNeighborhood = <T>(id: string, hops = 2) =>
+  get<T>('/neighborhood', { id, k: hops });
+
+export const fetchTopLinks = <T>(k = 20, id?: string) =>
+  get<T>('/top-links', id ? { k, id } : { k });
+
+export const fetchFiltered = <T>(groups: string[] = [], orgs: string[] = []) =>
+  get<T>('/filter', { group: groups, org: orgs });
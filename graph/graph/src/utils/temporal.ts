@@ -0,0 +1,66 @@
+// Snapshots temporais gerados por graph/scripts/etl_graph_processor.py
+// (graph_interactions_temporal.json): grafo base da primeira janela + deltas de peso.
+// Repositórios compartilhados e interações sem data vêm à parte, na camada `static`.
+
+export type TemporalWindow = {
+  name: string;
+  start: string;
+  end: string;
+};
+
+// [source, target, peso] no base e no static e [source, target, variação] nos deltas
+export type WeightedEdge = [string, string, number];
+
+export interface TemporalGraph {
+  windows: TemporalWindow[];
+  nodes: { id: string }[];
+  base: WeightedEdge[];
+  deltas: { window: string; changes: WeightedEdge[] }[];
+  static?: WeightedEdge[];
+}
+
+const edgeKey = (source: string, target: string) => `${source}|${target}`;
+
+// Reconstrói todas as janelas de uma vez (cada uma aplica só o delta sobre a anterior)
+export function buildSnapshots(temporal: TemporalGraph): Map<string, WeightedEdge>[] {
+  if (temporal.windows.length === 0) return [];
+
+  let current = new Map<string, WeightedEdge>();
+  temporal.base.forEach(([s, t, w]) => current.set(edgeKey(s, t), [s, t, w]));
+  const snapshots = [current];
+
+  temporal.deltas.forEach(({ changes }) => {
+    current = new Map(current);
+    changes.forEach(([s, t, diff]) => {
+      const key = edgeKey(s, t);
+      const value = Math.round(((current.get(key)?.[2] ?? 0) + diff) * 1e4) / 1e4;
+      if (value > 0) current.set(key, [s, t, value]);
+      else current.delete(key);
+    });
+    snapshots.push(current);
+  });
+
+  return snapshots;
+}
+
+// Converte um snapshot para o formato { nodes, links } usado pelo InteractionGraph;
+// com includeStatic, soma a camada sem data (desligada por padrão)
+export function snapshotToGraph(
+  temporal: TemporalGraph,
+  snapshot: Map<string, WeightedEdge>,
+  includeStatic = false,
+) {
+  const edges = new Map(snapshot);
+  if (includeStatic) {
+    (temporal.static ?? []).forEach(([s, t, w]) => {
+      const key = edgeKey(s, t);
+      edges.set(key, [s, t, Math.round(((edges.get(key)?.[2] ?? 0) + w) * 1e4) / 1e4]);
+    });
+  }
+  const links = Array.from(edges.values()).map(([source, target, value]) => ({ source, target, value }));
+  const active = new Set(links.flatMap(l => [l.source, l.target]));
+  return {
+    nodes: temporal.nodes.filter(n => active.has(n.id)),
+    links,
+  };
+}
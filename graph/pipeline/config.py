@@ -1,4 +1,6 @@
 import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,12 +13,52 @@ GITLAB_TOKEN = os.getenv("GITLAB_TOKEN", "")
 GITLAB_API_URL = "https://gitlab.com/api/graphql"
 GITLAB_ORG = "lappis-unb"
 
+# Limites de páginas, usados só quando DAYS_LOOKBACK = None
 MAX_COMMIT_PAGES = 4
 MAX_PR_PAGES = 5
 MAX_ISSUE_PAGES = 5
 RATE_LIMIT_DELAY = 0.5
 MAX_PAGES = 5
-DAYS_LOOKBACK = 365  # Janela temporal de contribuições (últimos 365 dias)
+# Janela temporal de contribuições (últimos 365 dias). As conexões são ordenadas por
+# data e a paginação para no primeiro item fora da janela, sem limite de páginas.
+DAYS_LOOKBACK = 365
+
+# Backend dos commits: "graphql" (paginado, limitado a MAX_COMMIT_PAGES) ou
+# "git" (clones parciais locais minerados com git log, sem limite de páginas)
+COMMIT_BACKEND = os.getenv("COMMIT_BACKEND", "graphql")
+GIT_MIRROR_DIR = "data/cache/mirrors"
+GIT_WORKERS = os.cpu_count() or 4
+# E-mails do git log resolvidos para login por requisição (um commit de cada)
+GIT_LOGIN_BATCH_SIZE = 50
+
+# Registros brutos de PRs/MRs (services/extraction.py), compartilhados com
+# metrics/scripts/extract.py: caminho absoluto porque os dois rodam de diretórios
+# diferentes. Com RAW_STORE_OFFLINE=1 nada usa a rede: PRs/MRs, membros, issues, a lista
+# de repositórios e os logins de e-mails vêm do store, e os commits dos clones já em
+# disco; linguagens e branch padrão ficam vazios (ver services/extraction.py).
+RAW_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data/cache/raw_store.sqlite")
+RAW_STORE_OFFLINE = os.getenv("RAW_STORE_OFFLINE") == "1"
+# Projetos GitLab por requisição ao buscar MRs (lotes rejeitados por complexidade
+# são divididos ao meio automaticamente, e o tamanho aceito vale até o fim da sincronização)
+GITLAB_BATCH_SIZE = 5
+
+# Instrumentação (services/telemetry.py): /metrics em localhost:METRICS_PORT durante a
+# extração (desligado se vazio) e relatório da execução em REPORTS_DIR no final
+METRICS_PORT = int(os.getenv("METRICS_PORT") or 0)
+REPORTS_DIR = "data/reports"
+# Saída do modo --profile (common/profiling.py)
+PROFILES_DIR = "data/profiles"
+
+
+def lookback_since() -> Optional[str]:
+    if not DAYS_LOOKBACK:
+        return None
+    since = datetime.now(timezone.utc) - timedelta(days=DAYS_LOOKBACK)
+    return since.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def page_limit(max_pages: int) -> float:
+    return max_pages if not DAYS_LOOKBACK else float("inf")
 
 
 def get_headers(plataform: str) -> dict:
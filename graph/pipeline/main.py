@@ -1,6 +1,13 @@
 import json
-import config
-from services import github_service, gitlab_service
+import os
+import sys
+
+# Raiz do repositório: common/ (--profile) é compartilhado com graph/scripts e metrics/scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+
+import config  # noqa: E402
+from common import profiling  # noqa: E402
+from services import github_service, gitlab_service, telemetry  # noqa: E402
 
 
 def save_json(data, filename):
@@ -11,9 +18,11 @@ def save_json(data, filename):
 
 def main():
     print("Extracting contribution data...\n")
+    telemetry.serve(config.METRICS_PORT)
 
     # 1. Executa GitHub (se configurado)
     if config.GITHUB_TOKEN and config.GITHUB_ORG:
+        profiling.stage(f"github {config.GITHUB_ORG}")
         try:
             print("\n--- GITHUB ---")
             gh_data = github_service.process_organization(config.GITHUB_ORG)
@@ -23,6 +32,7 @@ def main():
 
     # 2. Executa GitLab (se configurado)
     if config.GITLAB_TOKEN and config.GITLAB_ORG:
+        profiling.stage(f"gitlab {config.GITLAB_ORG}")
         try:
             print("\n--- GITLAB ---")
             gl_data = gitlab_service.process_gitlab_group(config.GITLAB_ORG)
@@ -30,6 +40,11 @@ def main():
         except Exception as e:
             print(f"Error GitLab: {e}")
 
+    profiling.stage("report")
+    telemetry.write_report(config.REPORTS_DIR)
+
 
 if __name__ == "__main__":
-    main()
+    # python main.py [--profile]
+    with profiling.session("main", config.PROFILES_DIR):
+        main()
@@ -28,12 +28,12 @@ query ($org: String!, $cursor: String) {
 """
 
 GET_COMMITS = """
-query ($owner: String!, $name: String!, $branch: String!, $cursor: String) {
+query ($owner: String!, $name: String!, $branch: String!, $cursor: String, $since: GitTimestamp) {
   repository(owner: $owner, name: $name) {
     ref(qualifiedName: $branch) {
       target {
         ... on Commit {
-          history(first: 100, after: $cursor) {
+          history(first: 100, after: $cursor, since: $since) {
             pageInfo { endCursor hasNextPage }
             nodes {
               author {
@@ -50,40 +50,78 @@ query ($owner: String!, $name: String!, $branch: String!, $cursor: String) {
 }
 """
 
-GET_PRS = """
-query ($owner: String!, $name: String!, $cursor: String) {
-  repository(owner: $owner, name: $name) {
-    pullRequests(first: 50, after: $cursor, states: [MERGED, CLOSED]) {
-      pageInfo { endCursor hasNextPage }
+# Autor de um commit, um alias por e-mail ($owner<i>, $name<i>, $oid<i>, declarados por
+# services/github_service.py): resolve os e-mails do git log para logins
+COMMIT_AUTHOR_FIELD = """
+  c%(i)s: repository(owner: $owner%(i)s, name: $name%(i)s) {
+    object(oid: $oid%(i)s) {
+      ... on Commit { author { user { login } } }
+    }
+  }
+"""
+
+# Registro bruto de PR (services/extraction.py): superconjunto dos campos usados pelo
+# grafo de interações e pela tabela de métricas (metrics/scripts/extract.py)
+PR_FIELDS = """
+    number title body state createdAt updatedAt mergedAt closedAt
+    additions deletions changedFiles
+    author { login }
+    mergedBy { login }
+    labels(first: 20) {
+      totalCount
+      nodes { name }
+    }
+    commits(first: 100) {
+      totalCount
       nodes {
-        number
-        title
-        state
-        createdAt
-        author { login }
-        mergedBy { login }
-        reviews(first: 10, states: APPROVED) {
-          nodes { author { login } }
+        commit {
+          message
+          author { user { login } }
         }
-        comments(first: 10) {
-          nodes { author { login } }
+      }
+    }
+    reviews(first: 50) {
+      nodes { author { login } state createdAt }
+    }
+    comments(first: 50) {
+      totalCount
+      nodes { author { login } createdAt }
+    }
+    reviewThreads(first: 50) {
+      totalCount
+      nodes {
+        comments(first: 20) {
+          nodes { author { login } createdAt }
         }
       }
     }
+    files(first: 50) {
+      nodes { path }
+    }
+"""
+
+GET_PRS = """
+query ($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 25, after: $cursor, states: [MERGED, CLOSED], orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { endCursor hasNextPage }
+      nodes {%s}
+    }
   }
 }
-"""
+""" % PR_FIELDS
 
 GET_ISSUES = """
-query ($owner: String!, $name: String!, $cursor: String) {
+query ($owner: String!, $name: String!, $cursor: String, $since: DateTime) {
   repository(owner: $owner, name: $name) {
-    issues(first: 50, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+    issues(first: 50, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}, filterBy: {since: $since}) {
       pageInfo { endCursor hasNextPage }
       nodes {
         number
         title
         state
         createdAt
+        updatedAt
         closedAt
         
         author { login }
@@ -49,30 +49,59 @@ query ($fullPath: ID!, $branch: String!, $cursor: String) {
 }
 """
 
-GET_MERGE_REQUESTS = """
-query ($fullPath: ID!, $cursor: String) {
-  project(fullPath: $fullPath) {
-    mergeRequests(first: 50, after: $cursor, state: merged) {
+# Registro bruto de MR (services/extraction.py): superconjunto dos campos usados pelo
+# grafo de interações e pela tabela de métricas (metrics/scripts/extract.py)
+MERGE_REQUEST_FIELDS = """
       pageInfo { endCursor hasNextPage }
       nodes {
         iid
         title
+        description
         state
         createdAt
+        updatedAt
         mergedAt
+        commitCount
         author { username }
-        approvedBy(first: 10) {
+        diffStatsSummary { additions deletions fileCount }
+        labels {
+          nodes { title }
+        }
+        commits {
+          nodes {
+            author { username }
+            message
+          }
+        }
+        approvedBy {
           nodes { username }
         }
-        discussions(first: 10) {
+        discussions(first: 50) {
           nodes {
-            notes(first: 1) {
-              nodes { author { username } }
+            notes(first: 20) {
+              nodes { author { username } createdAt }
             }
           }
         }
       }
+"""
+
+# Primeira página de MRs de vários projetos numa requisição só
+GET_PROJECTS_MERGE_REQUESTS = """
+query ($fullPaths: [String!], $since: Time) {
+  projects(fullPaths: $fullPaths) {
+    nodes {
+      fullPath
+      mergeRequests(first: 10, state: merged, updatedAfter: $since, sort: UPDATED_DESC) {%s}
     }
   }
 }
-"""
\ No newline at end of file
+""" % MERGE_REQUEST_FIELDS
+
+# Páginas seguintes: um alias por projeto, cada um com o próprio cursor
+# ($path<i>, $cursor<i>, $since<i>, declarados por services/extraction.py)
+PROJECT_MERGE_REQUESTS_FIELD = """
+  p%%(i)s: project(fullPath: $path%%(i)s) {
+    mergeRequests(first: 10, after: $cursor%%(i)s, state: merged, updatedAfter: $since%%(i)s, sort: UPDATED_DESC) {%s}
+  }
+""" % MERGE_REQUEST_FIELDS
@@ -0,0 +1,380 @@
+"""
+Extraction core shared by graph/pipeline and metrics/scripts/extract.py.
+
+Pull/merge requests are fetched once, as a superset of the fields both consumers
+use (queries.github_queries.GET_PRS / queries.gitlab_queries.GET_MERGE_REQUESTS),
+and kept raw in the local store (services/raw_store.py). The interaction graph and
+the PR-metrics table are both derived from the stored nodes:
+
+    nodes = extraction.github_pull_requests("GovHub-br", "repo", since="2024-01-01T00:00:00Z")
+
+Each call synchronizes the repository first: the first time down to `since`, later
+only what was updated after the previous sync (pagination is ordered by updatedAt).
+With RAW_STORE_OFFLINE=1 nothing is fetched and the stored records are returned as-is;
+repository listings then come from stored_repos(). The graph services follow the same
+switch without network access: members and issues are read from their own record kinds,
+commits are mined only from git mirrors already on disk, and e-mails without a stored
+login keep their email:: identity. Language and default-branch data of the repository
+listing are not stored, so they are empty offline.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+from queries import github_queries, gitlab_queries
+from services import telemetry
+from services.raw_store import RawStore, utc_now
+
+# Folga ao sincronizar de novo: registros atualizados perto do fim da sincronização
+# anterior (ou com relógio adiantado) são buscados outra vez
+SYNC_MARGIN = timedelta(hours=1)
+
+_store: Optional[RawStore] = None
+
+
+def get_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=10,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST", "GET"],
+    )
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+session = get_session()
+
+
+def store() -> RawStore:
+    global _store
+    if _store is None:
+        os.makedirs(os.path.dirname(config.RAW_STORE_PATH), exist_ok=True)
+        _store = RawStore(config.RAW_STORE_PATH)
+    return _store
+
+
+def offline() -> bool:
+    """True with RAW_STORE_OFFLINE=1: nothing is fetched, records come from the store"""
+    return config.RAW_STORE_OFFLINE
+
+
+def stored_repos(platform: str, kind: str, owner: str) -> List[str]:
+    """
+    Repositories of an organization or group (subgroups included) with synchronized
+    records of a kind, as paths relative to `owner`: the repository listing offline.
+    """
+    prefix = owner.rstrip("/") + "/"
+    return [repo[len(prefix):] for repo in store().repos(platform, kind) if repo.startswith(prefix)]
+
+
+def _wait_for_rate_limit_reset(response) -> int:
+    """Detecta rate limit e espera até o reset + margem de 10s."""
+    reset_ts = response.headers.get("x-ratelimit-reset") or response.headers.get(
+        "ratelimit-reset"
+    )
+    retry_after = response.headers.get("retry-after")
+
+    wait_seconds = None
+
+    if retry_after:
+        # retry-after pode vir em segundos diretamente
+        try:
+            wait_seconds = int(retry_after)
+        except ValueError:
+            pass
+
+    if wait_seconds is None and reset_ts:
+        try:
+            wait_seconds = max(int(reset_ts) - int(time.time()), 0)
+        except ValueError:
+            pass
+
+    if wait_seconds is None:
+        wait_seconds = 60  # fallback conservador
+
+    wait_seconds += 10  # margem de segurança
+    print(f"    Rate limit atingido. Aguardando {wait_seconds}s até reset...")
+    time.sleep(wait_seconds)
+    return wait_seconds
+
+
+def run_query(url: str, json_body: Dict, headers: Dict, context: str = "", max_retries: int = 3):
+    """
+    POSTs a GraphQL request on the shared session, waiting out rate limits (HTTP 403/429
+    or a GraphQL rate-limit error) and retrying network errors. Returns the response, or
+    None after max_retries failed attempts.
+    """
+    host = telemetry.endpoint(url)
+    for attempt in range(max_retries + 1):
+        try:
+            started = time.perf_counter()
+            response = session.post(url, json=json_body, headers=headers, timeout=120)
+            telemetry.observe_response(response, started, json_body.get("query"))
+
+            # Rate limit via status HTTP (403 ou 429)
+            if response.status_code in (403, 429):
+                print(f"    ! Rate limit HTTP {response.status_code} ({context})")
+                telemetry.record_retry(host, "rate_limit")
+                telemetry.record_rate_limit_wait(host, _wait_for_rate_limit_reset(response))
+                continue
+
+            response.raise_for_status()
+
+            # Rate limit via body GraphQL (API retorna 200 mas com erro)
+            json_data = response.json()
+            if "errors" in json_data:
+                error_msg = json_data["errors"][0].get("message", "")
+                if "rate limit" in error_msg.lower():
+                    print(f"    ! Rate limit GraphQL: {error_msg}")
+                    telemetry.record_retry(host, "rate_limit")
+                    telemetry.record_rate_limit_wait(host, _wait_for_rate_limit_reset(response))
+                    continue
+
+            return response
+
+        except requests.exceptions.RequestException as e:
+            print(f"    ! Erro de rede ({context}), tentativa {attempt + 1}: {e}")
+            telemetry.record_retry(host, "network")
+            time.sleep(5)
+
+    print(f"    Falha após {max_retries + 1} tentativas ({context})")
+    return None
+
+
+def _minus_margin(timestamp: str) -> str:
+    moment = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ") - SYNC_MARGIN
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _sync_window(state: Optional[Dict], since: Optional[str]):
+    """
+    (fetch_since, covered_since) of the next sync: down to `since` when the store lacks
+    that part of the history, otherwise only what changed after the previous sync.
+    """
+    if state is None:
+        return since, since
+    covered = state["covered_since"]
+    if covered is not None and (since is None or since < covered):
+        return since, since
+    return _minus_margin(state["synced_at"]), covered
+
+
+class _Sync:
+    """
+    Pagination state of one repository: stores each page of nodes in the window and,
+    at the end, records the window as covered only if pagination got there (not cut
+    by max_pages or an error).
+    """
+
+    def __init__(self, platform: str, repo: str, kind: str, since: Optional[str], max_pages: float):
+        self.platform, self.repo, self.kind = platform, repo, kind
+        self.raw = store()
+        self.synced_at = utc_now()
+        self.fetch_since, self.covered = _sync_window(self.raw.sync_state(platform, repo, kind), since)
+        self.key = "number" if platform == "github" else "iid"
+        self.max_pages = max_pages
+        self.cursor = None
+        self.has_next = True
+        self.pages = 0
+        self.oldest = None
+        self.failed = False
+
+    @property
+    def active(self) -> bool:
+        return not self.failed and self.has_next and self.pages < self.max_pages
+
+    def consume(self, connection: Dict):
+        nodes = [n for n in connection["nodes"] if n]
+        telemetry.record_page(self.repo, self.kind, len(nodes))
+
+        in_window = [n for n in nodes if not self.fetch_since or n["updatedAt"] >= self.fetch_since]
+        self.raw.put(self.platform, self.repo, self.kind, in_window, self.key)
+        if in_window:
+            self.oldest = in_window[-1]["updatedAt"]
+
+        # Ordenados por updatedAt decrescente: o primeiro fora da janela encerra a paginação
+        self.has_next = connection["pageInfo"]["hasNextPage"] and len(in_window) == len(nodes)
+        self.cursor = connection["pageInfo"]["endCursor"]
+        self.pages += 1
+
+    def fail(self, error: str):
+        print(f"    ! {self.repo}: {error}")
+        self.failed = True
+
+    def finish(self):
+        if self.failed:
+            return
+        covered = self.covered
+        if self.has_next:
+            # Cortado pelo limite de páginas: só o trecho buscado está completo
+            if self.oldest is None or self.fetch_since != self.covered:
+                return
+            covered = self.oldest
+        self.raw.mark_synced(self.platform, self.repo, self.kind, covered, self.synced_at)
+
+
+def _sync(platform: str, repo: str, kind: str, since: Optional[str], max_pages: float, fetch_page):
+    """Pages through fetch_page(cursor, fetch_since) -> (connection, error), one repository"""
+    sync = _Sync(platform, repo, kind, since, max_pages)
+    while sync.active:
+        connection, error = fetch_page(sync.cursor, sync.fetch_since)
+        if error:
+            sync.fail(error)
+            break
+        sync.consume(connection)
+        if sync.active:
+            time.sleep(config.RATE_LIMIT_DELAY)
+    sync.finish()
+
+
+def github_pull_requests(owner: str, name: str, since: Optional[str] = None,
+                         max_pages: float = float("inf")) -> List[Dict]:
+    """
+    Raw PullRequest nodes (merged and closed) of a repository updated at or after
+    `since`, synchronizing the store first.
+    """
+    repo = f"{owner}/{name}"
+
+    def fetch_page(cursor, fetch_since):
+        response = run_query(
+            config.GITHUB_API_URL,
+            {"query": github_queries.GET_PRS, "variables": {"owner": owner, "name": name, "cursor": cursor}},
+            config.get_headers("github"),
+            context=repo,
+        )
+        if response is None:
+            return None, "request failed"
+        data = response.json()
+        if "errors" in data:
+            return None, f"GraphQL error: {data['errors'][0]['message']}"
+        repository = (data.get("data") or {}).get("repository")
+        if not repository:
+            return None, "repository not found (or empty)"
+        return repository["pullRequests"], None
+
+    if not config.RAW_STORE_OFFLINE:
+        _sync("github", repo, "pull_requests", since, max_pages, fetch_page)
+    return store().records("github", repo, "pull_requests", since)
+
+
+def _gitlab_request(query: str, variables: Dict, context: str):
+    """(data, error) of a GitLab GraphQL request"""
+    response = run_query(
+        config.GITLAB_API_URL,
+        {"query": query, "variables": variables},
+        config.get_headers("gitlab"),
+        context=context,
+    )
+    if response is None:
+        return None, "request failed"
+    data = response.json()
+    if "errors" in data:
+        return None, f"GraphQL error: {data['errors'][0]['message']}"
+    return data.get("data") or {}, None
+
+
+def _gitlab_first_pages(syncs: List[_Sync]):
+    """First merge-request page of several projects in one projects(fullPaths:) request"""
+    # Uma janela só para o lote: a mais antiga (cada projeto ainda filtra pela sua)
+    windows = [s.fetch_since for s in syncs]
+    since = None if None in windows else min(windows)
+    paths = [s.repo for s in syncs]
+    data, error = _gitlab_request(
+        gitlab_queries.GET_PROJECTS_MERGE_REQUESTS, {"fullPaths": paths, "since": since}, ", ".join(paths)
+    )
+    if error:
+        return error
+    found = {p["fullPath"]: p for p in (data.get("projects") or {}).get("nodes") or [] if p}
+    for sync in syncs:
+        project = found.get(sync.repo)
+        if project:
+            sync.consume(project["mergeRequests"])
+        else:
+            sync.fail("project not found")
+    return None
+
+
+def _gitlab_next_pages(syncs: List[_Sync]):
+    """Next merge-request page of several projects, one aliased project(fullPath:) per cursor"""
+    fields, variables, params = [], {}, []
+    for i, sync in enumerate(syncs):
+        params.append(f"$path{i}: ID!, $cursor{i}: String, $since{i}: Time")
+        fields.append(gitlab_queries.PROJECT_MERGE_REQUESTS_FIELD % {"i": i})
+        variables.update({f"path{i}": sync.repo, f"cursor{i}": sync.cursor, f"since{i}": sync.fetch_since})
+    query = "query (%s) {\n%s\n}" % (", ".join(params), "\n".join(fields))
+    data, error = _gitlab_request(query, variables, ", ".join(s.repo for s in syncs))
+    if error:
+        return error
+    for i, sync in enumerate(syncs):
+        project = data.get(f"p{i}")
+        if project:
+            sync.consume(project["mergeRequests"])
+        else:
+            sync.fail("project not found")
+    return None
+
+
+def _gitlab_batch(syncs: List[_Sync], request) -> int:
+    """
+    Runs one batched request; when GitLab rejects it as too complex, splits the batch
+    in half (down to a single project, where the error is final). Returns the batch
+    size GitLab accepted, so the caller can keep it for the rest of the sync.
+    """
+    error = request(syncs)
+    if error is None:
+        return len(syncs)
+    if len(syncs) > 1 and "complexity" in error.lower():
+        middle = len(syncs) // 2
+        return min(_gitlab_batch(syncs[:middle], request), _gitlab_batch(syncs[middle:], request))
+    for sync in syncs:
+        sync.fail(error)
+    return len(syncs)
+
+
+def gitlab_merge_requests_batch(project_paths: List[str], since: Optional[str] = None,
+                                max_pages: float = float("inf")) -> Dict[str, List[Dict]]:
+    """
+    Raw MergeRequest nodes (merged) of several projects updated at or after `since`,
+    synchronizing the store first. Pages of up to GITLAB_BATCH_SIZE projects travel
+    in each request, every project with its own cursor.
+    """
+    if not config.RAW_STORE_OFFLINE:
+        syncs = [_Sync("gitlab", path, "merge_requests", since, max_pages) for path in project_paths]
+        request = _gitlab_first_pages
+        # Reduzido quando o GitLab recusa um lote pela complexidade, e mantido daí em diante
+        batch_size = config.GITLAB_BATCH_SIZE
+        while True:
+            active = [s for s in syncs if s.active]
+            if not active:
+                break
+            start = 0
+            while start < len(active):
+                batch = active[start:start + batch_size]
+                accepted = _gitlab_batch(batch, request)
+                if accepted < len(batch):
+                    batch_size = accepted
+                start += len(batch)
+            request = _gitlab_next_pages
+            if any(s.active for s in syncs):
+                time.sleep(config.RATE_LIMIT_DELAY)
+        for sync in syncs:
+            sync.finish()
+    return {path: store().records("gitlab", path, "merge_requests", since) for path in project_paths}
+
+
+def gitlab_merge_requests(project_path: str, since: Optional[str] = None,
+                          max_pages: float = float("inf")) -> List[Dict]:
+    """
+    Raw MergeRequest nodes (merged) of a project updated at or after `since`,
+    synchronizing the store first.
+    """
+    return gitlab_merge_requests_batch([project_path], since, max_pages)[project_path]
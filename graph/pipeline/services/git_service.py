@@ -0,0 +1,160 @@
+import os
+import re
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import config
+
+# Campos separados por \x1f e commits por \x1e: mensagens podem conter qualquer outro caractere
+LOG_FORMAT = "%H%x1f%P%x1f%an%x1f%ae%x1f%aI%x1f%B%x1e"
+NOREPLY_EMAIL = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$", re.IGNORECASE)
+
+
+def mirror_path(url: str) -> str:
+    name = url.rstrip("/").split("://")[-1].replace(":", "/").lstrip("/")
+    if not name.endswith(".git"):
+        name += ".git"
+    return os.path.join(config.GIT_MIRROR_DIR, name)
+
+
+def clone_or_fetch(url: str, partial: bool = True) -> str:
+    """
+    Keeps a bare mirror of the repository. With partial=True the clone uses
+    --filter=blob:none: git log only needs commits and trees, never file contents.
+    """
+    path = mirror_path(url)
+    if os.path.isdir(path):
+        subprocess.run(
+            ["git", "--git-dir", path, "fetch", "--quiet", "--prune", "origin", "+refs/heads/*:refs/heads/*"],
+            check=True,
+        )
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        cmd = ["git", "clone", "--quiet", "--bare"]
+        if partial:
+            cmd.append("--filter=blob:none")
+        subprocess.run(cmd + [url, path], check=True)
+    return path
+
+
+def identity(name: str, email: str) -> str:
+    """
+    Same identities used by github_service: login for noreply e-mails, else email::<email>
+    (github_service.resolve_logins later maps those e-mails to logins through the API)
+    """
+    match = NOREPLY_EMAIL.match(email or "")
+    if match:
+        return match.group(1)
+    return f"email::{email}" if email else f"name::{name}"
+
+
+def read_commits(
+    path: str, since: Optional[str] = None, until: Optional[str] = None, ref: str = "HEAD"
+) -> List[Dict]:
+    # Merges incluídos, como no history do GraphQL (merge=True marca cada um)
+    cmd = ["git", "--git-dir", path, "log", f"--format={LOG_FORMAT}"]
+    if os.path.isdir(os.path.join(path, ".git")):
+        cmd[1:3] = ["-C", path]
+    if since:
+        cmd.append(f"--since={since}")
+    if until:
+        cmd.append(f"--until={until}")
+    cmd.append(ref)
+
+    result = subprocess.run(cmd, capture_output=True, check=False)
+    if result.returncode != 0:
+        # Repositório vazio (sem HEAD) não é erro
+        return []
+
+    commits = []
+    for record in result.stdout.decode("utf-8", errors="replace").split("\x1e"):
+        record = record.lstrip("\n")
+        if not record:
+            continue
+        sha, parents, name, email, at, message = record.split("\x1f", 5)
+        message = message.rstrip("\n")
+        commits.append(
+            {
+                "sha": sha,
+                "author": identity(name, email),
+                "at": at,
+                "merge": len(parents.split()) > 1,
+                "message_length": len(message),
+            }
+        )
+    return commits
+
+
+def mine_repository(
+    path: str, since: Optional[str] = None, until: Optional[str] = None
+) -> Dict:
+    commits = read_commits(path, since, until)
+    per_author: Dict[str, int] = {}
+    author_commits: Dict[str, str] = {}  # Um commit por autor, para resolver o login depois
+    for c in commits:
+        per_author[c["author"]] = per_author.get(c["author"], 0) + 1
+        author_commits.setdefault(c["author"], c["sha"])
+
+    # Mensagens de merge são geradas pela ferramenta: ficam fora da média
+    lengths = [c["message_length"] for c in commits if c["message_length"] and not c["merge"]]
+    return {
+        "path": path,
+        "contributors": sorted(per_author),
+        "commits_by_author": per_author,
+        "author_commits": author_commits,
+        "commits": len(commits),
+        "avg_commit_message_length": round(sum(lengths) / len(lengths), 2) if lengths else 0,
+    }
+
+
+def rename_authors(stats: Dict, names: Dict[str, str]) -> Dict:
+    """Replaces identities in mine_repository's result (e.g. email:: by login), merging counts"""
+    per_author: Dict[str, int] = {}
+    for author, count in stats["commits_by_author"].items():
+        name = names.get(author, author)
+        per_author[name] = per_author.get(name, 0) + count
+    return {**stats, "contributors": sorted(per_author), "commits_by_author": per_author}
+
+
+def _mine(args):
+    return mine_repository(*args)
+
+
+def mine_repositories(
+    paths: List[str],
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """Runs git log over local clones in a process pool, with no page cap"""
+    workers = workers or config.GIT_WORKERS
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_mine, [(p, since, until) for p in paths])
+        return {p: r for p, r in zip(paths, results)}
+
+
+def mine_remote_repositories(
+    urls: List[str],
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Mirrors each URL (partial bare clone) and mines the commits; keyed by URL. With
+    RAW_STORE_OFFLINE=1 nothing is fetched: only mirrors already on disk are mined.
+    """
+    paths = {}
+    for url in urls:
+        if config.RAW_STORE_OFFLINE:
+            if os.path.isdir(mirror_path(url)):
+                paths[url] = mirror_path(url)
+            continue
+        print(f"   -> Mirroring {url}")
+        try:
+            paths[url] = clone_or_fetch(url)
+        except subprocess.CalledProcessError as e:
+            print(f"Error cloning {url}: {e}")
+
+    mined = mine_repositories(list(paths.values()), since, until, workers)
+    return {url: mined[path] for url, path in paths.items()}
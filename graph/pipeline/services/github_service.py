@@ -1,32 +1,47 @@
-import requests
 import time
 import json
 from typing import Dict, List, Set
 
 import config
 from queries import github_queries as queries
+from common import profiling  # Raiz do repositório no sys.path (main.py)
+from services import extraction, git_service, telemetry
+from services.raw_store import utc_now
 
 
 def run_query(query: str, variables: Dict) -> Dict:
-    response = requests.post(
+    response = extraction.run_query(
         config.GITHUB_API_URL,
-        json={"query": query, "variables": variables},
-        headers=config.get_headers("github"),
+        {"query": query, "variables": variables},
+        config.get_headers("github"),
     )
+    if response is None:
+        raise Exception(f"Query failed after retries: {telemetry.operation(query)}")
 
-    if response.status_code == 200:
-        data = response.json()
-        if "errors" in data:
-            print(f"GraphQL Error: {data['errors'][0]['message']}")
-            return None
-        return data
-    else:
-        raise Exception(
-            f"Query failed with status {response.status_code}: {response.text}"
-        )
+    data = response.json()
+    if "errors" in data:
+        print(f"GraphQL Error: {data['errors'][0]['message']}")
+        return None
+    return data
 
 
 def extract_members(org_name: str) -> List[Dict]:
+    """
+    Members of the organization: {"login", "name", "email"}. Each complete listing is
+    kept in the raw store (kind "members"); with RAW_STORE_OFFLINE=1 the last one is
+    returned instead.
+    """
+    store = extraction.store()
+    if config.RAW_STORE_OFFLINE:
+        state = store.sync_state("github", org_name, "members")
+        if state is None:
+            return []
+        # Só a última listagem: quem saiu da organização fica com updatedAt anterior
+        return [
+            {"login": m["login"], "name": m["name"], "email": m["email"]}
+            for m in store.records("github", org_name, "members", since=state["synced_at"])
+        ]
+
     print(f"Fetching members from {org_name}...")
     members = []
     cursor = None
@@ -38,6 +53,7 @@ def extract_members(org_name: str) -> List[Dict]:
             break
 
         raw_members = data["data"]["organization"]["membersWithRole"]
+        telemetry.record_page(org_name, "members", len(raw_members["nodes"]))
 
         for m in raw_members["nodes"]:
             if m:
@@ -48,6 +64,11 @@ def extract_members(org_name: str) -> List[Dict]:
         has_next = raw_members["pageInfo"]["hasNextPage"]
         cursor = raw_members["pageInfo"]["endCursor"]
 
+    # Listagem interrompida não substitui a guardada
+    if not has_next:
+        synced_at = utc_now()
+        store.put("github", org_name, "members", [{**m, "updatedAt": synced_at} for m in members], key="login")
+        store.mark_synced("github", org_name, "members", None, synced_at)
     return members
 
 
@@ -59,18 +80,21 @@ def extract_contributors(org: str, repo_name: str, default_branch: str) -> List[
     cursor = None
     has_next = True
     current_page = 0
+    since = config.lookback_since()  # Filtrado no servidor (history(since:))
 
-    while has_next and current_page < config.MAX_COMMIT_PAGES:
+    while has_next and current_page < config.page_limit(config.MAX_COMMIT_PAGES):
         variables = {
             "owner": org,
             "name": repo_name,
             "branch": default_branch,
             "cursor": cursor,
+            "since": since,
         }
         data = run_query(queries.GET_COMMITS, variables)
 
         try:
             history = data["data"]["repository"]["ref"]["target"]["history"]
+            telemetry.record_page(f"{org}/{repo_name}", "commits", len(history["nodes"]))
             for commit in history["nodes"]:
                 if commit["author"]["user"] and commit["author"]["user"]["login"]:
                     contributors.add(commit["author"]["user"]["login"])
@@ -87,98 +111,70 @@ def extract_contributors(org: str, repo_name: str, default_branch: str) -> List[
 
 
 def extract_pull_requests(org: str, repo_name: str) -> List[Dict]:
-    prs_data = []
-    cursor = None
-    has_next = True
-    current_page = 0
+    # Registros brutos do store compartilhado com metrics/scripts/extract.py
+    raw_prs = extraction.github_pull_requests(
+        org, repo_name, since=config.lookback_since(), max_pages=config.page_limit(config.MAX_PR_PAGES)
+    )
 
-    while has_next and current_page < config.MAX_PR_PAGES:
-        data = run_query(
-            queries.GET_PRS, {"owner": org, "name": repo_name, "cursor": cursor}
+    prs_data = []
+    for pr in raw_prs:
+        commenters = set()
+        for comment in pr["comments"]["nodes"] or []:
+            if comment["author"]:
+                commenters.add(comment["author"]["login"])
+
+        reviewers = set()
+        for review in pr["reviews"]["nodes"] or []:
+            if review["author"] and review["state"] == "APPROVED":
+                reviewers.add(review["author"]["login"])
+
+        prs_data.append(
+            {
+                "number": pr["number"],
+                "title": pr["title"],
+                "created_at": pr["createdAt"],
+                "merged_at": pr["mergedAt"],
+                "closed_at": pr["closedAt"],
+                "author": pr["author"]["login"] if pr["author"] else "unknown",
+                "merged_by": pr["mergedBy"]["login"]
+                if pr["mergedBy"]
+                else None,
+                "reviewers": list(reviewers),
+                "commenters": list(commenters),
+            }
         )
-        if not data:
-            break
-
-        try:
-            raw_prs = data["data"]["repository"]["pullRequests"]
-
-            for pr in raw_prs["nodes"]:
-                commenters = set()
-                if pr["comments"]["nodes"]:
-                    for comment in pr["comments"]["nodes"]:
-                        if comment["author"]:
-                            commenters.add(comment["author"]["login"])
-
-                reviewers = set()
-                if pr["reviews"]["nodes"]:
-                    for review in pr["reviews"]["nodes"]:
-                        if review["author"]:
-                            reviewers.add(review["author"]["login"])
-
-                prs_data.append(
-                    {
-                        "number": pr["number"],
-                        "title": pr["title"],
-                        "author": pr["author"]["login"] if pr["author"] else "unknown",
-                        "merged_by": pr["mergedBy"]["login"]
-                        if pr["mergedBy"]
-                        else None,
-                        "reviewers": list(reviewers),
-                        "commenters": list(commenters),
-                    }
-                )
-
-            has_next = raw_prs["pageInfo"]["hasNextPage"]
-            cursor = raw_prs["pageInfo"]["endCursor"]
-            current_page += 1
-        except KeyError:
-            has_next = False
 
     return prs_data
 
 
 def extract_issues(org: str, repo_name: str) -> List[Dict]:
+    """
+    Issues updated since the lookback window. The raw nodes are kept in the raw store
+    (kind "issues"); with RAW_STORE_OFFLINE=1 the stored ones are used instead.
+    """
+    store = extraction.store()
+    since = config.lookback_since()  # Filtrado no servidor (filterBy: {since:})
+    if config.RAW_STORE_OFFLINE:
+        return [_issue(issue) for issue in store.records("github", f"{org}/{repo_name}", "issues", since=since)]
+
     issues_data = []
     cursor = None
     has_next = True
     current_page = 0
 
-    while has_next and current_page < config.MAX_ISSUE_PAGES:
+    while has_next and current_page < config.page_limit(config.MAX_ISSUE_PAGES):
         data = run_query(
-            queries.GET_ISSUES, {"owner": org, "name": repo_name, "cursor": cursor}
+            queries.GET_ISSUES,
+            {"owner": org, "name": repo_name, "cursor": cursor, "since": since},
         )
         if not data:
             break
 
         try:
             raw_issues = data["data"]["repository"]["issues"]
-
-            for issue in raw_issues["nodes"]:
-                commenters = set()
-                if issue["comments"]["nodes"]:
-                    for comment in issue["comments"]["nodes"]:
-                        if comment["author"]:
-                            commenters.add(comment["author"]["login"])
-
-                assignees = set()
-                if issue["assignees"]["nodes"]:
-                    for assignee in issue["assignees"]["nodes"]:
-                        assignees.add(assignee["login"])
-
-                issues_data.append(
-                    {
-                        "number": issue["number"],
-                        "title": issue["title"],
-                        "state": issue["state"],
-                        "created_at": issue["createdAt"],
-                        "closed_at": issue["closedAt"],
-                        "author": issue["author"]["login"]
-                        if issue["author"]
-                        else "unknown",
-                        "assignees": list(assignees),
-                        "commenters": list(commenters),
-                    }
-                )
+            telemetry.record_page(f"{org}/{repo_name}", "issues", len(raw_issues["nodes"]))
+            store.put("github", f"{org}/{repo_name}", "issues", raw_issues["nodes"], key="number")
+            issues_data.extend(_issue(issue) for issue in raw_issues["nodes"])
 
             has_next = raw_issues["pageInfo"]["hasNextPage"]
             cursor = raw_issues["pageInfo"]["endCursor"]
@@ -189,51 +185,171 @@ def extract_issues(org: str, repo_name: str) -> List[Dict]:
     return issues_data
 
 
-def process_organization(org_name: str) -> Dict:
-    members = extract_members(org_name)
+def _issue(issue: Dict) -> Dict:
+    commenters = set()
+    if issue["comments"]["nodes"]:
+        for comment in issue["comments"]["nodes"]:
+            if comment["author"]:
+                commenters.add(comment["author"]["login"])
 
-    print(f"Fetching repositories from {org_name}...")
-    repositories = []
+    assignees = set()
+    if issue["assignees"]["nodes"]:
+        for assignee in issue["assignees"]["nodes"]:
+            assignees.add(assignee["login"])
+
+    return {
+        "number": issue["number"],
+        "title": issue["title"],
+        "state": issue["state"],
+        "created_at": issue["createdAt"],
+        "closed_at": issue["closedAt"],
+        "author": issue["author"]["login"]
+        if issue["author"]
+        else "unknown",
+        "assignees": list(assignees),
+        "commenters": list(commenters),
+    }
+
+
+def resolve_logins(org_name: str, mined: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    Maps the email::<email> identities of git_service to GitHub logins, so git-mined
+    contributors match the API path (author.user.login). Each e-mail is looked up once,
+    through one of its commits (object(oid:)), and the answer is kept in the raw store
+    (kind "commit_authors"), so later runs only ask for new e-mails. E-mails that can't
+    be resolved keep the email:: identity.
+
+    Args:
+        org_name (str): Organization owning the repositories.
+        mined (Dict[str, Dict]): git_service.mine_repository results keyed by repository name.
+
+    Returns:
+        Dict[str, str]: Login by email:: identity.
+    """
+    store = extraction.store()
+    known = {r["email"]: r["login"] for r in store.records("github", org_name, "commit_authors")}
+
+    pending = {}  # e-mail -> (repositório, sha)
+    for repo_name, stats in mined.items():
+        for author, sha in stats["author_commits"].items():
+            email = author[len("email::"):] if author.startswith("email::") else None
+            if email and email not in known:
+                pending.setdefault(email, (repo_name, sha))
+
+    if pending and not config.RAW_STORE_OFFLINE:
+        print(f"Resolving {len(pending)} commit e-mails to logins...")
+        items = list(pending.items())
+        for start in range(0, len(items), config.GIT_LOGIN_BATCH_SIZE):
+            batch = items[start:start + config.GIT_LOGIN_BATCH_SIZE]
+            params, fields, variables = [], [], {}
+            for i, (_, (repo_name, sha)) in enumerate(batch):
+                params.append(f"$owner{i}: String!, $name{i}: String!, $oid{i}: GitObjectID!")
+                fields.append(queries.COMMIT_AUTHOR_FIELD % {"i": i})
+                variables.update({f"owner{i}": org_name, f"name{i}": repo_name, f"oid{i}": sha})
+            query = "query (%s) {\n%s\n}" % (", ".join(params), "\n".join(fields))
+            response = extraction.run_query(
+                config.GITHUB_API_URL, {"query": query, "variables": variables},
+                config.get_headers("github"), "commit authors",
+            )
+            if response is None:
+                continue
+            # Erros parciais (commit inacessível) só anulam o alias; esses e-mails não são guardados
+            data = response.json().get("data") or {}
+            resolved = []
+            for i, (email, _) in enumerate(batch):
+                commit = (data.get(f"c{i}") or {}).get("object")
+                if commit is None:
+                    continue
+                login = ((commit.get("author") or {}).get("user") or {}).get("login")
+                resolved.append({"email": email, "login": login, "updatedAt": utc_now()})
+                known[email] = login
+            store.put("github", org_name, "commit_authors", resolved, key="email")
+
+    return {f"email::{email}": login for email, login in known.items() if login}
+
+
+def list_repositories(org_name: str) -> List[Dict]:
+    """
+    Non-archived repositories of the organization: {"name", "default_branch", "languages"}.
+    With RAW_STORE_OFFLINE=1 the list comes from the raw store (repositories with stored
+    pull requests), without default branch and languages, which are not stored.
+    """
+    if config.RAW_STORE_OFFLINE:
+        return [
+            {"name": name, "default_branch": None, "languages": []}
+            for name in extraction.stored_repos("github", "pull_requests", org_name)
+        ]
+
+    repos = []
     cursor = None
     has_next = True
-
     while has_next:
         data = run_query(queries.GET_REPOS, {"org": org_name, "cursor": cursor})
         if not data:
             break
 
         raw_repos = data["data"]["organization"]["repositories"]
+        telemetry.record_page(org_name, "repositories", len(raw_repos["nodes"]))
 
         for r in raw_repos["nodes"]:
-            repo_name = r["name"]
             if r["isArchived"]:
                 continue
-
-            print(f"   -> Processing repository: {repo_name}")
-
-            default_branch = (
-                r["defaultBranchRef"]["name"] if r["defaultBranchRef"] else None
-            )
-            langs = [l["name"] for l in r["languages"]["nodes"]]
-
-            contributors = extract_contributors(org_name, repo_name, default_branch)
-            prs = extract_pull_requests(org_name, repo_name)
-            issues = extract_issues(org_name, repo_name)
-
-            repositories.append(
+            repos.append(
                 {
-                    "name": repo_name,
-                    "languages": langs,
-                    "contributors": contributors,
-                    "pull_requests": prs,
-                    "issues": issues,
+                    "name": r["name"],
+                    "default_branch": r["defaultBranchRef"]["name"] if r["defaultBranchRef"] else None,
+                    "languages": [l["name"] for l in r["languages"]["nodes"]],
                 }
             )
 
-            time.sleep(config.RATE_LIMIT_DELAY)
-
         has_next = raw_repos["pageInfo"]["hasNextPage"]
         cursor = raw_repos["pageInfo"]["endCursor"]
+    return repos
+
+
+def process_organization(org_name: str) -> Dict:
+    members = extract_members(org_name)
+
+    print(f"Fetching repositories from {org_name}...")
+    repositories = []
+
+    for r in list_repositories(org_name):
+        repo_name = r["name"]
+        print(f"   -> Processing repository: {repo_name}")
+
+        if config.COMMIT_BACKEND == "git":
+            contributors = []  # Preenchido depois, a partir dos clones locais
+        else:
+            contributors = extract_contributors(org_name, repo_name, r["default_branch"])
+        prs = extract_pull_requests(org_name, repo_name)
+        issues = extract_issues(org_name, repo_name)
+
+        repositories.append(
+            {
+                "name": repo_name,
+                "languages": r["languages"],
+                "contributors": contributors,
+                "pull_requests": prs,
+                "issues": issues,
+            }
+        )
+
+        time.sleep(config.RATE_LIMIT_DELAY)
+
+    if config.COMMIT_BACKEND == "git":
+        profiling.stage("git mirrors")
+        print(f"Mining commits from local clones ({len(repositories)} repositories)...")
+        urls = {r["name"]: f"https://github.com/{org_name}/{r['name']}.git" for r in repositories}
+        # Mesma janela do backend graphql (history(since:))
+        mined = git_service.mine_remote_repositories(list(urls.values()), since=config.lookback_since())
+        by_repo = {name: mined[url] for name, url in urls.items() if url in mined}
+
+        profiling.stage("commit logins")
+        logins = resolve_logins(org_name, by_repo)
+        for repo in repositories:
+            stats = by_repo.get(repo["name"])
+            if stats:
+                repo["contributors"] = git_service.rename_authors(stats, logins)["contributors"]
 
     return {
         "organization": org_name,
@@ -246,6 +362,7 @@ def process_organization(org_name: str) -> Dict:
 if __name__ == "__main__":
     try:
         config.validate()
+        telemetry.serve(config.METRICS_PORT)
 
         result = process_organization(config.TARGET_ORG)
 
@@ -254,6 +371,7 @@ if __name__ == "__main__":
             json.dump(result, f, indent=2, ensure_ascii=False)
 
         print(f"\nExtraction completed! Data saved to: {filename}")
+        telemetry.write_report(config.REPORTS_DIR)
 
     except ValueError as e:
         print(f"\nConfiguration Error: {e}")
@@ -1,21 +1,35 @@
-import requests
 import time
 import json
 from typing import Dict, List, Set
 import config
 from queries import gitlab_queries as queries
+from services import extraction, telemetry
+from services.raw_store import utc_now
 
 def run_gitlab_query(query: str, variables: Dict) -> Dict:
-    response = requests.post(
+    started = time.perf_counter()
+    # Sessão compartilhada (services/extraction.py): conexão reaproveitada entre requisições
+    response = extraction.session.post(
         config.GITLAB_API_URL,
         json={"query": query, "variables": variables},
         headers=config.get_headers('gitlab'),
     )
+    telemetry.observe_response(response, started, query)
     if response.status_code == 200:
         return response.json()
     return None
 
 def extract_members(group_path: str) -> List[Dict]:
+    # Listagem completa guardada no store (kind "members"); offline só a última é lida
+    store = extraction.store()
+    if config.RAW_STORE_OFFLINE:
+        state = store.sync_state("gitlab", group_path, "members")
+        if state is None: return []
+        return [
+            {"login": m["login"], "name": m["name"], "email": m["email"]}
+            for m in store.records("gitlab", group_path, "members", since=state["synced_at"])
+        ]
+
     print(f"Fetching members from GitLab Group: {group_path}...")
     members = []
     cursor = None
@@ -27,6 +41,7 @@ def extract_members(group_path: str) -> List[Dict]:
         
         try:
             raw = data['data']['group']['groupMembers']
+            telemetry.record_page(group_path, "members", len(raw['nodes']))
             for m in raw['nodes']:
                 if m['user']:
                     members.append({
@@ -38,51 +53,56 @@ def extract_members(group_path: str) -> List[Dict]:
             cursor = raw['pageInfo']['endCursor']
         except (KeyError, TypeError):
             break
-            
+
+    # Listagem interrompida não substitui a guardada
+    if not has_next:
+        synced_at = utc_now()
+        store.put("gitlab", group_path, "members", [{**m, "updatedAt": synced_at} for m in members], key="login")
+        store.mark_synced("gitlab", group_path, "members", None, synced_at)
     return members
 
+def extract_mrs_batch(project_paths: List[str]) -> Dict[str, List[Dict]]:
+    # Registros brutos do store compartilhado com metrics/scripts/extract.py; MRs de
+    # vários projetos por requisição (config.GITLAB_BATCH_SIZE)
+    since = config.lookback_since()
+    raw_by_project = extraction.gitlab_merge_requests_batch(
+        project_paths, since=since, max_pages=config.page_limit(config.MAX_PAGES)
+    )
+
+    result = {}
+    for project_path, raw_mrs in raw_by_project.items():
+        mrs_data = []
+        for mr in raw_mrs:
+            # O store guarda por updatedAt: a janela do grafo é por data de merge
+            if since and mr['mergedAt'] and mr['mergedAt'] < since: continue
+
+            # Autores de comentários (primeira nota de cada discussion)
+            commenters = set()
+            for disc in mr['discussions']['nodes'] or []:
+                if disc['notes']['nodes']:
+                    note_author = disc['notes']['nodes'][0]['author']
+                    if note_author: commenters.add(note_author['username'])
+
+            # Aprovadores
+            approvers = set()
+            for u in mr['approvedBy']['nodes'] or []:
+                approvers.add(u['username'])
+
+            mrs_data.append({
+                "number": mr['iid'],
+                "title": mr['title'],
+                "created_at": mr['createdAt'],
+                "merged_at": mr['mergedAt'],
+                "author": mr['author']['username'] if mr['author'] else "unknown",
+                "reviewers": list(approvers),
+                "commenters": list(commenters)
+            })
+        result[project_path] = mrs_data
+
+    return result
+
 def extract_mrs(project_path: str) -> List[Dict]:
-    mrs_data = []
-    cursor = None
-    has_next = True
-    current_page = 0
-    
-    while has_next and current_page < config.MAX_PAGES:
-        data = run_gitlab_query(queries.GET_MERGE_REQUESTS, {"fullPath": project_path, "cursor": cursor})
-        if not data: break
-        
-        try:
-            raw_mrs = data['data']['project']['mergeRequests']
-            for mr in raw_mrs['nodes']:
-                # Autores de comentários (Discussion notes)
-                commenters = set()
-                if mr['discussions']['nodes']:
-                    for disc in mr['discussions']['nodes']:
-                        if disc['notes']['nodes']:
-                            note_author = disc['notes']['nodes'][0]['author']
-                            if note_author: commenters.add(note_author['username'])
-
-                # Aprovadores
-                approvers = set()
-                if mr['approvedBy']['nodes']:
-                    for u in mr['approvedBy']['nodes']:
-                        approvers.add(u['username'])
-                
-                mrs_data.append({
-                    "number": mr['iid'],
-                    "title": mr['title'],
-                    "author": mr['author']['username'] if mr['author'] else "unknown",
-                    "reviewers": list(approvers),
-                    "commenters": list(commenters)
-                })
-            
-            has_next = raw_mrs['pageInfo']['hasNextPage']
-            cursor = raw_mrs['pageInfo']['endCursor']
-            current_page += 1
-        except (KeyError, TypeError):
-            has_next = False
-            
-    return mrs_data
+    return extract_mrs_batch([project_path])[project_path]
 
 def process_gitlab_group(group_path: str) -> Dict:
     members = extract_members(group_path)
@@ -90,34 +110,38 @@ def process_gitlab_group(group_path: str) -> Dict:
     print(f"Fetching projects from {group_path}...")
     projects_list = []
     cursor = None
-    has_next = True
-    
+    # Sem rede: projetos com MRs no store (caminho completo, nome = último segmento)
+    has_next = not config.RAW_STORE_OFFLINE
+    if config.RAW_STORE_OFFLINE:
+        for path in extraction.stored_repos("gitlab", "merge_requests", group_path):
+            projects_list.append({"name": path.split("/")[-1], "full_path": f"{group_path}/{path}"})
+
     while has_next:
         data = run_gitlab_query(queries.GET_PROJECTS, {"groupPath": group_path, "cursor": cursor})
         if not data: break
         
         raw_projects = data['data']['group']['projects']
+        telemetry.record_page(group_path, "projects", len(raw_projects['nodes']))
         
         for p in raw_projects['nodes']:
-            p_name = p['name']
-            p_path = p['fullPath'] # Necessário para queries subsequentes
-            
             if p['archived']: continue
-            print(f"   -> Processing GitLab Project: {p_name}")
-            
-            mrs = extract_mrs(p_path)
-            # Voce pode adicionar extract_commits e issues aqui seguindo a mesma logica
-            
+            print(f"   -> Processing GitLab Project: {p['name']}")
+            # p['fullPath'] é necessário para as queries seguintes
             projects_list.append({
-                "name": p_name,
-                "full_path": p_path,
-                "merge_requests": mrs
+                "name": p['name'],
+                "full_path": p['fullPath'],
             })
-            time.sleep(config.RATE_LIMIT_DELAY)
-            
+
         has_next = raw_projects['pageInfo']['hasNextPage']
         cursor = raw_projects['pageInfo']['endCursor']
 
+    # MRs de todos os projetos (inclusive subgrupos) em lotes, não um projeto por vez
+    print(f"Fetching merge requests from {len(projects_list)} projects...")
+    mrs = extract_mrs_batch([p['full_path'] for p in projects_list])
+    for project in projects_list:
+        project["merge_requests"] = mrs[project['full_path']]
+        # Voce pode adicionar extract_commits e issues aqui seguindo a mesma logica
+
     return {
         "platform": "gitlab",
         "group": group_path,
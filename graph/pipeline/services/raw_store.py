@@ -0,0 +1,132 @@
+import datetime
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+class RawStore:
+    def __init__(self, path: str):
+        """
+        Local store of raw API records (GraphQL nodes as returned by the API), shared by
+        the graph pipeline and the metrics extractor. Records are keyed by
+        (platform, repo, kind, key) and replaced when fetched again; `syncs` keeps, per
+        repository and kind, how far back the stored history goes and when it was last
+        synchronized, so later runs only fetch what changed.
+
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    platform TEXT NOT NULL,
+                    repo TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (platform, repo, kind, key)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS syncs (
+                    platform TEXT NOT NULL,
+                    repo TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    covered_since TEXT,
+                    synced_at TEXT NOT NULL,
+                    PRIMARY KEY (platform, repo, kind)
+                )
+                """
+            )
+
+    def put(self, platform: str, repo: str, kind: str, records: List[Dict], key: str):
+        """
+        Stores raw records, replacing previous versions with the same key.
+
+        Args:
+            platform (str): "github" or "gitlab".
+            repo (str): Full repository path ("owner/name").
+            kind (str): Record kind ("pull_requests", "merge_requests"...).
+            records (List[Dict]): Raw nodes; each must have `key` and "updatedAt".
+            key (str): Field that identifies a record inside the repository.
+        """
+        if not records:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (platform, repo, kind, key, updated_at, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (platform, repo, kind, str(r[key]), r["updatedAt"], json.dumps(r, ensure_ascii=False))
+                    for r in records
+                ]
+            )
+
+    def records(self, platform: str, repo: str, kind: str, since: Optional[str] = None) -> List[Dict]:
+        """
+        Returns the stored records of a repository, most recently updated first.
+
+        Args:
+            platform (str): "github" or "gitlab".
+            repo (str): Full repository path ("owner/name").
+            kind (str): Record kind.
+            since (Optional[str]): Only records updated at or after this ISO timestamp.
+
+        Returns:
+            List[Dict]: Raw nodes.
+        """
+        query = "SELECT data FROM records WHERE platform = ? AND repo = ? AND kind = ?"
+        params = [platform, repo, kind]
+        if since:
+            query += " AND updated_at >= ?"
+            params.append(since)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY updated_at DESC", params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def sync_state(self, platform: str, repo: str, kind: str) -> Optional[Dict]:
+        """
+        Returns {"covered_since", "synced_at"} of a repository, or None if it was never
+        synchronized. covered_since None means the whole history is stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT covered_since, synced_at FROM syncs WHERE platform = ? AND repo = ? AND kind = ?",
+                (platform, repo, kind)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"covered_since": row[0], "synced_at": row[1]}
+
+    def mark_synced(self, platform: str, repo: str, kind: str, covered_since: Optional[str], synced_at: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO syncs (platform, repo, kind, covered_since, synced_at) VALUES (?, ?, ?, ?, ?)",
+                (platform, repo, kind, covered_since, synced_at)
+            )
+
+    def repos(self, platform: str, kind: str) -> List[str]:
+        """Repositories with synchronized records of a kind"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT repo FROM syncs WHERE platform = ? AND kind = ? ORDER BY repo", (platform, kind)
+            ).fetchall()
+        return [repo for (repo,) in rows]
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def utc_now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,232 @@
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+# Registro próprio: só as métricas da extração, sem as do processo Python
+REGISTRY = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+REQUEST_SECONDS = Histogram(
+    "extraction_request_seconds",
+    "API request latency",
+    ["endpoint", "operation", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+TRANSFER_BYTES = Counter(
+    "extraction_transfer_bytes",
+    "Bytes sent and received",
+    ["endpoint", "direction"],
+    registry=REGISTRY,
+)
+GRAPHQL_COST = Counter(
+    "extraction_graphql_cost",
+    "GraphQL rate-limit points spent",
+    ["endpoint"],
+    registry=REGISTRY,
+)
+RATE_LIMIT_REMAINING = Gauge(
+    "extraction_rate_limit_remaining",
+    "Remaining rate-limit budget reported by the API",
+    ["endpoint"],
+    registry=REGISTRY,
+)
+RETRIES = Counter(
+    "extraction_retries",
+    "Retried requests",
+    ["endpoint", "reason"],
+    registry=REGISTRY,
+)
+RATE_LIMIT_WAIT_SECONDS = Counter(
+    "extraction_rate_limit_wait_seconds",
+    "Time spent sleeping until the rate limit resets",
+    ["endpoint"],
+    registry=REGISTRY,
+)
+PAGES = Counter(
+    "extraction_pages",
+    "Pages fetched per repository",
+    ["repo", "kind"],
+    registry=REGISTRY,
+)
+RECORDS = Counter(
+    "extraction_records",
+    "Records extracted per repository",
+    ["repo", "kind"],
+    registry=REGISTRY,
+)
+
+# Primeiro campo da query (repository, organization, search, project...), ignorando
+# aliases (p0: project(...)): rótulo de baixa cardinalidade
+OPERATION = re.compile(r"\{\s*(?:\w+\s*:\s*)?(\w+)")
+
+_started_at = time.time()
+_last_used: Dict[tuple, int] = {}
+
+
+def endpoint(url: str) -> str:
+    return urlparse(url).netloc or url
+
+
+def operation(query: Optional[str]) -> str:
+    match = OPERATION.search(query or "")
+    return match.group(1) if match else "unknown"
+
+
+def observe_response(response, started: float, query: Optional[str] = None) -> None:
+    """
+    Records latency, bytes, rate-limit budget and GraphQL cost of a finished request.
+    `started` is the time.perf_counter() taken before sending it.
+    """
+    host = endpoint(response.url)
+    REQUEST_SECONDS.labels(host, operation(query), str(response.status_code)).observe(
+        time.perf_counter() - started
+    )
+    body = response.request.body if response.request is not None else None
+    TRANSFER_BYTES.labels(host, "sent").inc(len(body or b""))
+    TRANSFER_BYTES.labels(host, "received").inc(len(response.content or b""))
+
+    # Retries feitos pelo urllib3 (Retry do HTTPAdapter) antes desta resposta
+    retries = getattr(response.raw, "retries", None)
+    for attempt in getattr(retries, "history", None) or ():
+        record_retry(host, f"http_{attempt.status}" if attempt.status else "network")
+
+    headers = response.headers
+    remaining = headers.get("x-ratelimit-remaining") or headers.get("ratelimit-remaining")
+    if remaining is not None and remaining.isdigit():
+        RATE_LIMIT_REMAINING.labels(host).set(int(remaining))
+
+    # Custo: rateLimit { cost } quando a query pede; senão, variação do x-ratelimit-used
+    # dentro da mesma janela de reset
+    cost = None
+    try:
+        cost = response.json()["data"]["rateLimit"]["cost"]
+    except (ValueError, KeyError, TypeError):
+        used = headers.get("x-ratelimit-used")
+        if used is not None and used.isdigit():
+            key = (host, headers.get("x-ratelimit-resource"), headers.get("x-ratelimit-reset"))
+            previous = _last_used.get(key)
+            _last_used[key] = int(used)
+            if previous is not None and int(used) >= previous:
+                cost = int(used) - previous
+    if cost:
+        GRAPHQL_COST.labels(host).inc(cost)
+
+
+def record_retry(host: str, reason: str) -> None:
+    RETRIES.labels(host, reason).inc()
+
+
+def record_rate_limit_wait(host: str, seconds: float) -> None:
+    RATE_LIMIT_WAIT_SECONDS.labels(host).inc(seconds)
+
+
+def record_page(repo: str, kind: str, records: int) -> None:
+    PAGES.labels(repo, kind).inc()
+    RECORDS.labels(repo, kind).inc(records)
+
+
+def serve(port: Optional[int]) -> None:
+    """Exposes /metrics on localhost:<port> (no-op when port is None/0)"""
+    if port:
+        start_http_server(int(port), addr="127.0.0.1", registry=REGISTRY)
+        print(f"Prometheus metrics at http://127.0.0.1:{port}/metrics")
+
+
+def _histogram_quantile(buckets, count, q):
+    """Quantile from cumulative (upper bound, count) buckets, interpolating inside the bucket"""
+    rank = q * count
+    lower, below = 0.0, 0
+    for upper, cumulative in buckets:
+        if cumulative >= rank:
+            if upper == float("inf"):
+                return lower
+            inside = cumulative - below
+            return lower + (upper - lower) * ((rank - below) / inside if inside else 0)
+        lower, below = upper, cumulative
+    return lower
+
+
+def summary() -> Dict:
+    """Run report: totals per endpoint/operation and per repository"""
+    requests: Dict[str, Dict] = {}
+    histograms: Dict[tuple, Dict] = {}
+    totals: Dict[str, Dict] = {}
+    repos: Dict[str, Dict] = {}
+
+    for family in REGISTRY.collect():
+        for sample in family.samples:
+            labels = sample.labels
+            if family.name == "extraction_request_seconds":
+                key = (labels["endpoint"], labels["operation"])
+                h = histograms.setdefault(key, {"buckets": {}, "count": 0, "sum": 0.0, "errors": 0})
+                if sample.name.endswith("_bucket"):
+                    le = float(labels["le"])
+                    h["buckets"][le] = h["buckets"].get(le, 0) + sample.value
+                elif sample.name.endswith("_count"):
+                    h["count"] += sample.value
+                    if not labels["status"].startswith("2"):
+                        h["errors"] += sample.value
+                elif sample.name.endswith("_sum"):
+                    h["sum"] += sample.value
+            elif family.name in ("extraction_pages", "extraction_records") and sample.name.endswith("_total"):
+                repo = repos.setdefault(labels["repo"], {})
+                field = "pages" if family.name == "extraction_pages" else "records"
+                repo.setdefault(labels["kind"], {"pages": 0, "records": 0})[field] += int(sample.value)
+            elif sample.name.endswith("_total") or family.type == "gauge":
+                host = labels.get("endpoint")
+                entry = totals.setdefault(host, {})
+                name = family.name.replace("extraction_", "")
+                if "direction" in labels:
+                    name = f"bytes_{labels['direction']}"
+                elif "reason" in labels:
+                    entry.setdefault("retries", {})[labels["reason"]] = int(sample.value)
+                    continue
+                entry[name] = sample.value
+
+    for (host, op), h in sorted(histograms.items()):
+        buckets = sorted(h["buckets"].items())
+        count = h["count"]
+        requests[f"{host} {op}"] = {
+            "requests": int(count),
+            "errors": int(h["errors"]),
+            "seconds": round(h["sum"], 3),
+            "mean_seconds": round(h["sum"] / count, 3) if count else None,
+            "p50_seconds": round(_histogram_quantile(buckets, count, 0.5), 3) if count else None,
+            "p95_seconds": round(_histogram_quantile(buckets, count, 0.95), 3) if count else None,
+        }
+
+    finished = time.time()
+    return {
+        "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(_started_at)),
+        "finished_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(finished)),
+        "duration_seconds": round(finished - _started_at, 1),
+        "requests": requests,
+        "endpoints": totals,
+        "repositories": repos,
+    }
+
+
+def write_report(folder: str, name: str = "extraction") -> str:
+    """Writes <folder>/<name>_<timestamp>.json (summary) and .prom (Prometheus text format)"""
+    os.makedirs(folder, exist_ok=True)
+    base = os.path.join(folder, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(summary(), f, indent=2, ensure_ascii=False)
+    with open(base + ".prom", "wb") as f:
+        f.write(generate_latest(REGISTRY))
+    print(f"Run report saved in {base}.json")
+    return base + ".json"
@@ -1,11 +1,17 @@
 import json
 import os
 import itertools
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from common import profiling  # noqa: E402  (--profile, compartilhado com o pipeline)
 
 # Caminho do arquivo de entrada (gerado pelo filter_users.py)
 INPUT_FILE = '../pipeline/data/graph_interactions_merged.json'
 # Caminho do arquivo de saída (com categorias e novos nós)
 OUTPUT_FILE = '../pipeline/data/graph_interactions_categorized.json'
+# Saída do --profile
+PROFILES_DIR = '../pipeline/data/profiles'
 
 # --- 1. CONFIGURAÇÃO DE CATEGORIAS EXISTENTES (PRESERVAR DO BANCO) ---
 # Formato: username,Categoria
@@ -152,6 +158,7 @@ def main():
         data = json.load(f)
     
     # 1. Carregar mapeamentos
+    profiling.stage("categorias")
     existing_cat_map = parse_categories(RAW_CATEGORIES_EXISTING)
     manual_nodes_map = parse_manual_nodes(MANUAL_DATA_RAW)
     
@@ -204,6 +211,7 @@ def main():
         print(f"Grupo {g}: {len(m)} membros")
 
     # 3. Processar Conexões
+    profiling.stage("conexoes")
     new_links = []
     
     # Helper set para não duplicar conexões
@@ -327,9 +335,12 @@ def main():
     data['links'].extend(new_links)
     print(f"Total de conexões adicionadas: {len(new_links)}")
     
+    profiling.stage("salvar")
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
     print(f"Arquivo salvo: {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    main()
+    # python categorize_nodes.py [--profile]
+    with profiling.session("categorize_nodes", PROFILES_DIR):
+        main()
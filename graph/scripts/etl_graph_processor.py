@@ -1,11 +1,25 @@
 import json
 import os
 import glob
+import sys
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
 from itertools import combinations
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from common import profiling  # noqa: E402  (--profile, compartilhado com o pipeline)
+from common.semesters import SEMESTERS  # noqa: E402  (mesmas faixas de metrics/scripts)
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, '../pipeline/data')
 OUTPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions.json')
+# Snapshots por janela de tempo (grafo base + deltas de peso das arestas)
+TEMPORAL_OUTPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_temporal.json')
+PROFILES_DIR = os.path.join(BASE_DIR, '../pipeline/data/profiles')
+
+# Janelas temporais: os SEMESTERS de common/semesters.py.
+# Com WINDOW_DAYS definido (ex: 30), usa janelas fixas de N dias no lugar dos semestres.
+WINDOW_DAYS = None
 
 BOTS = {'sonarqubecloud', 'github-actions', 'dependabot', 'renovate', 'dependabot[bot]', 'gitlab-bot', 'actions-user'}
 
@@ -17,6 +31,138 @@ def clean_username(username):
         return None
     return clean
 
+def parse_timestamp(value):
+    """Converte datas ISO da API (com 'Z') ou 'YYYY-MM-DD HH:MM:SS' para datetime UTC"""
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+def build_windows(timestamps):
+    """Lista de janelas {name, start, end} ordenadas e sem sobreposição"""
+    if not WINDOW_DAYS:
+        return [
+            {"name": s["name"], "start": parse_timestamp(s["start"]), "end": parse_timestamp(s["end"])}
+            for s in sorted(SEMESTERS, key=lambda s: s["start"])
+        ]
+
+    if not timestamps:
+        return []
+    step = timedelta(days=WINDOW_DAYS)
+    first = min(timestamps).replace(hour=0, minute=0, second=0, microsecond=0)
+    last = max(timestamps)
+    windows = []
+    start = first
+    while start <= last:
+        end = start + step - timedelta(seconds=1)
+        windows.append({"name": start.strftime('%Y-%m-%d'), "start": start, "end": end})
+        start += step
+    return windows
+
+def assign_window(ts, starts, windows):
+    """Busca binária da janela que contém ts (None se cair num intervalo entre janelas)"""
+    i = bisect_right(starts, ts) - 1
+    if i >= 0 and ts <= windows[i]["end"]:
+        return i
+    return None
+
+def build_temporal_snapshots(nodes, links):
+    """
+    Monta um snapshot do grafo por janela, codificado como grafo base (primeira
+    janela) + deltas de peso por aresta entre janelas consecutivas.
+
+    O peso de uma aresta numa janela é só o das interações datadas que caem
+    naquela janela. A parte sem data (repositórios compartilhados e interações
+    sem data) não pertence a nenhuma janela: sai uma vez só, na camada `static`,
+    que o visualizador pode somar ou não aos snapshots.
+    """
+    timed = []
+    static_weight = {}
+    undated = 0
+    for link in links:
+        key = (link['source'], link['target'])
+        dated = 0
+        for inter in link['interactions']:
+            ts = parse_timestamp(inter.get('at'))
+            if ts:
+                timed.append((key, ts))
+                dated += 1
+            else:
+                undated += 1
+        # Interações sem data ficam na camada estática para não sumirem do grafo
+        static_weight[key] = link['value'] - 2 * dated
+
+    windows = build_windows([ts for _, ts in timed])
+    starts = [w["start"] for w in windows]
+
+    per_window = [dict() for _ in windows]
+    for key, ts in timed:
+        i = assign_window(ts, starts, windows)
+        if i is not None:
+            per_window[i][key] = per_window[i].get(key, 0) + 2
+
+    base = []
+    deltas = []
+    previous = {}
+    for i, window in enumerate(windows):
+        current = per_window[i]
+        if i == 0:
+            base = [[s, t, round(w, 4)] for (s, t), w in sorted(current.items())]
+        else:
+            changes = []
+            for key in sorted(set(previous) | set(current)):
+                diff = current.get(key, 0) - previous.get(key, 0)
+                if abs(diff) > 1e-9:
+                    changes.append([key[0], key[1], round(diff, 4)])
+            deltas.append({"window": window["name"], "changes": changes})
+        previous = current
+
+    if undated:
+        print(f"   - Interações sem data (mantidas na camada estática): {undated}")
+
+    return {
+        "windows": [
+            {"name": w["name"], "start": w["start"].isoformat(), "end": w["end"].isoformat()}
+            for w in windows
+        ],
+        "nodes": nodes,
+        "base": base,
+        "deltas": deltas,
+        "static": [[s, t, round(w, 4)] for (s, t), w in sorted(static_weight.items()) if w > 0],
+    }
+
+def iter_snapshots(temporal, include_static=False):
+    """
+    Reconstrói cada janela a partir do base + deltas: gera (janela, {(source, target): peso}).
+    Com include_static, a camada sem data é somada a cada janela.
+    """
+    windows = temporal.get("windows", [])
+    if not windows:
+        return
+    static = {(s, t): w for s, t, w in temporal.get("static", [])} if include_static else {}
+
+    def with_static(weights):
+        merged = dict(static)
+        for key, w in weights.items():
+            merged[key] = round(merged.get(key, 0) + w, 4)
+        return merged
+
+    weights = {(s, t): w for s, t, w in temporal["base"]}
+    yield windows[0], with_static(weights)
+    for window, delta in zip(windows[1:], temporal["deltas"]):
+        for s, t, diff in delta["changes"]:
+            value = round(weights.get((s, t), 0) + diff, 4)
+            if value > 0:
+                weights[(s, t)] = value
+            else:
+                weights.pop((s, t), None)
+        yield window, with_static(weights)
+
 def run_pipeline():
     json_files = glob.glob(os.path.join(DATA_DIR, '*.json'))
     
@@ -59,7 +205,7 @@ def run_pipeline():
             }
         return links_map[key]
 
-    def add_interaction(actor, target, action_type, repo_name):
+    def add_interaction(actor, target, action_type, repo_name, at=None):
         """Registra uma ação específica (Merge, Close, etc)"""
         link = get_or_create_link(actor, target)
         if link:
@@ -68,11 +214,13 @@ def run_pipeline():
                 'actor': actor,
                 'target': target,
                 'type': action_type,
-                'repo': repo_name
+                'repo': repo_name,
+                'at': at
             })
             
             link['shared_repos'].add(repo_name)
 
+    profiling.stage("interacoes")
     for file_path in json_files:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -121,14 +269,16 @@ def run_pipeline():
                 for pr in repo.get('pull_requests', []) + repo.get('merge_requests', []):
                     author = clean_username(pr.get('author'))
                     merger = clean_username(pr.get('merged_by'))
+                    # Data da interação: merge/fechamento quando existir, senão criação
+                    pr_at = pr.get('merged_at') or pr.get('closed_at') or pr.get('created_at')
                     
                     if author and merger:
-                        add_interaction(merger, author, 'MERGED_PR', repo_name)
+                        add_interaction(merger, author, 'MERGED_PR', repo_name, pr_at)
 
                     for rev in pr.get('reviewers', []):
                         reviewer = clean_username(rev)
                         if reviewer and author:
-                            add_interaction(reviewer, author, 'REVIEWED_PR', repo_name)
+                            add_interaction(reviewer, author, 'REVIEWED_PR', repo_name, pr_at)
 
                 # Issues
                 for issue in repo.get('issues', []):
@@ -136,11 +286,13 @@ def run_pipeline():
                     closer = clean_username(issue.get('closed_by'))
                     
                     if author and closer:
-                        add_interaction(closer, author, 'CLOSED_ISSUE', repo_name)
+                        add_interaction(closer, author, 'CLOSED_ISSUE', repo_name,
+                                        issue.get('closed_at') or issue.get('created_at'))
 
         except Exception as e:
             print(f"Erro em {file_path}: {e}")
 
+    profiling.stage("salvar_grafo")
     final_nodes = []
     for uid, data in nodes_map.items():
         data['sources'] = list(data['sources'])
@@ -161,5 +313,18 @@ def run_pipeline():
     print(f"   - Pessoas: {len(final_nodes)}")
     print(f"   - Conexões: {len(final_links)}")
 
+    profiling.stage("snapshots_temporais")
+    temporal = build_temporal_snapshots(final_nodes, final_links)
+    with open(TEMPORAL_OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(temporal, f, ensure_ascii=False)
+
+    print(f"\nSnapshots temporais gerados em: {TEMPORAL_OUTPUT_FILE}")
+    print(f"   - Janelas: {len(temporal['windows'])}")
+    print(f"   - Arestas no base: {len(temporal['base'])}")
+    print(f"   - Deltas: {sum(len(d['changes']) for d in temporal['deltas'])}")
+    print(f"   - Arestas na camada estática: {len(temporal['static'])}")
+
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    # python etl_graph_processor.py [--profile]
+    with profiling.session("etl_graph_processor", PROFILES_DIR):
+        run_pipeline()
\ No newline at end of file
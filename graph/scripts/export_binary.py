@@ -0,0 +1,315 @@
+import gzip
+import json
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele só o .gz é gerado
+    brotli = None
+
+# --- CONFIGURAÇÕES ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_CANDIDATES = [
+    os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_analytics.json'),
+    os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_layout.json'),
+    os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_categorized.json'),
+]
+OUTPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions.bin')
+
+# Formato colunar (little-endian, todas as seções alinhadas em 4 bytes):
+#   cabeçalho: MAGIC, versão, flags
+#   tabela de strings: ids, grupos, repositórios, orgs, tipos e URLs aparecem uma única vez
+#   nós: colunas u32/f32 (id, grupo, val, img, x, y) + fontes em CSR + colunas numéricas extras
+#   links: colunas u32/f32 (source, target, value) + repos e interações em CSR
+#          (datas das interações em segundos desde 1970, 0 = sem data)
+# O decodificador JS fica em graph/graph/src/utils/decodeGraph.ts.
+MAGIC = b'EBLG'
+VERSION = 1
+FLAG_LAYOUT = 1
+NO_STRING = 0xFFFFFFFF  # img == avatar padrão do GitHub (https://github.com/<id>.png)
+
+BASE_NODE_KEYS = {'id', 'group', 'val', 'img', 'sources', 'x', 'y'}
+
+
+def _link_endpoint(value):
+    """Links podem vir como string ou como objeto (quando salvos pelo frontend)"""
+    return value['id'] if isinstance(value, dict) else value
+
+
+def default_avatar(uid):
+    return f"https://github.com/{uid}.png"
+
+
+class StringTable:
+    """Dicionário string -> índice, na ordem de inserção"""
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value):
+        value = '' if value is None else str(value)
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+
+def _pack(typecode, values):
+    """Array tipado em little-endian (o mesmo layout lido pelos TypedArrays no navegador)"""
+    arr = array(typecode, values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _pack_u32(values):
+    return _pack('I', values)
+
+
+def _pack_f32(values):
+    return _pack('f', values)
+
+
+def _epoch(value):
+    """Data ISO -> segundos desde 1970 (0 = sem data)"""
+    if not value:
+        return 0
+    ts = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+def _iso(seconds):
+    if not seconds:
+        return None
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _csr(rows):
+    """Lista de listas -> (offsets, valores) no formato CSR"""
+    offsets = [0]
+    values = []
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def encode_graph(data):
+    """Serializa {nodes, links} para o formato binário colunar"""
+    nodes = data.get('nodes', [])
+    links = data.get('links', [])
+    table = StringTable()
+    node_index = {n['id']: i for i, n in enumerate(nodes)}
+
+    node_ids = [table.add(n['id']) for n in nodes]
+    node_groups = [table.add(n.get('group')) for n in nodes]
+    node_vals = [float(n.get('val', 1) or 0) for n in nodes]
+    node_imgs = [
+        NO_STRING if n.get('img') == default_avatar(n['id']) else table.add(n.get('img'))
+        for n in nodes
+    ]
+    source_offsets, source_values = _csr(
+        [[table.add(s) for s in n.get('sources', [])] for n in nodes]
+    )
+
+    has_layout = bool(nodes) and all('x' in n and 'y' in n for n in nodes)
+    flags = FLAG_LAYOUT if has_layout else 0
+
+    # Atributos numéricos extras (ex: métricas do graph_analytics.py) viram colunas f32
+    extra_keys = sorted({
+        k for n in nodes for k, v in n.items()
+        if k not in BASE_NODE_KEYS and isinstance(v, (int, float)) and not isinstance(v, bool)
+    })
+    extra_keys = [k for k in extra_keys if all(isinstance(n.get(k, 0), (int, float)) for n in nodes)]
+
+    kept_links = []
+    for link in links:
+        s = node_index.get(_link_endpoint(link['source']))
+        t = node_index.get(_link_endpoint(link['target']))
+        if s is not None and t is not None:
+            kept_links.append((s, t, link))
+
+    repo_offsets, repo_values = _csr(
+        [[table.add(r) for r in link.get('shared_repos', [])] for _, _, link in kept_links]
+    )
+    interactions = [link.get('interactions', []) for _, _, link in kept_links]
+    inter_offsets, _ = _csr(interactions)
+    flat = [i for row in interactions for i in row]
+    inter_actor = [table.add(i.get('actor')) for i in flat]
+    inter_target = [table.add(i.get('target')) for i in flat]
+    inter_type = [table.add(i.get('type')) for i in flat]
+    inter_repo = [table.add(i.get('repo')) for i in flat]
+    inter_at = [_epoch(i.get('at')) for i in flat]
+
+    encoded = [s.encode('utf-8') for s in table.strings]
+    string_offsets, pos = [0], 0
+    for b in encoded:
+        pos += len(b)
+        string_offsets.append(pos)
+    blob = b''.join(encoded)
+    blob += b'\0' * (-len(blob) % 4)
+
+    parts = [
+        MAGIC,
+        struct.pack('<III', VERSION, flags, len(table.strings)),
+        struct.pack('<I', len(blob)),
+        _pack_u32(string_offsets),
+        blob,
+        # Nós
+        struct.pack('<II', len(nodes), len(extra_keys)),
+        _pack_u32(node_ids),
+        _pack_u32(node_groups),
+        _pack_f32(node_vals),
+        _pack_u32(node_imgs),
+        _pack_u32(source_offsets),
+        _pack_u32(source_values),
+    ]
+    if has_layout:
+        parts.append(_pack_f32([float(n['x']) for n in nodes]))
+        parts.append(_pack_f32([float(n['y']) for n in nodes]))
+    for key in extra_keys:
+        name = key.encode('utf-8')
+        parts.append(struct.pack('<I', len(name)))
+        parts.append(name + b'\0' * (-len(name) % 4))
+        parts.append(_pack_f32([float(n.get(key, 0)) for n in nodes]))
+
+    parts += [
+        # Links
+        struct.pack('<II', len(kept_links), len(flat)),
+        _pack_u32([s for s, _, _ in kept_links]),
+        _pack_u32([t for _, t, _ in kept_links]),
+        _pack_f32([float(link.get('value', 0) or 0) for _, _, link in kept_links]),
+        _pack_u32(repo_offsets),
+        _pack_u32(repo_values),
+        _pack_u32(inter_offsets),
+        _pack_u32(inter_actor),
+        _pack_u32(inter_target),
+        _pack_u32(inter_type),
+        _pack_u32(inter_repo),
+        _pack_u32(inter_at),
+    ]
+    return b''.join(parts)
+
+
+class _Reader:
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        self.pos = 0
+
+    def u32(self, count=1):
+        values = struct.unpack_from(f'<{count}I', self.buffer, self.pos)
+        self.pos += 4 * count
+        return list(values)
+
+    def f32(self, count):
+        values = struct.unpack_from(f'<{count}f', self.buffer, self.pos)
+        self.pos += 4 * count
+        return list(values)
+
+    def raw(self, size):
+        chunk = bytes(self.buffer[self.pos:self.pos + size])
+        self.pos += size + (-size % 4)
+        return chunk
+
+
+def decode_graph(buffer):
+    """Inverso de encode_graph (floats voltam com precisão f32)"""
+    r = _Reader(buffer)
+    if r.raw(4) != MAGIC:
+        raise ValueError("Arquivo não está no formato EBLG")
+    version, flags, n_strings = r.u32(3)
+    if version != VERSION:
+        raise ValueError(f"Versão {version} não suportada")
+    blob_size = r.u32()[0]
+    string_offsets = r.u32(n_strings + 1)
+    blob = r.raw(blob_size)
+    strings = [blob[a:b].decode('utf-8') for a, b in zip(string_offsets, string_offsets[1:])]
+
+    n_nodes, n_extra = r.u32(2)
+    ids = [strings[i] for i in r.u32(n_nodes)]
+    groups = [strings[i] for i in r.u32(n_nodes)]
+    vals = r.f32(n_nodes)
+    imgs = r.u32(n_nodes)
+    source_offsets = r.u32(n_nodes + 1)
+    source_values = r.u32(source_offsets[-1])
+
+    nodes = []
+    for i, uid in enumerate(ids):
+        nodes.append({
+            'id': uid,
+            'group': groups[i],
+            'val': vals[i],
+            'img': default_avatar(uid) if imgs[i] == NO_STRING else strings[imgs[i]],
+            'sources': [strings[j] for j in source_values[source_offsets[i]:source_offsets[i + 1]]],
+        })
+    if flags & FLAG_LAYOUT:
+        for node, x in zip(nodes, r.f32(n_nodes)):
+            node['x'] = x
+        for node, y in zip(nodes, r.f32(n_nodes)):
+            node['y'] = y
+    for _ in range(n_extra):
+        name = r.raw(r.u32()[0]).decode('utf-8')
+        for node, value in zip(nodes, r.f32(n_nodes)):
+            node[name] = value
+
+    n_links, n_inter = r.u32(2)
+    sources = r.u32(n_links)
+    targets = r.u32(n_links)
+    values = r.f32(n_links)
+    repo_offsets = r.u32(n_links + 1)
+    repo_values = r.u32(repo_offsets[-1])
+    inter_offsets = r.u32(n_links + 1)
+    actor, target, kind, repo, at = (r.u32(n_inter) for _ in range(5))
+
+    links = []
+    for i in range(n_links):
+        a, b = inter_offsets[i], inter_offsets[i + 1]
+        links.append({
+            'source': ids[sources[i]],
+            'target': ids[targets[i]],
+            'value': values[i],
+            'shared_repos': [strings[j] for j in repo_values[repo_offsets[i]:repo_offsets[i + 1]]],
+            'interactions': [
+                {'actor': strings[actor[j]], 'target': strings[target[j]],
+                 'type': strings[kind[j]], 'repo': strings[repo[j]], 'at': _iso(at[j])}
+                for j in range(a, b)
+            ],
+        })
+    return {'nodes': nodes, 'links': links}
+
+
+def main():
+    input_file = next((p for p in INPUT_CANDIDATES if os.path.exists(p)), None)
+    if input_file is None:
+        print("Erro: nenhum arquivo do grafo encontrado. Rode o pipeline antes.")
+        return
+
+    print(f"Lendo {input_file}...")
+    with open(input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    payload = encode_graph(data)
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(payload)
+    with open(OUTPUT_FILE + '.gz', 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=9))
+    if brotli is not None:
+        with open(OUTPUT_FILE + '.br', 'wb') as f:
+            f.write(brotli.compress(payload, quality=11))
+
+    print(f"JSON original: {os.path.getsize(input_file) / 1024:.1f} KB")
+    for suffix in ('', '.gz', '.br'):
+        path = OUTPUT_FILE + suffix
+        if os.path.exists(path):
+            print(f"{os.path.basename(path)}: {os.path.getsize(path) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
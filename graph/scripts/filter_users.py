@@ -1,11 +1,16 @@
 import json
 import os
 import copy
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from common import profiling  # noqa: E402  (--profile, compartilhado com o pipeline)
 
 # --- CONFIGURAÇÕES ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions.json')
 OUTPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_merged.json')
+PROFILES_DIR = os.path.join(BASE_DIR, '../pipeline/data/profiles')
 
 # Sua lista de identidades (Primeiro nome = ID Oficial/Mestre)
 RAW_LIST = """
@@ -197,6 +202,7 @@ def main():
     print(f"Mapeamento criado para {len(id_map)} aliases apontando para {len(valid_masters)} usuários únicos.")
 
     # 2. Carregar
+    profiling.stage("carregar")
     if not os.path.exists(INPUT_FILE):
         print("Arquivo de entrada não encontrado.")
         return
@@ -205,10 +211,13 @@ def main():
         data = json.load(f)
 
     # 3. Processar
+    profiling.stage("merge_nodes")
     final_nodes = merge_nodes(data.get('nodes', []), id_map)
+    profiling.stage("merge_links")
     final_links = merge_links(data.get('links', []), id_map, valid_masters)
 
     # 4. Salvar
+    profiling.stage("salvar")
     output = {"nodes": final_nodes, "links": final_links}
     
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
@@ -220,4 +229,6 @@ def main():
     print(f"Arquivo salvo em: {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python filter_users.py [--profile]
+    with profiling.session("filter_users", PROFILES_DIR):
+        main()
\ No newline at end of file
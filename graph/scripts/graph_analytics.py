@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import spsolve
+
+# --- CONFIGURAÇÕES ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Entrada: saída do layout_graph.py (as métricas não dependem de x/y)
+INPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_layout.json')
+OUTPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_analytics.json')
+# Resultados ficam em cache por impressão digital do grafo (nós + arestas + pesos)
+CACHE_DIR = os.path.join(BASE_DIR, '../pipeline/data/cache')
+
+# Acima desse número de nós a betweenness é aproximada por amostragem de pivôs
+EXACT_BETWEENNESS_LIMIT = 300
+BETWEENNESS_SAMPLES = 128
+LOUVAIN_RESOLUTION = 1.0
+SEED = 42
+
+
+def _link_endpoint(value):
+    """Links podem vir como string ou como objeto (quando salvos pelo frontend)"""
+    return value['id'] if isinstance(value, dict) else value
+
+
+def graph_fingerprint(nodes, links):
+    """Hash estável da estrutura do grafo; ignora atributos visuais (img, x, y...)"""
+    h = hashlib.sha256()
+    for uid in sorted(n['id'] for n in nodes):
+        h.update(f"n|{uid}\n".encode('utf-8'))
+    edges = sorted(
+        (*sorted((_link_endpoint(l['source']), _link_endpoint(l['target']))), float(l.get('value', 0) or 0))
+        for l in links
+    )
+    for s, t, w in edges:
+        h.update(f"e|{s}|{t}|{w!r}\n".encode('utf-8'))
+    return h.hexdigest()
+
+
+def build_adjacency(nodes, links):
+    """
+    Matriz de adjacência CSR simétrica e ponderada (soma de `value`).
+    Links duplicados ou nas duas direções (filter_users gera links direcionais) são somados.
+    """
+    ids = [n['id'] for n in nodes]
+    index = {uid: i for i, uid in enumerate(ids)}
+    rows, cols, vals = [], [], []
+    for link in links:
+        s = index.get(_link_endpoint(link['source']))
+        t = index.get(_link_endpoint(link['target']))
+        if s is None or t is None or s == t:
+            continue
+        rows.append(s)
+        cols.append(t)
+        vals.append(float(link.get('value', 0) or 0) or 1.0)
+    n = len(ids)
+    w = sparse.coo_matrix((vals, (rows, cols)), shape=(n, n)).tocsr()
+    adj = (w + w.T).tocsr()
+    adj.sum_duplicates()
+    adj.eliminate_zeros()
+    return ids, adj
+
+
+def eigenvector_centrality(adj, max_iter=200, tol=1e-8):
+    """Centralidade de autovetor ponderada por power iteration (A + I para garantir convergência)"""
+    n = adj.shape[0]
+    if n == 0:
+        return np.zeros(0)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        nxt = adj @ x + x
+        norm = np.linalg.norm(nxt)
+        if norm == 0:
+            return np.zeros(n)
+        nxt /= norm
+        if np.abs(nxt - x).sum() < n * tol:
+            x = nxt
+            break
+        x = nxt
+    return x / x.max()
+
+
+def betweenness_centrality(adj, samples=None, seed=SEED):
+    """
+    Betweenness ponderada (Brandes), com distância = 1 / peso da conexão.
+
+    Para cada fonte, o Dijkstra roda no scipy e a contagem de caminhos mínimos
+    (sigma) e a acumulação de dependências (delta) são resolvidas como dois
+    sistemas esparsos triangulares sobre o DAG de caminhos mínimos, sem laço
+    Python por nó. Com `samples`, usa apenas esse número de fontes aleatórias
+    e reescala o resultado (aproximação de Brandes-Pich).
+    """
+    n = adj.shape[0]
+    bc = np.zeros(n)
+    if n < 3:
+        return bc
+
+    lengths = adj.copy()
+    lengths.data = 1.0 / lengths.data
+    coo = lengths.tocoo()
+    src, dst, length = coo.row, coo.col, coo.data
+
+    sources = np.arange(n)
+    if samples is not None and samples < n:
+        sources = np.random.default_rng(seed).choice(n, size=samples, replace=False)
+
+    dist_all = csgraph.dijkstra(lengths, directed=False, indices=sources)
+    identity = sparse.identity(n, format='csc')
+
+    for s, dist in zip(sources, dist_all):
+        reach = np.isfinite(dist)
+        if reach.sum() < 2:
+            continue
+        # Arestas "apertadas": pertencem a algum caminho mínimo a partir de s
+        tight = reach[src] & np.isclose(dist[src] + length, dist[dst], rtol=1e-9, atol=1e-12)
+        dag = sparse.csc_matrix(
+            (np.ones(tight.sum()), (src[tight], dst[tight])), shape=(n, n)
+        )
+        e_s = np.zeros(n)
+        e_s[s] = 1.0
+        sigma = spsolve((identity - dag.T).tocsc(), e_s)
+
+        inv_sigma = np.zeros(n)
+        inv_sigma[reach] = 1.0 / sigma[reach]
+        g = spsolve((identity - dag).tocsc(), inv_sigma)
+        delta = np.where(reach, sigma * g - 1.0, 0.0)
+        delta[s] = 0.0
+        bc += delta
+
+    # Grafo não direcionado: cada par é contado nos dois sentidos
+    bc /= 2.0
+    if len(sources) < n:
+        bc *= n / len(sources)
+    return bc * (2.0 / ((n - 1) * (n - 2)))
+
+
+def k_core(adj):
+    """Número de núcleo (k-core) de cada nó, por remoção sucessiva vetorizada"""
+    n = adj.shape[0]
+    pattern = adj.copy()
+    pattern.data = np.ones_like(pattern.data)
+    degree = np.asarray(pattern.sum(axis=1)).ravel()
+    core = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    k = 0
+    while alive.any():
+        k = max(k, int(degree[alive].min()))
+        while True:
+            peel = alive & (degree <= k)
+            if not peel.any():
+                break
+            core[peel] = k
+            alive &= ~peel
+            degree -= pattern @ peel.astype(float)
+    return core
+
+
+def louvain_communities(adj, resolution=LOUVAIN_RESOLUTION, seed=SEED):
+    """
+    Comunidades por Louvain: movimentos locais que aumentam a modularidade,
+    depois agregação das comunidades em super-nós (P^T A P) até estabilizar.
+    """
+    n = adj.shape[0]
+    membership = np.arange(n)
+    total = adj.sum()
+    if total == 0:
+        return membership
+
+    rng = np.random.default_rng(seed)
+    graph = adj.tocsr()
+    two_m = total
+
+    while True:
+        size = graph.shape[0]
+        strength = np.asarray(graph.sum(axis=1)).ravel()
+        community = np.arange(size)
+        community_total = strength.copy()
+
+        improved = False
+        moved = True
+        while moved:
+            moved = False
+            for i in rng.permutation(size):
+                start, stop = graph.indptr[i], graph.indptr[i + 1]
+                neigh = graph.indices[start:stop]
+                weights = graph.data[start:stop]
+                mask = neigh != i
+                neigh, weights = neigh[mask], weights[mask]
+
+                current = community[i]
+                community_total[current] -= strength[i]
+
+                labels, inverse = np.unique(community[neigh], return_inverse=True)
+                links_to = np.bincount(inverse, weights=weights)
+                gains = links_to - resolution * community_total[labels] * strength[i] / two_m
+
+                own = labels == current
+                stay_gain = gains[own][0] if own.any() else -resolution * community_total[current] * strength[i] / two_m
+                best = current
+                if len(gains) and gains.max() > stay_gain + 1e-12:
+                    best = labels[np.argmax(gains)]
+
+                community_total[best] += strength[i]
+                if best != current:
+                    community[i] = best
+                    moved = True
+                    improved = True
+
+        if not improved:
+            break
+
+        # Agrega: cada comunidade vira um super-nó
+        _, community = np.unique(community, return_inverse=True)
+        membership = community[membership]
+        p = sparse.csr_matrix(
+            (np.ones(size), (np.arange(size), community)), shape=(size, community.max() + 1)
+        )
+        graph = (p.T @ graph @ p).tocsr()
+
+    # Rótulos ordenados por tamanho da comunidade (0 = maior)
+    labels, counts = np.unique(membership, return_counts=True)
+    rank = np.empty_like(labels)
+    rank[np.argsort(-counts, kind='stable')] = np.arange(len(labels))
+    return rank[np.searchsorted(labels, membership)]
+
+
+def compute_metrics(nodes, links):
+    """Calcula todas as métricas e retorna {id: {métrica: valor}}"""
+    ids, adj = build_adjacency(nodes, links)
+    n = len(ids)
+    if n == 0:
+        return {}
+
+    pattern = adj.copy()
+    pattern.data = np.ones_like(pattern.data)
+    degree = np.asarray(pattern.sum(axis=1)).ravel()
+    weighted_degree = np.asarray(adj.sum(axis=1)).ravel()
+
+    samples = None if n <= EXACT_BETWEENNESS_LIMIT else BETWEENNESS_SAMPLES
+    betweenness = betweenness_centrality(adj, samples=samples)
+    eigenvector = eigenvector_centrality(adj)
+    core = k_core(adj)
+    community = louvain_communities(adj)
+
+    return {
+        uid: {
+            'degree': int(degree[i]),
+            'weighted_degree': round(float(weighted_degree[i]), 4),
+            'betweenness': round(float(betweenness[i]), 6),
+            'eigenvector': round(float(eigenvector[i]), 6),
+            'core': int(core[i]),
+            'community': int(community[i]),
+        }
+        for i, uid in enumerate(ids)
+    }
+
+
+def load_or_compute_metrics(nodes, links, cache_dir=CACHE_DIR):
+    """Reaproveita o resultado em cache quando o grafo não mudou"""
+    fingerprint = graph_fingerprint(nodes, links)
+    cache_file = os.path.join(cache_dir, f"analytics_{fingerprint[:16]}.json")
+
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('fingerprint') == fingerprint:
+            print(f"Cache encontrado: {cache_file}")
+            return cached['metrics']
+
+    metrics = compute_metrics(nodes, links)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': fingerprint, 'metrics': metrics}, f, ensure_ascii=False)
+    print(f"Métricas salvas em cache: {cache_file}")
+    return metrics
+
+
+def main():
+    if not os.path.exists(INPUT_FILE):
+        print(f"Erro: {INPUT_FILE} não encontrado.")
+        return
+
+    print(f"Lendo {INPUT_FILE}...")
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    nodes = data.get('nodes', [])
+    metrics = load_or_compute_metrics(nodes, data.get('links', []))
+    for node in nodes:
+        node.update(metrics.get(node['id'], {}))
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    communities = {m['community'] for m in metrics.values()}
+    print(f"Métricas calculadas para {len(metrics)} nós ({len(communities)} comunidades)")
+    print(f"Arquivo salvo: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
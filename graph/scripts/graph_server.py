@@ -0,0 +1,219 @@
+import json
+import os
+import sys
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# --- CONFIGURAÇÕES ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Usa o arquivo mais completo disponível do pipeline
+INPUT_CANDIDATES = [
+    os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_analytics.json'),
+    os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_layout.json'),
+    os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_categorized.json'),
+]
+HOST = '127.0.0.1'
+PORT = 8765
+MAX_HOPS = 4
+DEFAULT_TOP_K = 20
+
+
+def _link_endpoint(value):
+    """Links podem vir como string ou como objeto (quando salvos pelo frontend)"""
+    return value['id'] if isinstance(value, dict) else value
+
+
+class GraphIndex:
+    """
+    Índice de adjacência em memória sobre o grafo exportado.
+
+    Cada nó guarda seus vizinhos já ordenados pelo peso do link, então
+    ego-network, k-hop e top-k custam só o tamanho da resposta.
+    """
+
+    def __init__(self, data):
+        self.nodes = {n['id']: n for n in data.get('nodes', [])}
+        self.links = []
+        self.adjacency = {uid: [] for uid in self.nodes}
+        self.link_index = {}
+
+        for link in data.get('links', []):
+            s = _link_endpoint(link['source'])
+            t = _link_endpoint(link['target'])
+            if s not in self.nodes or t not in self.nodes or s == t:
+                continue
+            idx = len(self.links)
+            self.links.append({**link, 'source': s, 'target': t})
+            self.adjacency[s].append((t, idx))
+            self.adjacency[t].append((s, idx))
+            self.link_index.setdefault(frozenset((s, t)), []).append(idx)
+
+        for neighbors in self.adjacency.values():
+            neighbors.sort(key=lambda item: -(self.links[item[1]].get('value', 0) or 0))
+
+        # Links em ordem decrescente de peso, para o top-k global
+        self.links_by_value = sorted(
+            range(len(self.links)), key=lambda i: -(self.links[i].get('value', 0) or 0)
+        )
+
+        self.by_group = {}
+        self.by_org = {}
+        for uid, node in self.nodes.items():
+            self.by_group.setdefault(node.get('group'), set()).add(uid)
+            for org in node.get('sources', []):
+                self.by_org.setdefault(org, set()).add(uid)
+
+    def _induced(self, ids):
+        """Subgrafo induzido: os nós pedidos e todos os links entre eles"""
+        ids = set(ids)
+        link_ids = set()
+        for uid in ids:
+            for neighbor, idx in self.adjacency.get(uid, []):
+                if neighbor in ids:
+                    link_ids.add(idx)
+        return {
+            'nodes': [self.nodes[uid] for uid in ids],
+            'links': [self.links[i] for i in sorted(link_ids)],
+        }
+
+    def neighborhood(self, uid, hops=1):
+        """Nós a até `hops` saltos de uid (BFS), com os links entre eles"""
+        if uid not in self.nodes:
+            raise KeyError(uid)
+        seen = {uid}
+        frontier = deque([(uid, 0)])
+        while frontier:
+            current, depth = frontier.popleft()
+            if depth >= hops:
+                continue
+            for neighbor, _ in self.adjacency[current]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    frontier.append((neighbor, depth + 1))
+        return self._induced(seen)
+
+    def ego(self, uid):
+        return self.neighborhood(uid, hops=1)
+
+    def top_links(self, k=DEFAULT_TOP_K, uid=None):
+        """Os k links mais fortes do grafo inteiro ou de um nó"""
+        if uid is not None:
+            if uid not in self.nodes:
+                raise KeyError(uid)
+            link_ids = [idx for _, idx in self.adjacency[uid][:k]]
+        else:
+            link_ids = self.links_by_value[:k]
+        links = [self.links[i] for i in link_ids]
+        ids = {l['source'] for l in links} | {l['target'] for l in links}
+        return {'nodes': [self.nodes[i] for i in ids], 'links': links}
+
+    def filter(self, groups=None, orgs=None):
+        """Subgrafo induzido pelos nós dos grupos e/ou organizações informados"""
+        ids = set(self.nodes)
+        if groups:
+            ids &= set().union(*(self.by_group.get(g, set()) for g in groups))
+        if orgs:
+            ids &= set().union(*(self.by_org.get(o, set()) for o in orgs))
+        return self._induced(ids)
+
+    def summary(self):
+        return {
+            'nodes': len(self.nodes),
+            'links': len(self.links),
+            'groups': sorted(g for g in self.by_group if g),
+            'orgs': sorted(self.by_org),
+        }
+
+
+def _first(params, name, default=None):
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _int_param(params, name, default, low, high=None):
+    """Parâmetro inteiro limitado a [low, high]; ValueError (400) se não for inteiro"""
+    raw = _first(params, name, default)
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parâmetro '{name}' deve ser inteiro: {raw}")
+    value = max(low, value)
+    return min(value, high) if high is not None else value
+
+
+def make_handler(index):
+    class GraphRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            # Libera o acesso do servidor de desenvolvimento do Vite
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            uid = _first(params, 'id')
+            try:
+                if url.path == '/summary':
+                    payload = index.summary()
+                elif url.path == '/ego':
+                    payload = index.ego(uid)
+                elif url.path == '/neighborhood':
+                    hops = _int_param(params, 'k', 1, 0, MAX_HOPS)
+                    payload = index.neighborhood(uid, hops)
+                elif url.path == '/top-links':
+                    k = _int_param(params, 'k', DEFAULT_TOP_K, 0)
+                    payload = index.top_links(k, uid)
+                elif url.path == '/filter':
+                    payload = index.filter(params.get('group'), params.get('org'))
+                else:
+                    self._send(404, {'error': f"Rota desconhecida: {url.path}"})
+                    return
+            except KeyError:
+                self._send(404, {'error': f"Nó não encontrado: {uid}"})
+                return
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            self._send(200, payload)
+
+        def log_message(self, format, *args):
+            # Sem log por requisição; o terminal fica só com o resumo
+            pass
+
+    return GraphRequestHandler
+
+
+def load_graph():
+    for path in INPUT_CANDIDATES:
+        if os.path.exists(path):
+            print(f"Lendo {path}...")
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    return None
+
+
+def main():
+    data = load_graph()
+    if data is None:
+        print("Erro: nenhum arquivo do grafo encontrado. Rode o pipeline antes.")
+        return
+
+    index = GraphIndex(data)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    server = ThreadingHTTPServer((HOST, port), make_handler(index))
+    print(f"Índice pronto: {len(index.nodes)} nós, {len(index.links)} links")
+    print(f"Servindo em http://{HOST}:{port} (/summary, /ego, /neighborhood, /top-links, /filter)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
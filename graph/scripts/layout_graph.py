@@ -0,0 +1,235 @@
+import json
+import os
+
+import numpy as np
+
+# --- CONFIGURAÇÕES ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Entrada: saída do categorize_nodes.py
+INPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_categorized.json')
+# Saída: mesmo grafo com coordenadas x/y pré-calculadas
+OUTPUT_FILE = os.path.join(BASE_DIR, '../pipeline/data/graph_interactions_layout.json')
+
+# Parâmetros da física (mesma escala do d3 no InteractionGraph.tsx: link.distance(50))
+LINK_DISTANCE = 50.0
+GRAVITY = 0.02
+ITERATIONS = 300
+WARM_ITERATIONS = 80  # Quando reaproveitamos o layout anterior, bastam poucos passos
+SEED = 42
+
+# Acima desse número de nós a repulsão usa aproximação por grade (Barnes-Hut em grade uniforme)
+EXACT_REPULSION_LIMIT = 2000
+GRID_CELLS = 32
+CHUNK_SIZE = 512
+
+
+def _link_endpoint(value):
+    """Links podem vir como string ou como objeto (quando salvos pelo frontend)"""
+    return value['id'] if isinstance(value, dict) else value
+
+
+def _exact_repulsion(pos, k2):
+    """Repulsão k²/d entre todos os pares, vetorizada em blocos para limitar memória"""
+    n = len(pos)
+    disp = np.zeros_like(pos)
+    x, y = pos[:, 0], pos[:, 1]
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        dx = x[start:stop, None] - x[None, :]
+        dy = y[start:stop, None] - y[None, :]
+        dist2 = dx * dx + dy * dy
+        np.maximum(dist2, 1e-2, out=dist2)
+        # Ignora o próprio nó
+        rows = np.arange(stop - start)
+        dist2[rows, rows + start] = np.inf
+        factor = k2 / dist2
+        disp[start:stop, 0] = (dx * factor).sum(axis=1)
+        disp[start:stop, 1] = (dy * factor).sum(axis=1)
+    return disp
+
+
+def _grid_repulsion(pos, k2):
+    """
+    Aproximação Barnes-Hut em grade: nós de células distantes são tratados
+    como uma única massa no centróide da célula; dentro da própria célula a
+    repulsão é exata.
+    """
+    mins = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - mins, 1e-6)
+    cell_xy = np.minimum(((pos - mins) / span * GRID_CELLS).astype(np.int64), GRID_CELLS - 1)
+    cell = cell_xy[:, 0] * GRID_CELLS + cell_xy[:, 1]
+
+    n_cells = GRID_CELLS * GRID_CELLS
+    mass = np.bincount(cell, minlength=n_cells).astype(float)
+    occupied = np.flatnonzero(mass)
+    centroid = np.stack([
+        np.bincount(cell, weights=pos[:, 0], minlength=n_cells)[occupied],
+        np.bincount(cell, weights=pos[:, 1], minlength=n_cells)[occupied],
+    ], axis=1) / mass[occupied, None]
+    mass = mass[occupied]
+
+    # Mapeia célula -> índice compacto em "occupied"
+    compact = np.full(n_cells, -1)
+    compact[occupied] = np.arange(len(occupied))
+    own = compact[cell]
+
+    disp = np.zeros_like(pos)
+    for start in range(0, len(pos), CHUNK_SIZE):
+        block = pos[start:start + CHUNK_SIZE]
+        dx = block[:, 0, None] - centroid[None, :, 0]
+        dy = block[:, 1, None] - centroid[None, :, 1]
+        dist2 = dx * dx + dy * dy
+        np.maximum(dist2, 1e-2, out=dist2)
+        weight = k2 * mass[None, :] / dist2
+        # A própria célula é tratada de forma exata logo abaixo
+        weight[np.arange(len(block)), own[start:start + CHUNK_SIZE]] = 0.0
+        disp[start:start + CHUNK_SIZE, 0] = (dx * weight).sum(axis=1)
+        disp[start:start + CHUNK_SIZE, 1] = (dy * weight).sum(axis=1)
+
+    order = np.argsort(cell, kind='stable')
+    bounds = np.flatnonzero(np.diff(cell[order])) + 1
+    for members in np.split(order, bounds):
+        if len(members) > 1:
+            disp[members] += _exact_repulsion(pos[members], k2)
+    return disp
+
+
+def _initial_positions(ids, neighbors, previous, rng):
+    """
+    Usa as coordenadas do layout anterior quando existirem (warm start).
+    Nós novos nascem perto da média dos vizinhos já posicionados.
+    """
+    n = len(ids)
+    pos = np.zeros((n, 2))
+    known = np.zeros(n, dtype=bool)
+    for i, uid in enumerate(ids):
+        if uid in previous:
+            pos[i] = previous[uid]
+            known[i] = True
+
+    radius = LINK_DISTANCE * np.sqrt(n)
+    for i in np.flatnonzero(~known):
+        placed = [j for j in neighbors[i] if known[j]]
+        if placed:
+            pos[i] = pos[placed].mean(axis=0) + rng.normal(scale=LINK_DISTANCE / 2, size=2)
+        else:
+            pos[i] = rng.uniform(-radius, radius, size=2)
+    return pos, known
+
+
+def compute_layout(nodes, links, previous=None, iterations=None, seed=SEED):
+    """
+    Layout force-directed (Fruchterman-Reingold) vetorizado com NumPy.
+
+    Retorna {id: (x, y)}. Se `previous` ({id: (x, y)}) for informado, o layout
+    parte dessas posições e roda menos iterações com temperatura mais baixa,
+    para que nós existentes quase não se movam quando o grafo muda.
+    """
+    previous = previous or {}
+    rng = np.random.default_rng(seed)
+
+    ids = [n['id'] for n in nodes]
+    if not ids:
+        return {}
+    index = {uid: i for i, uid in enumerate(ids)}
+
+    src, dst, weight = [], [], []
+    for link in links:
+        s = index.get(_link_endpoint(link['source']))
+        t = index.get(_link_endpoint(link['target']))
+        if s is None or t is None or s == t:
+            continue
+        src.append(s)
+        dst.append(t)
+        # log1p suaviza pesos muito altos (links com muitas interações)
+        weight.append(np.log1p(link.get('value', 1) or 1))
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weight = np.asarray(weight, dtype=float)
+    if len(weight):
+        weight /= weight.mean()
+
+    neighbors = [[] for _ in ids]
+    for s, t in zip(src, dst):
+        neighbors[s].append(t)
+        neighbors[t].append(s)
+
+    pos, known = _initial_positions(ids, neighbors, previous, rng)
+    warm = known.mean() > 0.5
+    if iterations is None:
+        iterations = WARM_ITERATIONS if warm else ITERATIONS
+
+    k = LINK_DISTANCE
+    k2 = k * k
+    spread = np.ptp(pos, axis=0).max() if len(pos) > 1 else k
+    temperature = (k if warm else max(spread, k)) / 2
+    cooling = temperature / (iterations + 1)
+    repulsion = _exact_repulsion if len(ids) <= EXACT_REPULSION_LIMIT else _grid_repulsion
+
+    for _ in range(iterations):
+        disp = repulsion(pos, k2)
+
+        # Atração d²/k ao longo das arestas, ponderada pelo peso da conexão
+        if len(src):
+            delta = pos[src] - pos[dst]
+            dist = np.sqrt(np.einsum('ij,ij->i', delta, delta)) + 1e-9
+            force = (dist * weight / k)[:, None] * delta
+            np.subtract.at(disp, src, force)
+            np.add.at(disp, dst, force)
+
+        # Gravidade mantém componentes desconexos próximos ao centro
+        disp -= GRAVITY * pos
+
+        length = np.sqrt(np.einsum('ij,ij->i', disp, disp)) + 1e-9
+        pos += disp / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature = max(temperature - cooling, 1.0)
+
+    # Centraliza na origem para o layout não "andar" entre execuções
+    if not warm:
+        pos -= pos.mean(axis=0)
+
+    return {uid: (float(x), float(y)) for uid, (x, y) in zip(ids, pos)}
+
+
+def load_previous_layout(path):
+    """Lê coordenadas de uma execução anterior, se existir"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        n['id']: (n['x'], n['y'])
+        for n in data.get('nodes', [])
+        if 'x' in n and 'y' in n
+    }
+
+
+def main():
+    if not os.path.exists(INPUT_FILE):
+        print(f"Erro: {INPUT_FILE} não encontrado.")
+        return
+
+    print(f"Lendo {INPUT_FILE}...")
+    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    previous = load_previous_layout(OUTPUT_FILE)
+    if previous:
+        print(f"Warm start: {len(previous)} posições reaproveitadas de {OUTPUT_FILE}")
+
+    positions = compute_layout(data.get('nodes', []), data.get('links', []), previous)
+
+    for node in data.get('nodes', []):
+        x, y = positions[node['id']]
+        node['x'] = round(x, 2)
+        node['y'] = round(y, 2)
+
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    print(f"Layout calculado para {len(positions)} nós")
+    print(f"Arquivo salvo: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
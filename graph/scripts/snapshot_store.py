@@ -0,0 +1,395 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from datetime import datetime, timezone
+
+# --- CONFIGURAÇÕES ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, '../pipeline/data')
+STORE_FILE = os.path.join(DATA_DIR, 'snapshots/snapshots.sqlite')
+# Cópias manuais antigas importadas com `import`
+LEGACY_VERSIONS = ['v1', 'v2', 'v3', 'v4-BOA', 'v5-ruim', 'backup']
+
+# Versões endereçadas por conteúdo:
+#   objetos: JSON compacto comprimido (zlib), identificado pelo sha256; cada nó, link,
+#            repositório ou membro é um objeto, então o que não mudou entre versões
+#            é guardado uma vez só
+#   arquivo: manifesto (também um objeto) com a ordem das chaves do topo, a lista
+#            (chave, hash) de cada seção e o hash do restante do JSON
+#   versão:  nome -> {caminho: manifesto}, com contagens para listar sem abrir nada
+# O diff compara só os manifestos: elementos com o mesmo hash nem são descomprimidos.
+
+
+def _link_endpoint(value):
+    """Links podem vir como string ou como objeto (quando salvos pelo frontend)"""
+    return value['id'] if isinstance(value, dict) else value
+
+
+# Identidade dos elementos de cada seção (listas de objetos no topo do JSON)
+SECTION_KEYS = {
+    'nodes': lambda n: str(n.get('id')),
+    'links': lambda l: f"{_link_endpoint(l.get('source'))} -> {_link_endpoint(l.get('target'))}",
+    'repositories': lambda r: r.get('full_path') or r.get('name'),
+    'members': lambda m: m.get('login'),
+}
+
+
+def _encode(obj):
+    # Ordem das chaves preservada: a restauração devolve o mesmo JSON
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Formatos de json.dump testados ao salvar: o que reproduz os bytes do arquivo fica no
+# manifesto e é usado na restauração (o pipeline usa o primeiro)
+DUMP_FORMATS = [
+    {'indent': 2, 'ensure_ascii': False},
+    {'indent': 2, 'ensure_ascii': True},
+    {'indent': 4, 'ensure_ascii': False},
+    {'indent': 4, 'ensure_ascii': True},
+    {'indent': None, 'ensure_ascii': False},
+    {'indent': None, 'ensure_ascii': True},
+]
+
+
+def _dump_format(data, raw):
+    for fmt in DUMP_FORMATS:
+        if json.dumps(data, **fmt).encode('utf-8') == raw.rstrip(b'\n'):
+            return fmt
+    return DUMP_FORMATS[0]
+
+
+def _is_section(value):
+    return isinstance(value, list) and value and all(isinstance(v, dict) for v in value)
+
+
+def _unique_keys(keys):
+    """Chaves repetidas (ex: dois links entre o mesmo par) ganham sufixo #2, #3..."""
+    seen = {}
+    result = []
+    for key in keys:
+        seen[key] = seen.get(key, 0) + 1
+        result.append(key if seen[key] == 1 else f"{key} #{seen[key]}")
+    return result
+
+
+class SnapshotStore:
+    def __init__(self, path=STORE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS objects (
+                    hash TEXT PRIMARY KEY,
+                    data BLOB NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS versions (
+                    name TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT ''
+                );
+                CREATE TABLE IF NOT EXISTS files (
+                    version TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    manifest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    nodes INTEGER NOT NULL,
+                    links INTEGER NOT NULL,
+                    PRIMARY KEY (version, path)
+                );
+                """
+            )
+
+    # --- objetos ---
+
+    def _put(self, obj, pending):
+        data = _encode(obj)
+        digest = hashlib.sha256(data).hexdigest()
+        pending.setdefault(digest, data)
+        return digest
+
+    def _get(self, digest):
+        row = self._conn.execute("SELECT data FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Objeto {digest} não encontrado")
+        return json.loads(zlib.decompress(row[0]))
+
+    def _store_pending(self, pending):
+        """Grava só os objetos novos; devolve (objetos, bytes comprimidos) adicionados"""
+        existing = set()
+        digests = list(pending)
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            existing.update(
+                h for (h,) in self._conn.execute(f"SELECT hash FROM objects WHERE hash IN ({marks})", chunk)
+            )
+        new = [(h, zlib.compress(pending[h], 9)) for h in digests if h not in existing]
+        self._conn.executemany("INSERT INTO objects (hash, data) VALUES (?, ?)", new)
+        return len(new), sum(len(data) for _, data in new)
+
+    # --- versões ---
+
+    def _manifest(self, data, pending):
+        if not isinstance(data, dict):
+            return {'order': None, 'sections': {}, 'rest': self._put(data, pending)}
+        sections = {}
+        rest = {}
+        for key, value in data.items():
+            if _is_section(value):
+                key_of = SECTION_KEYS.get(key)
+                hashes = [self._put(item, pending) for item in value]
+                keys = [str(key_of(item)) for item in value] if key_of else hashes
+                sections[key] = [list(pair) for pair in zip(_unique_keys(keys), hashes)]
+            else:
+                rest[key] = value
+        return {'order': list(data), 'sections': sections, 'rest': self._put(rest, pending)}
+
+    def save(self, name, directory, description='', recursive=True):
+        """Guarda os .json de `directory` (e das subpastas, se `recursive`) como a versão `name`"""
+        if self._conn.execute("SELECT 1 FROM versions WHERE name = ?", (name,)).fetchone():
+            raise ValueError(f"Versão '{name}' já existe")
+        pending = {}
+        files = []
+        for root, dirs, names in os.walk(directory):
+            # Não entra no próprio store nem em caches
+            skip = ('snapshots', 'cache', 'profiles', 'reports')
+            dirs[:] = sorted(d for d in dirs if d not in skip) if recursive else []
+            for filename in sorted(names):
+                if not filename.endswith('.json'):
+                    continue
+                full = os.path.join(root, filename)
+                with open(full, 'rb') as f:
+                    raw = f.read()
+                data = json.loads(raw)
+                manifest = self._manifest(data, pending)
+                manifest['format'] = _dump_format(data, raw)
+                counts = {k: len(v) for k, v in manifest['sections'].items()}
+                files.append((
+                    name, os.path.relpath(full, directory).replace(os.sep, '/'),
+                    self._put(manifest, pending), os.path.getsize(full),
+                    counts.get('nodes', 0), counts.get('links', 0),
+                ))
+        if not files:
+            raise ValueError(f"Nenhum .json em {directory}")
+
+        with self._conn:
+            added, added_bytes = self._store_pending(pending)
+            self._conn.execute(
+                "INSERT INTO versions (name, created_at, description) VALUES (?, ?, ?)",
+                (name, datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'), description)
+            )
+            self._conn.executemany(
+                "INSERT INTO files (version, path, manifest, size, nodes, links) VALUES (?, ?, ?, ?, ?, ?)", files
+            )
+        return {
+            'files': len(files),
+            'size': sum(f[3] for f in files),
+            'objects': len(pending),
+            'new_objects': added,
+            'new_bytes': added_bytes,
+        }
+
+    def versions(self):
+        """Versões com arquivos, tamanho original e contagens de nós/links (só metadados)"""
+        rows = self._conn.execute(
+            """
+            SELECT v.name, v.created_at, v.description, COUNT(f.path), COALESCE(SUM(f.size), 0),
+                   COALESCE(SUM(f.nodes), 0), COALESCE(SUM(f.links), 0)
+            FROM versions v LEFT JOIN files f ON f.version = v.name
+            GROUP BY v.name ORDER BY v.rowid
+            """
+        ).fetchall()
+        keys = ('name', 'created_at', 'description', 'files', 'size', 'nodes', 'links')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def files(self, name):
+        rows = self._conn.execute(
+            "SELECT path, manifest, size, nodes, links FROM files WHERE version = ? ORDER BY path", (name,)
+        ).fetchall()
+        if not rows and not self._conn.execute("SELECT 1 FROM versions WHERE name = ?", (name,)).fetchone():
+            raise KeyError(f"Versão '{name}' não encontrada")
+        return {path: {'manifest': m, 'size': size, 'nodes': n, 'links': l} for path, m, size, n, l in rows}
+
+    def stored_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM objects").fetchone()[0]
+
+    def load(self, name, path):
+        """Reconstrói o JSON de um arquivo da versão"""
+        return self._load(self._get(self.files(name)[path]['manifest']))
+
+    def _load(self, manifest):
+        rest = self._get(manifest['rest'])
+        if manifest['order'] is None:
+            return rest
+        data = {}
+        for key in manifest['order']:
+            if key in manifest['sections']:
+                data[key] = [self._get(h) for _, h in manifest['sections'][key]]
+            else:
+                data[key] = rest[key]
+        return data
+
+    def restore(self, name, destination):
+        """Escreve os arquivos da versão em `destination`, com a formatação original"""
+        files = self.files(name)
+        for path, info in files.items():
+            manifest = self._get(info['manifest'])
+            target = os.path.join(destination, path)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(self._load(manifest), f, **manifest.get('format', DUMP_FORMATS[0]))
+        return len(files)
+
+    # --- diff ---
+
+    def _field_changes(self, old_hash, new_hash):
+        old, new = self._get(old_hash), self._get(new_hash)
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            return ['<valor>']
+        return sorted(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+
+    def diff(self, a, b, fields=True):
+        """
+        Diferença estrutural entre duas versões, por arquivo: arquivos adicionados e
+        removidos e, nos arquivos em comum com manifesto diferente, elementos de cada
+        seção adicionados, removidos e alterados (com os campos que mudaram).
+        """
+        files_a, files_b = self.files(a), self.files(b)
+        result = {
+            'added_files': sorted(set(files_b) - set(files_a)),
+            'removed_files': sorted(set(files_a) - set(files_b)),
+            'changed_files': {},
+        }
+        for path in sorted(set(files_a) & set(files_b)):
+            if files_a[path]['manifest'] == files_b[path]['manifest']:
+                continue
+            old, new = self._get(files_a[path]['manifest']), self._get(files_b[path]['manifest'])
+            changes = {'other_fields': old['rest'] != new['rest'], 'sections': {}}
+            for section in sorted(set(old['sections']) | set(new['sections'])):
+                old_items = dict(map(tuple, old['sections'].get(section, [])))
+                new_items = dict(map(tuple, new['sections'].get(section, [])))
+                changed = {
+                    key: (self._field_changes(old_items[key], new_items[key]) if fields else [])
+                    for key in old_items.keys() & new_items.keys()
+                    if old_items[key] != new_items[key]
+                }
+                added = sorted(new_items.keys() - old_items.keys())
+                removed = sorted(old_items.keys() - new_items.keys())
+                if added or removed or changed:
+                    changes['sections'][section] = {
+                        'added': added,
+                        'removed': removed,
+                        'changed': dict(sorted(changed.items())),
+                    }
+            result['changed_files'][path] = changes
+        return result
+
+    def close(self):
+        self._conn.close()
+
+
+def _mb(size):
+    return f"{size / 2**20:.2f} MB"
+
+
+def print_diff(result, limit=10):
+    for path in result['added_files']:
+        print(f"+ {path}")
+    for path in result['removed_files']:
+        print(f"- {path}")
+    for path, changes in result['changed_files'].items():
+        print(f"~ {path}" + (" (outros campos alterados)" if changes['other_fields'] else ""))
+        for section, diff in changes['sections'].items():
+            print(
+                f"    {section}: +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['changed'])}"
+            )
+            for key in diff['added'][:limit]:
+                print(f"      + {key}")
+            for key in diff['removed'][:limit]:
+                print(f"      - {key}")
+            for key, fields in list(diff['changed'].items())[:limit]:
+                print(f"      ~ {key}: {', '.join(fields)}")
+    if not (result['added_files'] or result['removed_files'] or result['changed_files']):
+        print("Versões idênticas.")
+
+
+USAGE = """Uso:
+  python snapshot_store.py save <nome> [pasta] [descrição]   (pasta padrão: pipeline/data, sem subpastas de versões)
+  python snapshot_store.py import                            (importa v1, v2, v3, v4-BOA, v5-ruim e backup)
+  python snapshot_store.py list [nome]
+  python snapshot_store.py diff <versão A> <versão B>
+  python snapshot_store.py restore <nome> <pasta destino>"""
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ('save', 'import', 'list', 'diff', 'restore'):
+        print(USAGE)
+        return
+    store = SnapshotStore()
+    try:
+        run(store, args)
+    finally:
+        store.close()
+
+
+def run(store, args):
+    command = args[0]
+
+    if command == 'save' and len(args) >= 2:
+        name = args[1]
+        description = args[3] if len(args) > 3 else ''
+        if len(args) > 2:
+            stats = store.save(name, args[2], description)
+        else:
+            # Versão em uso: só os arquivos do topo de pipeline/data, sem as pastas de cópias
+            stats = store.save(name, DATA_DIR, description, recursive=False)
+        print(
+            f"Versão '{name}': {stats['files']} arquivos ({_mb(stats['size'])}), "
+            f"{stats['objects']} objetos, {stats['new_objects']} novos (+{_mb(stats['new_bytes'])})"
+        )
+
+    elif command == 'import':
+        existing = {v['name'] for v in store.versions()}
+        for name in LEGACY_VERSIONS:
+            folder = os.path.join(DATA_DIR, name)
+            if name in existing or not os.path.isdir(folder):
+                continue
+            stats = store.save(name, folder, 'cópia manual importada')
+            print(
+                f"- {name}: {stats['files']} arquivos ({_mb(stats['size'])}), "
+                f"{stats['new_objects']} objetos novos (+{_mb(stats['new_bytes'])})"
+            )
+
+    elif command == 'list':
+        if len(args) > 1:
+            for path, info in store.files(args[1]).items():
+                print(f"  {path:<40} {_mb(info['size']):>10}  {info['nodes']:>6} nós  {info['links']:>7} links")
+            return
+        versions = store.versions()
+        for v in versions:
+            print(
+                f"  {v['name']:<12} {v['created_at']}  {v['files']:>2} arquivos  {_mb(v['size']):>10}  "
+                f"{v['nodes']:>6} nós  {v['links']:>7} links  {v['description']}"
+            )
+        total = sum(v['size'] for v in versions)
+        print(f"Cópias completas: {_mb(total)} | store: {_mb(store.stored_bytes())}")
+
+    elif command == 'diff' and len(args) >= 3:
+        print_diff(store.diff(args[1], args[2]))
+
+    elif command == 'restore' and len(args) >= 3:
+        count = store.restore(args[1], args[2])
+        print(f"{count} arquivos restaurados em {args[2]}")
+
+    else:
+        print(USAGE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from .pr_metrics import (
+    BOT_KEYWORDS,
+    REVIEWER_BOT_KEYWORDS,
+    SIZE_BINS,
+    SIZE_LABELS,
+    COMPLEXITY_BINS,
+    COMPLEXITY_LABELS,
+    clear_cache,
+    drop_bots,
+    drop_outliers,
+    fingerprint,
+    first_response_hours,
+    has_reviewers,
+    human_reviewed,
+    is_bot,
+    memoize,
+    merge_lead_time,
+    positive,
+    refactor_ratio,
+    reviewer_counts,
+    size_buckets,
+    with_changes,
+)
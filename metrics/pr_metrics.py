@@ -0,0 +1,200 @@
+# Métricas de PRs usadas pelos notebooks (prs_viz, prs_viz_bp, prs_viz_bp_paper),
+# em versão vetorizada: nada de DataFrame.apply linha a linha.
+#
+# Nos notebooks (rodando de metrics/notebooks):
+#   import sys; sys.path.insert(0, "../..")
+#   from metrics import drop_bots, refactor_ratio, reviewer_counts, ...
+#
+# As funções que processam texto (listas de reviewers) são marcadas com @memoize e
+# guardam o resultado pela impressão digital só das colunas que leem: reexecutar uma
+# célula com os mesmos dados não recalcula nada. Operações vetoriais O(n) sobre colunas
+# numéricas não são memoizadas, porque o hash custaria tanto quanto o cálculo.
+import hashlib
+import re
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+# Autores de PR considerados bots (substring, sem diferenciar maiúsculas)
+BOT_KEYWORDS = ['bot', 'dependabot', 'renovate', 'github-actions', 'codecov',
+                'greenkeeper', 'snyk', 'pyup', 'automated', 'ci-', 'action',
+                'github-advanced-security', 'copilot-pull-request']
+# Reviewers automáticos contados à parte nos gráficos de revisão
+REVIEWER_BOT_KEYWORDS = ['github-actions', 'github-advanced-security',
+                         'copilot-pull-request-reviewer', 'dependabot', 'renovate', 'codecov']
+
+# Faixas de tamanho (churn = linhas adicionadas + removidas). 400 linhas é o limite
+# de carga cognitiva usado como referência nos gráficos.
+SIZE_BINS = [0, 10, 50, 250, 400, np.inf]
+SIZE_LABELS = ['XS', 'S', 'M', 'L', 'XL']
+# Faixas de complexidade (arquivos alterados por PR)
+COMPLEXITY_BINS = [0, 1, 2, 5, 10, np.inf]
+COMPLEXITY_LABELS = ['1', '2', '3-5', '6-10', '11+']
+
+CACHE_SIZE = 256
+_cache = OrderedDict()
+
+
+def fingerprint(obj, columns=None):
+    """
+    Hash estável do conteúdo de um DataFrame/Series (valores, índice e colunas).
+    Com `columns`, só essas colunas de um DataFrame entram no hash.
+    """
+    digest = hashlib.sha1()
+    if isinstance(obj, pd.DataFrame):
+        if columns is not None:
+            obj = obj[[c for c in columns if c in obj.columns]]
+        digest.update(repr(list(obj.columns)).encode())
+    elif isinstance(obj, pd.Series):
+        digest.update(repr(obj.name).encode())
+    else:
+        digest.update(repr(obj).encode())
+        return digest.hexdigest()
+    digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def memoize(func=None, *, columns=None):
+    """
+    Cache (LRU) pela impressão digital dos argumentos; devolve cópias.
+    `columns` declara as colunas lidas dos DataFrames: as demais (ex: título, corpo)
+    ficam fora do hash. Só vale para funções cujo resultado não carrega outras colunas.
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (
+                func.__qualname__,
+                tuple(fingerprint(a, columns) for a in args),
+                tuple((k, fingerprint(v, columns)) for k, v in sorted(kwargs.items())),
+            )
+            if key in _cache:
+                _cache.move_to_end(key)
+            else:
+                _cache[key] = func(*args, **kwargs)
+                if len(_cache) > CACHE_SIZE:
+                    _cache.popitem(last=False)
+            result = _cache[key]
+            return result.copy() if hasattr(result, 'copy') else result
+        return wrapper
+    return decorate(func) if func is not None else decorate
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def _keyword_pattern(keywords):
+    return '|'.join(re.escape(kw.lower()) for kw in keywords)
+
+
+def is_bot(names, keywords=BOT_KEYWORDS):
+    """Máscara booleana: o nome contém alguma das palavras-chave (NaN -> False)"""
+    names = pd.Series(names)
+    return names.str.lower().str.contains(_keyword_pattern(keywords), regex=True, na=False)
+
+
+def drop_bots(df, column='author'):
+    """PRs cujo autor não é bot"""
+    return df[~is_bot(df[column]).to_numpy()].copy()
+
+
+def refactor_ratio(df):
+    """Fração de remoções no churn (deletions / churn); 0 quando não há churn"""
+    deletions = pd.to_numeric(df['deletions'], errors='coerce').to_numpy(dtype=float)
+    churn = pd.to_numeric(df['churn'], errors='coerce').to_numpy(dtype=float)
+    ratio = np.zeros(len(df))
+    np.divide(deletions, churn, out=ratio, where=churn > 0)
+    return pd.Series(ratio, index=df.index, name='refactor_ratio')
+
+
+def _split_names(names):
+    """Uma linha por nome da lista "a, b, c", indexada pela posição da PR de origem"""
+    names = pd.Series(names).reset_index(drop=True).astype(object)
+    names = names.where(names != '')
+    return names.str.split(',').explode().str.strip().dropna()
+
+
+@memoize
+def reviewer_counts(reviewers):
+    """
+    Contagem de reviewers por PR a partir da coluna 'reviewers' ("a, b, c"):
+    total, bots (REVIEWER_BOT_KEYWORDS) e humanos (nenhuma palavra de
+    REVIEWER_BOT_KEYWORDS nem 'bot'). Vazio/NaN conta 0.
+    """
+    reviewers = pd.Series(reviewers)
+    exploded = _split_names(reviewers)
+    position = exploded.index.to_numpy()
+    bot = is_bot(exploded, REVIEWER_BOT_KEYWORDS).to_numpy()
+    human = ~(bot | is_bot(exploded, ['bot']).to_numpy())
+    n = len(reviewers)
+    return pd.DataFrame({
+        'reviewers': np.bincount(position, minlength=n),
+        'bot_reviewers': np.bincount(position, weights=bot, minlength=n).astype(np.int64),
+        'human_reviewers': np.bincount(position, weights=human, minlength=n).astype(np.int64),
+    }, index=reviewers.index)
+
+
+@memoize(columns=['reviewers'])
+def human_reviewed(df):
+    """Máscara: PR com pelo menos um reviewer que não é bot (critério de BOT_KEYWORDS)"""
+    exploded = _split_names(df['reviewers'])
+    human = ~is_bot(exploded).to_numpy()
+    counts = np.bincount(exploded.index.to_numpy(), weights=human, minlength=len(df))
+    return pd.Series(counts > 0, index=df.index, name='human_reviewed')
+
+
+def has_reviewers(df):
+    return df['reviewers'].notna() & (df['reviewers'] != '')
+
+
+def positive(values, min_value=0):
+    """Valores válidos de uma métrica de tempo: não nulos e > min_value"""
+    values = pd.to_numeric(values, errors='coerce')
+    return values[values > min_value]
+
+
+def first_response_hours(df, column='time_to_first_human_response_hours', min_value=0):
+    """Tempo até a primeira resposta (horas), só valores positivos"""
+    return positive(df[column], min_value)
+
+
+def merge_lead_time(df, human_review=True, min_value=0):
+    """Lead time (horas) das PRs mergeadas, por padrão só as com review humana"""
+    mask = df['merged_at'].notna().to_numpy()
+    if human_review:
+        mask = mask & human_reviewed(df).to_numpy()
+    return positive(df.loc[mask, 'lead_time_hours'], min_value)
+
+
+def size_buckets(df):
+    """Faixa de tamanho (SIZE_LABELS) e de complexidade (COMPLEXITY_LABELS) de cada PR"""
+    churn = pd.to_numeric(df['churn'], errors='coerce')
+    files = pd.to_numeric(df['files_changed'], errors='coerce')
+    return pd.DataFrame({
+        'size': pd.cut(churn, SIZE_BINS, labels=SIZE_LABELS, include_lowest=True),
+        'complexity': pd.cut(files, COMPLEXITY_BINS, labels=COMPLEXITY_LABELS, include_lowest=True),
+    }, index=df.index)
+
+
+def with_changes(df):
+    """Remove PRs sem trabalho real (0 arquivos ou 0 linhas)"""
+    return df[(df['files_changed'] > 0) & (df['churn'] > 0)]
+
+
+def drop_outliers(values, upper=None, iqr=None):
+    """
+    Corta a cauda de uma métrica: `upper` fixo (ex: 96h, 1000 linhas) e/ou regra de
+    Tukey com `iqr` (ex: 1.5 -> descarta acima de Q3 + 1.5 * IQR e abaixo de Q1 - 1.5 * IQR).
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').dropna()
+    mask = np.ones(len(values), dtype=bool)
+    if upper is not None:
+        mask &= values.to_numpy() <= upper
+    if iqr is not None and len(values):
+        q1, q3 = np.percentile(values.to_numpy(), [25, 75])
+        spread = q3 - q1
+        mask &= (values.to_numpy() >= q1 - iqr * spread) & (values.to_numpy() <= q3 + iqr * spread)
+    return values[mask]
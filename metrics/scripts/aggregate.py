@@ -0,0 +1,283 @@
+# Camada gold: cubo de agregados das PRs, gerado depois do filter.py.
+#
+#   python metrics/scripts/aggregate.py
+#
+# Nos notebooks:
+#   cube = load_cube("../data/gold/pr_cube.npz")
+#   cube.select(cohort="vscode").rollup(["semester"], "lead_time")   # contagem, média, p50, p90...
+#   cube.select(cohort=["unb-mds", "mdsreq-fga-unb"]).heatmap()       # 7 x 24 eventos
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+from common import profiling  # noqa: E402  (--profile, compartilhado com o grafo)
+
+INPUT_PATH = "metrics/data/silver/prs.csv"
+OUTPUT_FOLDER = "metrics/data/gold"
+OUTPUT_FILE = "pr_cube.npz"
+# Saída do --profile
+PROFILES_FOLDER = "metrics/data/profiles"
+
+# Granularidade do cubo: tudo o que os notebooks agrupam ou filtram
+DIMENSIONS = ["cohort", "semester", "repo", "weekday", "hour"]
+# Horário local usado nos heatmaps dos notebooks
+TIMEZONE = "America/Sao_Paulo"
+
+# Medidas agregadas por célula: contagem, soma, soma dos quadrados, mínimo, máximo
+# e um sketch de quantis. Valores negativos (durações com relógio inconsistente) são
+# rejeitados: ficam fora de todas as estatísticas e contados em <medida>_rejected
+MEASURES = {
+    "lead_time": "lead_time_hours",
+    "review_latency": "time_to_first_review_hours",
+    "first_response": "time_to_first_human_response_hours",
+    "churn": "churn",
+    "comments": "comments",
+    "commits": "commits",
+}
+
+# Sketch de quantis: histograma em escala logarítmica (como o DDSketch).
+# Qualquer quantil sai com erro relativo <= SKETCH_ALPHA, e dois sketches se
+# combinam somando os contadores, então o cubo pode ser reagregado em qualquer
+# combinação de dimensões sem voltar às linhas. Os sketches são guardados esparsos,
+# só os baldes não vazios: triplas (célula, balde, contagem) em <medida>_sketch_cell,
+# <medida>_sketch_bucket e <medida>_sketch_count.
+SKETCH_ALPHA = 0.02
+SKETCH_MIN = 1e-2  # valores em [0, SKETCH_MIN) caem no balde zero
+SKETCH_MAX = 1e7
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_LOG_GAMMA = np.log(_GAMMA)
+_MIN_INDEX = int(np.ceil(np.log(SKETCH_MIN) / _LOG_GAMMA))
+SKETCH_BUCKETS = int(np.ceil(np.log(SKETCH_MAX) / _LOG_GAMMA)) - _MIN_INDEX + 2
+
+
+def sketch_buckets(values):
+    """Balde de cada valor: 0 = zero/abaixo de SKETCH_MIN, 1.. = faixas log"""
+    values = np.asarray(values, dtype=float)
+    if (values < 0).any():
+        raise ValueError("Sketch de quantis só aceita valores >= 0")
+    buckets = np.zeros(len(values), dtype=np.int64)
+    positive = values >= SKETCH_MIN
+    idx = np.ceil(np.log(values[positive]) / _LOG_GAMMA).astype(np.int64)
+    buckets[positive] = np.clip(idx - _MIN_INDEX + 1, 1, SKETCH_BUCKETS - 1)
+    return buckets
+
+
+def sketch_values():
+    """Valor representativo de cada balde (erro relativo <= SKETCH_ALPHA)"""
+    idx = np.arange(SKETCH_BUCKETS) - 1 + _MIN_INDEX
+    values = 2 * _GAMMA**idx / (_GAMMA + 1)
+    values[0] = 0.0
+    return values
+
+
+def sketch_quantiles(counts, qs):
+    """Quantis de um ou vários sketches (linhas de `counts`)"""
+    counts = np.atleast_2d(counts)
+    qs = np.atleast_1d(qs)
+    totals = counts.sum(axis=1)
+    cumulative = np.cumsum(counts, axis=1)
+    values = sketch_values()
+    result = np.full((len(counts), len(qs)), np.nan)
+    for j, q in enumerate(qs):
+        rank = q * (totals - 1)
+        idx = (cumulative <= rank[:, None]).sum(axis=1)
+        valid = totals > 0
+        result[valid, j] = values[np.minimum(idx[valid], SKETCH_BUCKETS - 1)]
+    return result
+
+
+def _local_time(column):
+    parsed = pd.to_datetime(column, utc=True, errors="coerce", format="ISO8601")
+    return parsed.dt.tz_convert(TIMEZONE)
+
+
+def build_cube(df):
+    """Linhas da silver -> arrays do cubo (uma entrada por célula das DIMENSIONS)"""
+    created = _local_time(df["created_at"])
+    dims = pd.DataFrame({
+        "cohort": df.get("cohort", df["org"]).astype(str),
+        "semester": df["semester"].astype(str),
+        "repo": df["repo"].astype(str),
+        "weekday": created.dt.weekday.fillna(-1).astype(np.int8),
+        "hour": created.dt.hour.fillna(-1).astype(np.int8),
+    })
+    cell = dims.groupby(DIMENSIONS, sort=True).ngroup().to_numpy()
+    n_cells = int(cell.max()) + 1 if len(cell) else 0
+    keys = dims.groupby(DIMENSIONS, sort=True).size().reset_index()
+
+    # Strings como arrays unicode (np.load sem pickle não lê arrays de objetos)
+    cube = {
+        dim: keys[dim].to_numpy(dtype=np.int8 if dim in ("weekday", "hour") else str)
+        for dim in DIMENSIONS
+    }
+    cube["rows"] = np.bincount(cell, minlength=n_cells)
+    for name, column in MEASURES.items():
+        if column in df:
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+        else:
+            values = np.full(len(df), np.nan)
+        rejected = values < 0
+        valid = ~np.isnan(values) & ~rejected
+        c, v = cell[valid], values[valid]
+        cube[f"{name}_rejected"] = np.bincount(cell[rejected], minlength=n_cells)
+        cube[f"{name}_count"] = np.bincount(c, minlength=n_cells)
+        cube[f"{name}_sum"] = np.bincount(c, weights=v, minlength=n_cells)
+        cube[f"{name}_sumsq"] = np.bincount(c, weights=v * v, minlength=n_cells)
+        minimum = np.full(n_cells, np.inf)
+        maximum = np.full(n_cells, -np.inf)
+        np.minimum.at(minimum, c, v)
+        np.maximum.at(maximum, c, v)
+        cube[f"{name}_min"] = minimum
+        cube[f"{name}_max"] = maximum
+        flat, counts = np.unique(c * SKETCH_BUCKETS + sketch_buckets(v), return_counts=True)
+        cube[f"{name}_sketch_cell"] = flat // SKETCH_BUCKETS
+        cube[f"{name}_sketch_bucket"] = (flat % SKETCH_BUCKETS).astype(np.int16)
+        cube[f"{name}_sketch_count"] = counts.astype(np.int32)
+
+    # Atividade (eventos de criação e de merge) por dia da semana e hora, para os heatmaps
+    merged = _local_time(df["merged_at"])
+    events = pd.concat([
+        pd.DataFrame({"cohort": dims["cohort"], "semester": dims["semester"], "repo": dims["repo"],
+                      "event": "created", "weekday": created.dt.weekday, "hour": created.dt.hour}),
+        pd.DataFrame({"cohort": dims["cohort"], "semester": dims["semester"], "repo": dims["repo"],
+                      "event": "merged", "weekday": merged.dt.weekday, "hour": merged.dt.hour}),
+    ]).dropna(subset=["weekday"])
+    activity = (
+        events.groupby(["cohort", "semester", "repo", "event", "weekday", "hour"])
+        .size()
+        .reset_index(name="count")
+    )
+    for col in activity.columns:
+        dtype = np.int64 if col in ("weekday", "hour", "count") else str
+        cube[f"activity_{col}"] = activity[col].to_numpy(dtype=dtype)
+    return cube
+
+
+class Cube:
+    """Cubo carregado do .npz, com reagregação por qualquer subconjunto de dimensões"""
+
+    def __init__(self, data):
+        self.data = data
+        self.cells = pd.DataFrame({dim: data[dim] for dim in DIMENSIONS})
+
+    def select(self, **filters):
+        """Sub-cubo com as células que batem com os filtros (valor ou lista de valores)"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in filters.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.cells[dim].isin(values).to_numpy()
+        activity_mask = np.ones(len(self.data["activity_count"]), dtype=bool)
+        for dim, value in filters.items():
+            if f"activity_{dim}" in self.data:
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                activity_mask &= np.isin(self.data[f"activity_{dim}"], list(values))
+        # Triplas dos sketches: mantém as das células selecionadas, renumerando as células
+        new_cell = np.cumsum(mask) - 1
+        data = {}
+        for key, arr in self.data.items():
+            if key.startswith("activity_"):
+                data[key] = arr[activity_mask]
+            elif "_sketch_" not in key:
+                data[key] = arr[mask]
+        for name in MEASURES:
+            cells = self.data.get(f"{name}_sketch_cell")
+            if cells is None:
+                continue
+            keep = mask[cells]
+            data[f"{name}_sketch_cell"] = new_cell[cells[keep]]
+            data[f"{name}_sketch_bucket"] = self.data[f"{name}_sketch_bucket"][keep]
+            data[f"{name}_sketch_count"] = self.data[f"{name}_sketch_count"][keep]
+        return Cube(data)
+
+    def rollup(self, by, measure, quantiles=(0.25, 0.5, 0.75, 0.9)):
+        """Estatísticas de uma medida agregadas por `by` (lista de dimensões)"""
+        by = list(by)
+        if by:
+            grouped = self.cells.groupby(by, sort=True)
+            gid = grouped.ngroup().to_numpy()
+            result = grouped.size().reset_index()[by]
+        else:
+            gid = np.zeros(len(self.cells), dtype=np.int64)
+            result = pd.DataFrame(index=[0])
+        n = len(result)
+
+        d = self.data
+        count = np.bincount(gid, weights=d[f"{measure}_count"], minlength=n)
+        total = np.bincount(gid, weights=d[f"{measure}_sum"], minlength=n)
+        sumsq = np.bincount(gid, weights=d[f"{measure}_sumsq"], minlength=n)
+        minimum = np.full(n, np.inf)
+        maximum = np.full(n, -np.inf)
+        np.minimum.at(minimum, gid, d[f"{measure}_min"])
+        np.maximum.at(maximum, gid, d[f"{measure}_max"])
+        sketch = np.zeros((n, SKETCH_BUCKETS), dtype=np.int64)
+        np.add.at(
+            sketch,
+            (gid[d[f"{measure}_sketch_cell"]], d[f"{measure}_sketch_bucket"]),
+            d[f"{measure}_sketch_count"],
+        )
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            std = np.sqrt(np.maximum(sumsq / count - mean**2, 0) * count / (count - 1))
+        result["count"] = count.astype(np.int64)
+        result["mean"] = mean
+        result["std"] = std
+        result["min"] = np.where(count > 0, minimum, np.nan)
+        result["max"] = np.where(count > 0, maximum, np.nan)
+        for q, values in zip(quantiles, sketch_quantiles(sketch, quantiles).T):
+            result[f"p{round(q * 100):g}"] = values
+        return result
+
+    def heatmap(self, events=("created", "merged")):
+        """Matriz 7x24 (segunda=0 x hora local) de eventos de criação/merge"""
+        mask = np.isin(self.data["activity_event"], list(events))
+        matrix = np.zeros((7, 24), dtype=np.int64)
+        np.add.at(
+            matrix,
+            (self.data["activity_weekday"][mask], self.data["activity_hour"][mask]),
+            self.data["activity_count"][mask],
+        )
+        return matrix
+
+
+def save_cube(cube, path):
+    np.savez_compressed(path, **cube)
+
+
+def load_cube(path=os.path.join(OUTPUT_FOLDER, OUTPUT_FILE)):
+    with np.load(path, allow_pickle=False) as data:
+        return Cube({key: data[key] for key in data.files})
+
+
+def build_cubes(input_path=INPUT_PATH):
+    if not os.path.exists(input_path):
+        print(f"Erro: Arquivo {input_path} não encontrado. Rode o filter.py antes.")
+        return
+
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+    profiling.stage("read_silver")
+    df = pd.read_csv(input_path, dtype={"semester": str})
+    profiling.stage("build_cube")
+    cube = build_cube(df)
+    profiling.stage("save_cube")
+    output_path = os.path.join(OUTPUT_FOLDER, OUTPUT_FILE)
+    save_cube(cube, output_path)
+
+    print("Cubo materializado")
+    print(f"- PRs na Silver: {len(df)}")
+    print(f"- Células ({' x '.join(DIMENSIONS)}): {len(cube['rows'])}")
+    print(f"- Medidas: {', '.join(MEASURES)}")
+    for name in MEASURES:
+        rejected = int(cube[f"{name}_rejected"].sum())
+        if rejected:
+            print(f"- Aviso: {rejected} valores negativos de {name} rejeitados")
+    print(f"Arquivo salvo em: {output_path} ({os.path.getsize(output_path) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    # python metrics/scripts/aggregate.py [--profile] [silver.csv]
+    with profiling.session("aggregate", PROFILES_FOLDER):
+        build_cubes(sys.argv[1] if len(sys.argv) > 1 else INPUT_PATH)
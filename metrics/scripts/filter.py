@@ -1,151 +1,249 @@
+import numpy as np
 import pandas as pd
 import os
-from datetime import datetime
+import sys
+import yaml
+from urllib.parse import quote, unquote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.."))
+from common import profiling  # noqa: E402  (--profile, compartilhado com o grafo)
+from common.semesters import SEMESTERS  # noqa: E402  (faixas compartilhadas com o grafo)
 
 INPUT_PATH = "metrics/data/bronze/prs.csv"
 OUTPUT_FOLDER = "metrics/data/silver"
 OUTPUT_FILE = "prs.csv"
+# Partições por semestre: silver/semester=<nome>/prs.csv
+PARTITION_COLUMN = "semester"
+
+# Coortes declaradas em YAML (ver o próprio arquivo para o formato)
+COHORTS_FILE = "metrics/cohorts.yaml"
+# Bronze particionada: bronze/partitions/platform=<p>/org=<o>/semester=<s>/prs.csv
+# (PRs fora de todos os semestres não entram em nenhuma partição)
+PARTITIONS_FOLDER = "metrics/data/bronze/partitions"
+PARTITION_KEYS = ["platform", "org", "semester"]
+SOURCE_MARKER = "_source"
+# Saída do --profile
+PROFILES_FOLDER = "metrics/data/profiles"
+
+
+def semester_bounds():
+    """Inícios e fins dos semestres em ns (UTC)"""
+    starts = pd.to_datetime([s["start"] for s in SEMESTERS]).to_numpy(dtype="datetime64[ns]")
+    ends = pd.to_datetime([s["end"] for s in SEMESTERS]).to_numpy(dtype="datetime64[ns]")
+    if (starts[1:] <= ends[:-1]).any() or (ends < starts).any():
+        raise ValueError("SEMESTERS deve estar em ordem cronológica e sem sobreposição")
+    return starts.astype(np.int64), ends.astype(np.int64)
+
+
+def assign_semesters(timestamps):
+    """
+    Índice em SEMESTERS da faixa que contém cada data (-1 = fora de todas).
+    Uma busca binária sobre os inícios ordenados: O(n log k) em uma única passada.
+    """
+    starts, ends = semester_bounds()
+    values = timestamps.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    idx = np.searchsorted(starts, values, side="right") - 1
+    inside = (idx >= 0) & timestamps.notna().to_numpy()
+    inside &= values <= ends[np.clip(idx, 0, None)]
+    return np.where(inside, idx, -1)
+
+
+def write_partitions(df):
+    for name, part in df.groupby(PARTITION_COLUMN, sort=False):
+        folder = os.path.join(OUTPUT_FOLDER, f"{PARTITION_COLUMN}={name}")
+        os.makedirs(folder, exist_ok=True)
+        part.to_csv(os.path.join(folder, OUTPUT_FILE), index=False)
+
+
+def load_cohorts(path=COHORTS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        cohorts = (yaml.safe_load(f) or {}).get("cohorts") or []
+    names = [c.get("name") for c in cohorts]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError(f"Toda coorte em {path} precisa de um `name` único")
+    known = {semester["name"] for semester in SEMESTERS}
+    for cohort in cohorts:
+        unknown = set(map(str, cohort.get("semesters") or [])) - known
+        if unknown:
+            raise ValueError(f"Coorte {cohort['name']}: semestres desconhecidos {sorted(unknown)}")
+    return cohorts
+
+
+def compile_cohort(cohort):
+    """
+    Coorte -> (predicado sobre as chaves da partição, máscara sobre as linhas).
+    O primeiro decide quais arquivos ler; o segundo só roda nos arquivos lidos.
+    """
+    platform = (cohort.get("platform") or "").lower()
+    org = (cohort.get("org") or "").lower()
+    semesters = {str(s) for s in cohort.get("semesters") or []}
+    repos = cohort.get("repos")
+
+    def matches_partition(keys):
+        return (
+            (not platform or keys["platform"].lower() == platform)
+            and (not org or keys["org"].lower() == org)
+            and (not semesters or keys["semester"] in semesters)
+        )
 
-# Melhores projetos baseado em nota
-UNB_MDS_ORG = "unb-mds"
-UNB_MDS_PROJECTS = [
-    # 2025.2
-    "2025-2-Mural-UnB",
-    #"2025-2-OncoMap",
-    #"Projeto-P.I.T.E.R",
-    #"2025-2-Synapse",
-    #"2025-2-Squad-01",
-    # 2025.1
-    #"2025-1-NoFluxoUNB",
-    "Sonorus-2025.1",
-    #"DFemObras-2025.1",
-    #"2025-1-GovInsights",
-    #"2025-1-RelatAI",
-    # 2024.2
-    "2024-2-AcheiUnB",
-    #"2024-2-Squad06",
-    #"2024-2-ChamaControl",
-    #"Gastos-DF-2024-02",
-    #"2024-2-SuaFinanca",
-    # 2024.1
-    "2024-1-forUnB",
-    #"2024-1-MinasDeCultura",
-    #"2024-1-Squad02-CulturaTransparente",
-    #"2024-1-Squad08",
-    #"2024-1-Squad-10",
-]
-
-MDSREQ_FGA_UNB_ORG = "mdsreq-fga-unb"
-MDSREQ_FGA_UNB_PROJECTS = [
-    # 2025.2
-    #"REQ-2025.2-T01-DataBuilders",
-    #"REQ-2025.2-T01-PPBM",
-    #"REQ-2025.2-T02-ProJuris",
-    "REQ-2025.2-T02-RxHospitalar",
-    #"REQ-2025.2-T01-ST-APP",
-    # 2025.1
-    #"2025.1-T01-AdvogaAI",
-    #"2025.1-T01-SeuPontoDigital",
-    "2025.1-T01-VidracariaModelo",
-    #"2025.1-T01-CORIGGE",
-    #"2025.1-T02-CanadaIntercambio",
-    # 2024.2
-    "2024.2-T03-CafeDoSitio",
-    #"2024.2-T01-IdeaSpace",
-    #"2024.2-T03-CerradoTech",
-    #"2024.2-T01-FamintosBurguer",
-    #"2024.2-T01-CD-MOJ",
-    # 2024.1
-    #"2024.1-Echoeasy",
-    #"2024.1-RISO-",
-    #"2024.1-Est-dio-de-Beleza-Keuany",
-    #"2024.1-Crystaleum-2",
-    "2024.1-ObjeX",
-]
-
-OTHER_ORGS = [
-    {"platform": "GitHub", "org": "GovHub-br"},
-    {"platform": "GitHub", "org": "lablivre-unb"},
-    {"platform": "GitLab", "org": "lappis-unb/decidimbr"},
-    {"platform": "GitHub", "org": "decidim"},
-    {"platform": "GitHub", "org": "microsoft"},
-]
-
-# Faixas de tempo dos semestres
-SEMESTERS = [
-    {"name": "2024.1", "start": "2024-03-18 00:00:00", "end": "2024-09-21 23:59:59"},
-    {"name": "2024.2", "start": "2024-10-14 00:00:00", "end": "2025-02-22 23:59:59"},
-    {"name": "2025.1", "start": "2025-03-24 00:00:00", "end": "2025-07-26 23:59:59"},
-    {"name": "2025.2", "start": "2025-08-01 00:00:00", "end": "2025-12-22 23:59:59"},
-]
-
-
-def process_data():
-    if not os.path.exists(OUTPUT_FOLDER):
-        os.makedirs(OUTPUT_FOLDER)
+    def row_mask(df):
+        if repos is None:
+            return pd.Series(True, index=df.index)
+        return df["repo"].isin(repos)
 
-    if not os.path.exists(INPUT_PATH):
-        print(f"Erro: Arquivo {INPUT_PATH} não encontrado.")
-        return
+    return matches_partition, row_mask
 
-    df = pd.read_csv(INPUT_PATH)
 
-    df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-    df["merged_at"] = pd.to_datetime(df["merged_at"], errors="coerce")
+def _partition_dir(keys):
+    parts = [f"{k}={quote(str(keys[k]), safe='')}" for k in PARTITION_KEYS]
+    return os.path.join(PARTITIONS_FOLDER, *parts)
 
-    mask_unb_mds = (df["org"].str.lower() == UNB_MDS_ORG.lower()) & (
-        df["repo"].isin(UNB_MDS_PROJECTS)
-    )
 
-    mask_mdsreq_fga_unb = (df["org"].str.lower() == MDSREQ_FGA_UNB_ORG.lower()) & (
-        df["repo"].isin(MDSREQ_FGA_UNB_PROJECTS)
-    )
+def _source_signature():
+    stat = os.stat(INPUT_PATH)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
 
-    org_masks = []
-    for target in OTHER_ORGS:
-        m = (df["platform"].str.lower() == target["platform"].lower()) & (
-            df["org"].str.lower() == target["org"].lower()
-        )
-        org_masks.append(m)
-    mask_others = pd.concat(org_masks, axis=1).any(axis=1)
 
-    # Aplicar filtro de tempo para todos os semestres
-    semester_masks = []
-    for semester in SEMESTERS:
-        start = (
-            pd.to_datetime(semester["start"]).tz_localize("UTC")
-            if df["created_at"].dt.tz
-            else pd.to_datetime(semester["start"])
-        )
-        end = (
-            pd.to_datetime(semester["end"]).tz_localize("UTC")
-            if df["created_at"].dt.tz
-            else pd.to_datetime(semester["end"])
-        )
+def partition_bronze():
+    """
+    Regrava a bronze particionada por plataforma, organização e semestre, numa
+    única leitura do CSV. Só roda quando o prs.csv da bronze mudou.
+    """
+    marker = os.path.join(PARTITIONS_FOLDER, SOURCE_MARKER)
+    signature = _source_signature()
+    if os.path.exists(marker):
+        with open(marker, "r") as f:
+            if f.read().strip() == signature:
+                return False
 
-        mask_time = ((df["created_at"] >= start) & (df["created_at"] <= end)) | (
-            (df["merged_at"] >= start) & (df["merged_at"] <= end)
-        )
-        semester_masks.append(mask_time)
+    df = pd.read_csv(INPUT_PATH)
+    created_at = pd.to_datetime(df["created_at"], utc=True, errors="coerce")
+    merged_at = pd.to_datetime(df["merged_at"], utc=True, errors="coerce")
+
+    # Semestre de cada PR: o da criação ou, se ela cair fora, o do merge
+    semester_idx = assign_semesters(created_at)
+    semester_idx = np.where(semester_idx >= 0, semester_idx, assign_semesters(merged_at))
+    names = np.array([semester["name"] for semester in SEMESTERS], dtype=object)
+    df[PARTITION_COLUMN] = np.where(semester_idx >= 0, names[semester_idx], None)
+    df = df[semester_idx >= 0]
+
+    if os.path.exists(PARTITIONS_FOLDER):
+        for root, _, files in os.walk(PARTITIONS_FOLDER):
+            for name in files:
+                os.remove(os.path.join(root, name))
+    for values, part in df.groupby(PARTITION_KEYS, sort=False):
+        folder = _partition_dir(dict(zip(PARTITION_KEYS, values)))
+        os.makedirs(folder, exist_ok=True)
+        part.to_csv(os.path.join(folder, OUTPUT_FILE), index=False)
+
+    os.makedirs(PARTITIONS_FOLDER, exist_ok=True)
+    with open(marker, "w") as f:
+        f.write(signature)
+    return True
+
+
+def list_partitions():
+    """[(chaves, caminho)] de todas as partições da bronze"""
+    partitions = []
+    for root, _, files in os.walk(PARTITIONS_FOLDER):
+        if OUTPUT_FILE not in files:
+            continue
+        rel = os.path.relpath(root, PARTITIONS_FOLDER).split(os.sep)
+        keys = {k: unquote(v) for k, v in (p.split("=", 1) for p in rel)}
+        if set(keys) == set(PARTITION_KEYS):
+            partitions.append((keys, os.path.join(root, OUTPUT_FILE)))
+    return partitions
+
+
+def build_cohorts(cohorts):
+    """
+    Monta o DataFrame de cada coorte lendo só as partições que alguma coorte
+    aceita, cada uma uma única vez, mesmo quando várias coortes a compartilham.
+    """
+    compiled = [(c["name"],) + compile_cohort(c) for c in cohorts]
+    pieces = {name: [] for name, _, _ in compiled}
+    read = 0
+    partitions = list_partitions()
+    for keys, path in partitions:
+        wanted = [(name, row_mask) for name, matches, row_mask in compiled if matches(keys)]
+        if not wanted:
+            continue
+        df = pd.read_csv(path)
+        df[PARTITION_COLUMN] = keys[PARTITION_COLUMN]  # "2024.1" seria lido como float
+        read += 1
+        for name, row_mask in wanted:
+            pieces[name].append(df[row_mask(df)])
+    print(f"- Partições lidas: {read} de {len(partitions)}")
+
+    return {
+        name: pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        for name, parts in pieces.items()
+    }
+
+
+def process_data(cohort_names=None):
+    if not os.path.exists(OUTPUT_FOLDER):
+        os.makedirs(OUTPUT_FOLDER)
 
-    # Combinar todas as máscaras de semestres (OR)
-    mask_any_semester = pd.concat(semester_masks, axis=1).any(axis=1)
+    if not os.path.exists(INPUT_PATH):
+        print(f"Erro: Arquivo {INPUT_PATH} não encontrado.")
+        return
+
+    profiling.stage("partition_bronze")
+    if partition_bronze():
+        print(f"Bronze particionada em {PARTITIONS_FOLDER}")
+
+    cohorts = load_cohorts()
+    if cohort_names:
+        cohorts = [c for c in cohorts if c["name"] in cohort_names]
+
+    profiling.stage("build_cohorts")
+    results = build_cohorts(cohorts)
+    profiling.stage("write_cohorts")
+    frames = []
+    for name, cohort_df in results.items():
+        if cohort_df.empty:
+            continue
+        folder = os.path.join(OUTPUT_FOLDER, f"cohort={quote(name, safe='')}")
+        os.makedirs(folder, exist_ok=True)
+        cohort_df.to_csv(os.path.join(folder, OUTPUT_FILE), index=False)
+        frames.append(cohort_df.assign(cohort=name))
+
+    print("Coortes:")
+    for name, cohort_df in results.items():
+        print(f"- {name}: {len(cohort_df)} PRs")
+
+    # Com coortes escolhidas só as pastas cohort=<nome> são atualizadas
+    if cohort_names:
+        return
 
-    filtered_df = df[
-        (mask_unb_mds | mask_mdsreq_fga_unb | mask_others) & mask_any_semester
-    ]
+    # Silver completa: união das coortes (um PR em várias coortes aparece uma vez)
+    filtered_df = (
+        pd.concat(frames, ignore_index=True).drop_duplicates(
+            subset=["platform", "org", "repo", "id"]
+        )
+        if frames
+        else pd.DataFrame(columns=[PARTITION_COLUMN])
+    )
 
+    profiling.stage("write_silver")
     output_path = os.path.join(OUTPUT_FOLDER, OUTPUT_FILE)
     filtered_df.to_csv(output_path, index=False)
+    write_partitions(filtered_df)
 
     print("Processamento Concluído")
-    print(f"- Total na Bronze: {len(df)}")
     print(f"- Total na Silver: {len(filtered_df)}")
     print("Semestres aplicados:")
+    counts = filtered_df[PARTITION_COLUMN].value_counts()
     for semester in SEMESTERS:
-        print(f"- {semester['name']}: {semester['start']} até {semester['end']}")
+        print(
+            f"- {semester['name']}: {semester['start']} até {semester['end']} "
+            f"({counts.get(semester['name'], 0)} PRs)"
+        )
     print(f"Arquivo salvo em: {output_path}")
 
 
 if __name__ == "__main__":
-    process_data()
+    # python metrics/scripts/filter.py [--profile] [coorte ...] (sem coortes: todas)
+    with profiling.session("filter", PROFILES_FOLDER):
+        process_data(sys.argv[1:] or None)
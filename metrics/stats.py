@@ -0,0 +1,171 @@
+# Bootstrap e testes de permutação para comparar grupos (EBL x PBL, LAB x disciplinas...).
+#
+# As reamostragens são matrizes de índices (reamostragens x amostra), calculadas em
+# lotes com NumPy e divididas entre processos quando a tabela é grande. Cada tarefa
+# tem a própria semente (SeedSequence.spawn), então o resultado é o mesmo com
+# qualquer número de workers.
+#
+#   from metrics.stats import compare_groups
+#   compare_groups(ebl_filtered, pbl_filtered, ['contributions', 'commits'], labels=('EBL', 'PBL'))
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = {
+    'mean': lambda x: x.mean(axis=-1),
+    'median': lambda x: np.median(x, axis=-1),
+    'std': lambda x: x.std(axis=-1, ddof=1),
+    'p90': lambda x: np.percentile(x, 90, axis=-1),
+}
+
+N_RESAMPLES = 10000
+CONFIDENCE = 0.95
+SEED = 42
+# Reamostragens por tarefa (unidade de paralelismo e de semente)
+TASK_RESAMPLES = 1000
+# Elementos por matriz de índices em memória (~16 MB em int64)
+BATCH_ELEMENTS = 2_000_000
+# Abaixo disso (tamanho da amostra x reamostragens) roda tudo no processo atual
+PARALLEL_THRESHOLD = 20_000_000
+
+
+def _values(values):
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    return values[~np.isnan(values)]
+
+
+def _resample(kind, a, b, statistic, size, seed):
+    """`size` valores da estatística reamostrada: bootstrap de a (ou de a - b) ou permutação de a, b"""
+    rng = np.random.default_rng(seed)
+    func = STATISTICS[statistic]
+    n_a, n_b = len(a), (len(b) if b is not None else 0)
+    pooled = np.concatenate([a, b]) if kind == 'permutation' else None
+    step = max(1, BATCH_ELEMENTS // max(n_a + n_b, 1))
+    out = np.empty(size)
+    for start in range(0, size, step):
+        rows = min(step, size - start)
+        if kind == 'bootstrap':
+            value = func(a[rng.integers(0, n_a, (rows, n_a))])
+            if b is not None:
+                value = value - func(b[rng.integers(0, n_b, (rows, n_b))])
+        else:
+            idx = np.tile(np.arange(n_a + n_b), (rows, 1))
+            rng.permuted(idx, axis=1, out=idx)
+            value = func(pooled[idx[:, :n_a]]) - func(pooled[idx[:, n_a:]])
+        out[start:start + rows] = value
+    return out
+
+
+def _statistic(name):
+    if name not in STATISTICS:
+        raise ValueError(f"Estatística desconhecida: {name} (use {', '.join(STATISTICS)})")
+    return STATISTICS[name]
+
+
+def _run(kind, a, b, statistic, n, seed, workers):
+    sizes = [TASK_RESAMPLES] * (n // TASK_RESAMPLES)
+    if n % TASK_RESAMPLES:
+        sizes.append(n % TASK_RESAMPLES)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers is None:
+        work = (len(a) + (len(b) if b is not None else 0)) * n
+        workers = 1 if work < PARALLEL_THRESHOLD else (os.cpu_count() or 1)
+    if workers <= 1 or len(sizes) == 1:
+        parts = [_resample(kind, a, b, statistic, size, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as executor:
+            futures = [
+                executor.submit(_resample, kind, a, b, statistic, size, s)
+                for size, s in zip(sizes, seeds)
+            ]
+            parts = [f.result() for f in futures]
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def _interval(samples, confidence):
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def bootstrap(values, statistic='mean', n_resamples=N_RESAMPLES, confidence=CONFIDENCE,
+              seed=SEED, workers=None):
+    """Estatística de uma amostra com intervalo de confiança (percentil) por bootstrap"""
+    func = _statistic(statistic)
+    a = _values(values)
+    if not len(a):
+        return {'estimate': np.nan, 'ci_low': np.nan, 'ci_high': np.nan}
+    samples = _run('bootstrap', a, None, statistic, n_resamples, seed, workers)
+    low, high = _interval(samples, confidence)
+    return {'estimate': float(func(a)), 'ci_low': low, 'ci_high': high}
+
+
+def bootstrap_difference(a, b, statistic='mean', n_resamples=N_RESAMPLES, confidence=CONFIDENCE,
+                         seed=SEED, workers=None):
+    """Diferença stat(a) - stat(b) com intervalo de confiança, reamostrando cada grupo"""
+    func = _statistic(statistic)
+    a, b = _values(a), _values(b)
+    if not len(a) or not len(b):
+        return {'estimate': np.nan, 'ci_low': np.nan, 'ci_high': np.nan}
+    samples = _run('bootstrap', a, b, statistic, n_resamples, seed, workers)
+    low, high = _interval(samples, confidence)
+    return {'estimate': float(func(a) - func(b)), 'ci_low': low, 'ci_high': high}
+
+
+def permutation_test(a, b, statistic='mean', n_permutations=N_RESAMPLES,
+                     alternative='two-sided', seed=SEED, workers=None):
+    """
+    Teste de permutação para stat(a) - stat(b). alternative: 'two-sided', 'greater'
+    (a > b) ou 'less'. p-valor com a correção (k + 1) / (n + 1).
+    """
+    func = _statistic(statistic)
+    a, b = _values(a), _values(b)
+    if not len(a) or not len(b):
+        return {'statistic': np.nan, 'p_value': np.nan}
+    observed = float(func(a) - func(b))
+    samples = _run('permutation', a, b, statistic, n_permutations, seed, workers)
+    if alternative == 'two-sided':
+        extreme = np.abs(samples) >= abs(observed)
+    elif alternative == 'greater':
+        extreme = samples >= observed
+    elif alternative == 'less':
+        extreme = samples <= observed
+    else:
+        raise ValueError(f"alternative inválida: {alternative}")
+    return {'statistic': observed, 'p_value': float((extreme.sum() + 1) / (len(samples) + 1))}
+
+
+def compare_groups(df_a, df_b, columns, statistic='mean', labels=('a', 'b'),
+                   n_resamples=N_RESAMPLES, confidence=CONFIDENCE, seed=SEED, workers=None):
+    """
+    Uma linha por métrica: estatística de cada grupo com IC, diferença (a - b) com IC
+    e p-valor do teste de permutação. Os grupos podem ter tamanhos diferentes, então
+    não é preciso subamostrar o maior.
+    """
+    label_a, label_b = labels
+    rows = []
+    for column in columns:
+        a, b = df_a[column], df_b[column]
+        est_a = bootstrap(a, statistic, n_resamples, confidence, seed, workers)
+        est_b = bootstrap(b, statistic, n_resamples, confidence, seed, workers)
+        diff = bootstrap_difference(a, b, statistic, n_resamples, confidence, seed, workers)
+        test = permutation_test(a, b, statistic, n_resamples, seed=seed, workers=workers)
+        rows.append({
+            'metric': column,
+            f'n_{label_a}': len(_values(a)),
+            f'n_{label_b}': len(_values(b)),
+            label_a: est_a['estimate'],
+            f'{label_a}_ci_low': est_a['ci_low'],
+            f'{label_a}_ci_high': est_a['ci_high'],
+            label_b: est_b['estimate'],
+            f'{label_b}_ci_low': est_b['ci_low'],
+            f'{label_b}_ci_high': est_b['ci_high'],
+            'difference': diff['estimate'],
+            'ci_low': diff['ci_low'],
+            'ci_high': diff['ci_high'],
+            'p_value': test['p_value'],
+        })
+    return pd.DataFrame(rows).set_index('metric')